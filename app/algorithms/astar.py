@@ -0,0 +1,85 @@
+import functools
+import heapq
+from app.algorithms.csr_graph import as_csr_graph
+from app.algorithms.heuristics import potential
+from app.algorithms.trace import TRACE_NONE, run_search
+from app.algorithms.progress import PROGRESS_INTERVAL
+
+
+def astar(graph, start, end, heuristic="great_circle", stats=None, trace=TRACE_NONE, progress=None):
+    """
+    Implementacja algorytmu A*.
+
+    Heurystyka to odległość po ortodromie ("great_circle", ze współrzędnych
+    lon/lat z tabeli ``cities``) lub odległość euklidesowa w metrycznym CRS
+    mapy ("euclidean"), przeskalowana do jednostek wag krawędzi.
+
+    :param graph: Obiekt grafu (CSRGraph lub NetworkX)
+    :param start: Węzeł początkowy
+    :param end: Węzeł końcowy
+    :param heuristic: Rodzaj heurystyki ("great_circle" lub "euclidean")
+    :param stats: Opcjonalny słownik, do którego zapisywana jest liczba ustalonych węzłów ("settled")
+        i poprawionych odległości ("relaxed")
+    :param trace: Tryb zapisu kroków: "none" (domyślnie), "list" lub "lazy" (iterator)
+    :param progress: Opcjonalna funkcja progress(ustalone) wywoływana co PROGRESS_INTERVAL węzłów;
+        zgłoszenie w niej wyjątku SearchCancelled przerywa przeszukiwanie
+    :return: Najkrótsza ścieżka jako lista węzłów, całkowity koszt, kroki algorytmu
+    """
+    graph = as_csr_graph(graph)
+    h = potential(graph, graph.node_id(end), heuristic)
+    return run_search(functools.partial(_astar, graph, start, end, h), trace, stats, progress)
+
+
+def _astar(graph, start, end, h, stats=None, record=False, progress=None):
+    """Przeszukiwanie A* z gotową heurystyką ``h`` (generator kroków, patrz ``run_search``)."""
+    names = graph.names
+    source = graph.node_id(start)
+    target = graph.node_id(end)
+    adjacency = graph.adjacency()
+
+    distances = {source: 0}
+    previous_nodes = {source: -1}
+    priority_queue = [(h[source], source)]
+    closed = set()
+    relaxed = 0
+
+    while priority_queue:
+        _, current_node = heapq.heappop(priority_queue)
+
+        if current_node == target:
+            break
+
+        if current_node in closed:
+            continue
+        closed.add(current_node)
+        if progress is not None and len(closed) % PROGRESS_INTERVAL == 0:
+            progress(len(closed))
+        current_distance = distances[current_node]
+
+        neighbors, weights = adjacency[current_node]
+        for neighbor, weight in zip(neighbors, weights):
+            distance = current_distance + weight
+
+            if distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance
+                previous_nodes[neighbor] = current_node
+                heapq.heappush(priority_queue, (distance + h[neighbor], neighbor))
+                relaxed += 1
+                if record:
+                    yield names[current_node], names[neighbor], weight
+
+    if stats is not None:
+        stats["settled"] = len(closed)
+        stats["relaxed"] = relaxed
+
+    if target not in distances:
+        return [], float('inf')
+
+    path = []
+    current_node = target
+    while current_node != -1:
+        path.append(names[current_node])
+        current_node = previous_nodes[current_node]
+    path.reverse()
+
+    return path, distances[target]
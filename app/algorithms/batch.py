@@ -0,0 +1,127 @@
+import heapq
+import multiprocessing
+import numpy as np
+from app.algorithms.csr_graph import as_csr_graph
+from app.snapshot import SNAPSHOT_KEY, read_snapshot
+
+# Graf współdzielony przez procesy robocze (ustawiany przed utworzeniem puli)
+_shared_graph = None
+
+
+def _search_from(adjacency, node_count, source, targets=None):
+    """
+    Pełne przeszukiwanie Dijkstry z jednego źródła po identyfikatorach węzłów.
+
+    Jeśli podano zbiór ``targets``, przeszukiwanie kończy się po ustaleniu
+    wszystkich węzłów docelowych.
+    """
+    distances = np.full(node_count, np.inf)
+    best = {source: 0}
+    priority_queue = [(0, source)]
+    remaining = set(targets) if targets is not None else None
+
+    while priority_queue:
+        current_distance, current_node = heapq.heappop(priority_queue)
+        if current_distance > best[current_node]:
+            continue
+        distances[current_node] = current_distance
+
+        if remaining is not None:
+            remaining.discard(current_node)
+            if not remaining:
+                break
+
+        neighbors, weights = adjacency[current_node]
+        for neighbor, weight in zip(neighbors, weights):
+            distance = current_distance + weight
+            if distance < best.get(neighbor, float('inf')):
+                best[neighbor] = distance
+                heapq.heappush(priority_queue, (distance, neighbor))
+
+    return distances
+
+
+def one_to_many(graph, source_id, target_ids=None):
+    """
+    Odległości z jednego miasta do wielu miast jednym przeszukiwaniem.
+
+    :param graph: Obiekt grafu (CSRGraph lub NetworkX)
+    :param source_id: Identyfikator miasta początkowego (tabela ``cities``)
+    :param target_ids: Identyfikatory miast docelowych (domyślnie wszystkie)
+    :return: Tablica odległości w kolejności ``target_ids``
+    """
+    graph = as_csr_graph(graph)
+    if target_ids is None:
+        target_ids = graph.city_ids
+    target_nodes = [graph.node_of_city(city_id) for city_id in target_ids]
+    distances = _search_from(graph.adjacency(), graph.node_count, graph.node_of_city(source_id), target_nodes)
+    return distances[target_nodes]
+
+
+def _init_worker(graph):
+    global _shared_graph
+    if isinstance(graph, str):
+        # Ścieżka zrzutu binarnego - tablice grafu są mapowane z pliku zamiast kopiowane
+        graph = read_snapshot(graph)[0]
+    _shared_graph = graph
+
+
+def _rows(task):
+    """Wylicza wiersze macierzy odległości dla paczki źródeł (w procesie roboczym)."""
+    source_nodes, target_nodes = task
+    graph = _shared_graph
+    adjacency = graph.adjacency()
+    return np.vstack([
+        _search_from(adjacency, graph.node_count, source, target_nodes)[target_nodes]
+        for source in source_nodes
+    ])
+
+
+def distance_matrix(graph, source_ids=None, target_ids=None, processes=None, chunk_size=16):
+    """
+    Macierz odległości many-to-many.
+
+    Dla każdego źródła wykonywane jest jedno przeszukiwanie wypełniające
+    wszystkie cele. Źródła są rozdzielane w paczkach między procesy puli.
+    Przy uruchamianiu procesów przez ``fork`` graf jest dziedziczony bez
+    kopiowania. W pozostałych przypadkach graf wczytany ze zrzutu binarnego
+    jest mapowany z pliku w każdym procesie, a inny graf jest serializowany
+    raz na proces (przez inicjalizator puli), a nie raz na zadanie.
+
+    :param graph: Obiekt grafu (CSRGraph lub NetworkX)
+    :param source_ids: Identyfikatory miast początkowych (domyślnie wszystkie)
+    :param target_ids: Identyfikatory miast docelowych (domyślnie wszystkie)
+    :param processes: Liczba procesów (None - liczba procesorów, 1 - bez puli)
+    :param chunk_size: Liczba źródeł w jednym zadaniu
+    :return: Macierz odległości (źródła x cele), identyfikatory źródeł, identyfikatory celów
+    """
+    global _shared_graph
+    graph = as_csr_graph(graph)
+    source_ids = np.asarray(graph.city_ids if source_ids is None else source_ids, dtype=np.int64)
+    target_ids = np.asarray(graph.city_ids if target_ids is None else target_ids, dtype=np.int64)
+    source_nodes = [graph.node_of_city(city_id) for city_id in source_ids.tolist()]
+    target_nodes = [graph.node_of_city(city_id) for city_id in target_ids.tolist()]
+
+    if len(source_nodes) == 0:
+        return np.empty((0, len(target_nodes))), source_ids, target_ids
+
+    tasks = [
+        (source_nodes[i:i + chunk_size], target_nodes)
+        for i in range(0, len(source_nodes), chunk_size)
+    ]
+
+    if processes == 1 or len(tasks) == 1:
+        _shared_graph = graph
+        rows = [_rows(task) for task in tasks]
+    elif multiprocessing.get_start_method() == "fork":
+        graph.adjacency()  # Listy sąsiedztwa budowane raz, przed rozwidleniem procesów
+        _shared_graph = graph
+        with multiprocessing.Pool(processes) as pool:
+            rows = pool.map(_rows, tasks)
+    else:
+        shared = graph.derived.get(SNAPSHOT_KEY, graph)
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(shared,)) as pool:
+            rows = pool.map(_rows, tasks)
+    _shared_graph = None
+
+    return np.vstack(rows), source_ids, target_ids
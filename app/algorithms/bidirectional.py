@@ -0,0 +1,101 @@
+import functools
+import heapq
+from app.algorithms.csr_graph import as_csr_graph
+from app.algorithms.trace import TRACE_NONE, run_search
+from app.algorithms.progress import PROGRESS_INTERVAL
+
+
+def bidirectional_dijkstra(graph, start, end, stats=None, trace=TRACE_NONE, progress=None):
+    """
+    Implementacja dwukierunkowego algorytmu Dijkstry.
+
+    Przeszukiwanie prowadzone jest jednocześnie od węzła początkowego (w grafie)
+    i od końcowego (w grafie odwróconym). Za każdym razem rozwijany jest
+    kierunek z mniejszą odległością na szczycie kolejki, a przeszukiwanie
+    kończy się, gdy suma szczytów obu kolejek przekroczy najlepszą znalezioną
+    długość ścieżki.
+
+    :param graph: Obiekt grafu (CSRGraph lub NetworkX)
+    :param start: Węzeł początkowy
+    :param end: Węzeł końcowy
+    :param stats: Opcjonalny słownik, do którego zapisywana jest liczba ustalonych węzłów ("settled")
+        i poprawionych odległości ("relaxed")
+    :param trace: Tryb zapisu kroków: "none" (domyślnie), "list" lub "lazy" (iterator)
+    :param progress: Opcjonalna funkcja progress(ustalone) wywoływana co PROGRESS_INTERVAL węzłów;
+        zgłoszenie w niej wyjątku SearchCancelled przerywa przeszukiwanie
+    :return: Najkrótsza ścieżka jako lista węzłów, całkowity koszt, kroki algorytmu
+    """
+    graph = as_csr_graph(graph)
+    return run_search(functools.partial(_bidirectional_dijkstra, graph, start, end), trace, stats, progress)
+
+
+def _bidirectional_dijkstra(graph, start, end, stats=None, record=False, progress=None):
+    """Dwukierunkowe przeszukiwanie Dijkstry (generator kroków, patrz ``run_search``)."""
+    names = graph.names
+    source = graph.node_id(start)
+    target = graph.node_id(end)
+    adjacency = (graph.adjacency(), graph.reverse().adjacency())
+
+    distances = ({source: 0}, {target: 0})
+    previous_nodes = ({source: -1}, {target: -1})
+    queues = ([(0, source)], [(0, target)])
+    settled = (set(), set())
+    relaxed = 0
+
+    best = 0 if source == target else float('inf')
+    meeting_node = source if source == target else None
+
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+
+        # Rozwijany jest kierunek z mniejszą odległością na szczycie kolejki
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        current_distance, current_node = heapq.heappop(queues[side])
+        if current_node in settled[side]:
+            continue
+        settled[side].add(current_node)
+        if progress is not None and (len(settled[0]) + len(settled[1])) % PROGRESS_INTERVAL == 0:
+            progress(len(settled[0]) + len(settled[1]))
+
+        own_distances = distances[side]
+        other_distances = distances[1 - side]
+        neighbors, weights = adjacency[side][current_node]
+        for neighbor, weight in zip(neighbors, weights):
+            distance = current_distance + weight
+
+            if distance < own_distances.get(neighbor, float('inf')):
+                own_distances[neighbor] = distance
+                previous_nodes[side][neighbor] = current_node
+                heapq.heappush(queues[side], (distance, neighbor))
+                relaxed += 1
+                if record:
+                    if side == 0:
+                        yield names[current_node], names[neighbor], weight
+                    else:
+                        yield names[neighbor], names[current_node], weight
+
+                if neighbor in other_distances and distance + other_distances[neighbor] < best:
+                    best = distance + other_distances[neighbor]
+                    meeting_node = neighbor
+
+    if stats is not None:
+        stats["settled"] = len(settled[0]) + len(settled[1])
+        stats["relaxed"] = relaxed
+
+    if meeting_node is None:
+        return [], float('inf')
+
+    # Ścieżka: start -> węzeł spotkania (wstecz po poprzednikach) + węzeł spotkania -> koniec
+    path = []
+    current_node = meeting_node
+    while current_node != -1:
+        path.append(names[current_node])
+        current_node = previous_nodes[0][current_node]
+    path.reverse()
+    current_node = previous_nodes[1][meeting_node]
+    while current_node != -1:
+        path.append(names[current_node])
+        current_node = previous_nodes[1][current_node]
+
+    return path, best
@@ -0,0 +1,217 @@
+"""
+Pamięć podręczna wyników zapytań o najkrótsze ścieżki.
+
+Wyniki są zapamiętywane pod kluczem (dane grafu, algorytm, start, cel).
+Dane grafu identyfikuje odcisk bazy danych (``graph.derived[FINGERPRINT_KEY]``);
+graf zmieniony przez ``set_edge_weight`` traci odcisk i jest identyfikowany
+przez obiekt grafu i jego licznik ``version``. Dzięki temu wyniki dla
+przeładowanej, zmienionej bazy lub dla zmienionego grafu nigdy nie są
+zwracane - stare wpisy są po prostu wypierane przez nowe (LRU).
+
+Zapytania z miasta X, o które nie pytano wcześniej, są odczytywane
+z poprzednich przeszukiwań od X: chybione zapytanie algorytmem Dijkstry
+zostawia odległości i poprzedniki ustalonych węzłów (``SearchSpace``),
+a pełne drzewo najkrótszych ścieżek (``tree``) odpowiada na zapytania
+o dowolny cel.
+"""
+import json
+import os
+from collections import OrderedDict
+from app.algorithms.csr_graph import FINGERPRINT_KEY
+from app.algorithms.dijkstra import SEARCH_SPACE_KEY
+from app.algorithms.dynamic import TREES_KEY, shortest_path_tree
+from app.algorithms.registry import get_function
+from app.algorithms.trace import TRACE_NONE, TRACE_LIST, TRACE_STEPS
+
+
+def _graph_token(graph):
+    """Identyfikator danych grafu w kluczu pamięci podręcznej."""
+    fingerprint = graph.derived.get(FINGERPRINT_KEY)
+    if fingerprint is not None and graph.version == 0:
+        return fingerprint
+    return f"graf:{id(graph)}:{graph.version}"
+
+
+class QueryCache:
+    """
+    Pamięć podręczna LRU wyników zapytań z ponownym użyciem drzew najkrótszych ścieżek.
+
+    Graf musi być obiektem CSRGraph. Zapytanie, którego nie ma w pamięci,
+    uruchamia wybrany algorytm (przeszukiwanie kończy się w mieście
+    docelowym i można je przerwać przez ``progress``). Algorytmy Dijkstry
+    zostawiają przy tym przeszukaną część grafu: kolejne zapytanie z tego
+    samego miasta o cel ustalony przed poprzednim celem jest odczytywane
+    z niej bez przeszukiwania. Pełne drzewa najkrótszych ścieżek są budowane
+    jawnie, metodą ``tree`` (np. przez trasy alternatywne) - każde kolejne
+    zapytanie z miasta, od którego zbudowano drzewo, jest odczytywane
+    z drzewa dowolnym algorytmem. Drzewa są naprawiane przy zmianach wag
+    (patrz ``app.algorithms.dynamic``); pamiętanych jest najwyżej
+    ``max_trees`` drzew na graf i tyle samo przeszukanych części grafu.
+
+    Liczniki ``hits`` (wynik z pamięci), ``tree_hits`` (wynik z drzewa lub
+    z wcześniejszego przeszukiwania) i ``misses`` (uruchomienie algorytmu)
+    są dostępne przez ``counters``.
+    """
+
+    def __init__(self, max_entries=1000, max_trees=8, path=None):
+        """
+        :param max_entries: Maksymalna liczba zapamiętanych wyników
+        :param max_trees: Maksymalna liczba drzew najkrótszych ścieżek na graf
+            (i zapamiętanych przeszukań)
+        :param path: Opcjonalny plik JSON, z którego wyniki są wczytywane i do którego zapisuje ``save``
+        """
+        self.max_entries = max_entries
+        self.max_trees = max_trees
+        self.path = path
+        self.entries = OrderedDict()
+        # (dane grafu, węzeł początkowy) -> SearchSpace ostatniego przeszukiwania z tego węzła
+        self.search_spaces = OrderedDict()
+        self.hits = 0
+        self.tree_hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def search(self, graph, algorithm_path, start, end, stats=None, trace=TRACE_NONE, progress=None):
+        """
+        Zwraca wynik zapytania z pamięci lub uruchamia algorytm.
+
+        Parametry i wynik jak w funkcjach algorytmów; dla wyników z pamięci
+        kroki (w trybie innym niż "none") są wyznaczane dopiero przy pobraniu,
+        a ``stats`` dostaje "settled" = 0, "relaxed" = 0 i "cached" = True.
+
+        :param algorithm_path: Ścieżka funkcji algorytmu "moduł.funkcja" (wartość z ``ALGORITHMS``)
+        """
+        token = _graph_token(graph)
+        key = (token, algorithm_path, start, end)
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        else:
+            result = self._from_tree(graph, start, end)
+            if result is None:
+                result = self._from_search_space(graph, token, start, end)
+            if result is not None:
+                self.tree_hits += 1
+            else:
+                self.misses += 1
+                return self._run(graph, token, key, algorithm_path, stats, trace, progress)
+            self._store(key, result)
+
+        if stats is not None:
+            stats["settled"] = 0
+            stats["relaxed"] = 0
+            stats["cached"] = True
+        path, cost = result
+        return list(path), cost, self._steps(algorithm_path, graph, start, end, trace)
+
+    def _run(self, graph, token, key, algorithm_path, stats, trace, progress):
+        """Uruchamia algorytm, zapamiętuje wynik i przeszukaną część grafu (jeśli algorytm ją zwraca)."""
+        _, _, start, end = key
+        search_stats = stats if stats is not None else {}
+        search_stats[SEARCH_SPACE_KEY] = None
+        try:
+            algorithm = get_function(algorithm_path)
+            path, cost, steps = algorithm(graph, start, end, stats=search_stats, trace=trace, progress=progress)
+        finally:
+            space = search_stats.pop(SEARCH_SPACE_KEY, None)
+        self._store(key, (list(path), cost))
+        if space is not None:
+            space_key = (token, space.source)
+            self.search_spaces[space_key] = space
+            self.search_spaces.move_to_end(space_key)
+            while len(self.search_spaces) > self.max_trees:
+                self.search_spaces.popitem(last=False)
+        return path, cost, steps
+
+    def _steps(self, algorithm_path, graph, start, end, trace):
+        if trace == TRACE_NONE:
+            return ()
+        if trace == TRACE_LIST:
+            return get_function(algorithm_path)(graph, start, end, trace=TRACE_LIST)[2]
+        # Wynik jest znany - kroki są odtwarzane jednym przeszukiwaniem dopiero przy pobraniu
+        return get_function(algorithm_path)(graph, start, end, trace=TRACE_STEPS)[2]
+
+    def _from_tree(self, graph, start, end):
+        """Odczytuje wynik z aktualnego drzewa najkrótszych ścieżek lub zwraca None."""
+        if start not in graph or end not in graph:
+            return None
+        tree = graph.derived.get(TREES_KEY, {}).get(graph.node_id(start))
+        if tree is None or tree.version != graph.version:
+            return None
+        nodes, cost = tree.path_to(graph.node_id(end))
+        return [graph.names[node] for node in nodes], cost
+
+    def _from_search_space(self, graph, token, start, end):
+        """Odczytuje wynik z wcześniejszego przeszukiwania od ``start`` lub zwraca None."""
+        if start not in graph or end not in graph:
+            return None
+        space = self.search_spaces.get((token, graph.node_id(start)))
+        if space is None:
+            return None
+        found = space.path_to(graph.node_id(end))
+        if found is None:
+            return None
+        nodes, cost = found
+        return [graph.names[node] for node in nodes], cost
+
+    def tree(self, graph, city, progress=None):
+        """
+        Zwraca drzewo najkrótszych ścieżek od miasta ``city``, budując je przy pierwszym użyciu.
+
+        Drzewo jest przypięte do grafu (odpowiada odtąd na zapytania ``search``
+        z tego miasta) i wlicza się do limitu ``max_trees``. Budowa ustala
+        wszystkie węzły grafu, więc należy ją wykonywać w tle.
+
+        :param progress: Opcjonalna funkcja postępu budowy (patrz ``ShortestPathTree``)
+        """
+        tree = shortest_path_tree(graph, city, progress)
+        trees = graph.derived[TREES_KEY]
+        # Najstarsze drzewa są usuwane (słownik zachowuje kolejność dodania)
+        while len(trees) > self.max_trees:
+            del trees[next(iter(trees))]
+        return tree
+
+    def _store(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def counters(self):
+        """Zwraca liczniki trafień i chybień."""
+        return {"hits": self.hits, "tree_hits": self.tree_hits, "misses": self.misses, "entries": len(self.entries)}
+
+    def invalidate(self):
+        """Usuwa wszystkie zapamiętane wyniki."""
+        self.entries.clear()
+        self.search_spaces.clear()
+
+    def save(self, path=None):
+        """
+        Zapisuje wyniki do pliku JSON.
+
+        Zapisywane są tylko wyniki dla grafów identyfikowanych odciskiem bazy -
+        wyniki dla grafów zmienionych w pamięci nie mają sensu w innej sesji.
+        """
+        path = path or self.path
+        rows = [
+            [token, algorithm_path, start, end, result[0], result[1]]
+            for (token, algorithm_path, start, end), result in self.entries.items()
+            if not token.startswith("graf:")
+        ]
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(rows, file, ensure_ascii=False)
+        os.replace(temporary, path)
+
+    def load(self, path):
+        """Wczytuje wyniki zapisane metodą ``save`` (uszkodzony plik jest pomijany)."""
+        try:
+            with open(path, encoding="utf-8") as file:
+                rows = json.load(file)
+            for token, algorithm_path, start, end, nodes, cost in rows:
+                self._store((token, algorithm_path, start, end), (nodes, cost))
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Błąd odczytu pamięci podręcznej zapytań: {e}")
@@ -0,0 +1,397 @@
+import functools
+import heapq
+import os
+import numpy as np
+from app.algorithms.csr_graph import HIERARCHY_FILE_KEY, HIERARCHY_KEY, as_csr_graph
+from app.algorithms.trace import TRACE_NONE, run_search
+from app.algorithms.progress import PROGRESS_INTERVAL
+
+# Limit ustalonych węzłów w przeszukiwaniu świadków podczas kontrakcji
+WITNESS_SEARCH_LIMIT = 100
+
+
+class ContractionHierarchy:
+    """
+    Hierarchia kontrakcji (Contraction Hierarchies) zbudowana nad grafem CSRGraph.
+
+    ``rank`` to kolejność kontrakcji węzłów. Graf ``up`` zawiera krawędzie
+    u -> v prowadzące do węzłów o wyższej randze (przechowywane przy u),
+    a graf ``down`` krawędzie u -> v prowadzące z węzłów o wyższej randze
+    do niższej (przechowywane przy v). Tablice ``*_middle`` wskazują węzeł
+    pośredni skrótu albo -1 dla krawędzi oryginalnych.
+    """
+
+    def __init__(self, city_ids, rank, up, down, fingerprint=None):
+        self.city_ids = np.asarray(city_ids, dtype=np.int64)
+        self.rank = np.asarray(rank, dtype=np.int32)
+        self.up = tuple(np.asarray(array) for array in up)
+        self.down = tuple(np.asarray(array) for array in down)
+        self.fingerprint = fingerprint
+        self._adjacency = None
+        self._middle = None
+
+    @property
+    def shortcut_count(self):
+        return int(np.count_nonzero(self.up[3] >= 0) + np.count_nonzero(self.down[3] >= 0))
+
+    def adjacency(self):
+        """Zwraca listy sąsiedztwa (w górę, w dół) w postaci list Pythona."""
+        if self._adjacency is None:
+            self._adjacency = tuple(_csr_lists(*graph[:3]) for graph in (self.up, self.down))
+        return self._adjacency
+
+    def middle_nodes(self):
+        """Zwraca słownik (u, v) -> węzeł pośredni dla wszystkich skrótów."""
+        if self._middle is None:
+            self._middle = {}
+            up_offsets, up_targets, _, up_middle = self.up
+            for u, v, middle in zip(_sources(up_offsets), up_targets.tolist(), up_middle.tolist()):
+                if middle >= 0:
+                    self._middle[(u, v)] = middle
+            down_offsets, down_sources, _, down_middle = self.down
+            for v, u, middle in zip(_sources(down_offsets), down_sources.tolist(), down_middle.tolist()):
+                if middle >= 0:
+                    self._middle[(u, v)] = middle
+        return self._middle
+
+    def unpack(self, u, v):
+        """Rozwija krawędź (być może skrót) u -> v do listy węzłów oryginalnej ścieżki."""
+        middle_nodes = self.middle_nodes()
+        path = [u]
+        stack = [(u, v)]
+        while stack:
+            a, b = stack.pop()
+            middle = middle_nodes.get((a, b), -1)
+            if middle < 0:
+                path.append(b)
+            else:
+                stack.append((middle, b))
+                stack.append((a, middle))
+        return path
+
+    def save(self, path):
+        """Zapisuje hierarchię do pliku ``.npz``."""
+        np.savez(
+            path,
+            fingerprint=np.array(self.fingerprint or ""),
+            city_ids=self.city_ids,
+            rank=self.rank,
+            up_offsets=self.up[0], up_targets=self.up[1], up_weights=self.up[2], up_middle=self.up[3],
+            down_offsets=self.down[0], down_sources=self.down[1], down_weights=self.down[2],
+            down_middle=self.down[3],
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Wczytuje hierarchię zapisaną metodą ``save``."""
+        with np.load(path) as data:
+            up = (data["up_offsets"], data["up_targets"], data["up_weights"], data["up_middle"])
+            down = (data["down_offsets"], data["down_sources"], data["down_weights"], data["down_middle"])
+            return cls(data["city_ids"], data["rank"], up, down, str(data["fingerprint"]))
+
+
+def _sources(offsets):
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets)).tolist()
+
+
+def _csr_lists(offsets, targets, weights):
+    offsets = offsets.tolist()
+    targets = targets.tolist()
+    weights = weights.tolist()
+    return [
+        (targets[offsets[u]:offsets[u + 1]], weights[offsets[u]:offsets[u + 1]])
+        for u in range(len(offsets) - 1)
+    ]
+
+
+def _to_csr(node_count, edges):
+    """Zamienia listę (węzeł, sąsiad, waga, środek) na tablice CSR."""
+    edges.sort(key=lambda edge: edge[0])
+    counts = np.bincount(np.array([edge[0] for edge in edges], dtype=np.int64), minlength=node_count)
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return (
+        offsets,
+        np.array([edge[1] for edge in edges], dtype=np.int32),
+        np.array([edge[2] for edge in edges], dtype=np.float64),
+        np.array([edge[3] for edge in edges], dtype=np.int32),
+    )
+
+
+def _witness_search(out_edges, source, excluded, max_cost, targets):
+    """
+    Ograniczone przeszukiwanie Dijkstry z pominięciem kontrahowanego węzła.
+
+    Zwraca odległości do węzłów docelowych, o ile nie przekraczają ``max_cost``.
+    """
+    distances = {source: 0}
+    queue = [(0, source)]
+    remaining = set(targets)
+    settled = 0
+    while queue and remaining and settled < WITNESS_SEARCH_LIMIT:
+        distance, node = heapq.heappop(queue)
+        if distance > distances[node]:
+            continue
+        if distance > max_cost:
+            break
+        settled += 1
+        remaining.discard(node)
+        for neighbor, (weight, _) in out_edges[node].items():
+            if neighbor == excluded:
+                continue
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                heapq.heappush(queue, (new_distance, neighbor))
+    return distances
+
+
+def _shortcuts(node, in_edges, out_edges):
+    """Wyznacza skróty potrzebne do zachowania odległości po kontrakcji węzła."""
+    shortcuts = []
+    for u, (weight_in, _) in in_edges[node].items():
+        targets = {
+            w: weight_in + weight_out
+            for w, (weight_out, _) in out_edges[node].items()
+            if w != u
+        }
+        if not targets:
+            continue
+        distances = _witness_search(out_edges, u, node, max(targets.values()), targets)
+        for w, cost in targets.items():
+            if distances.get(w, float('inf')) > cost:
+                shortcuts.append((u, w, cost))
+    return shortcuts
+
+
+def build_hierarchy(graph, fingerprint=None):
+    """
+    Buduje hierarchię kontrakcji.
+
+    Węzły są kontrahowane w kolejności wyznaczanej leniwie aktualizowanym
+    priorytetem (różnica krawędzi + liczba skontrahowanych sąsiadów + poziom).
+
+    :param graph: Obiekt grafu (CSRGraph lub NetworkX)
+    :param fingerprint: Opcjonalny odcisk danych, z których zbudowano graf
+    :return: Obiekt ContractionHierarchy
+    """
+    graph = as_csr_graph(graph)
+    node_count = graph.node_count
+    out_edges = [dict() for _ in range(node_count)]
+    in_edges = [dict() for _ in range(node_count)]
+    for u, v, weight in zip(graph.edge_sources().tolist(), graph.targets.tolist(), graph.weights.tolist()):
+        if u != v and weight < out_edges[u].get(v, (float('inf'),))[0]:
+            out_edges[u][v] = (weight, -1)
+            in_edges[v][u] = (weight, -1)
+
+    contracted_neighbors = [0] * node_count
+    levels = [0] * node_count
+
+    def priority(node):
+        edge_difference = len(_shortcuts(node, in_edges, out_edges)) - len(in_edges[node]) - len(out_edges[node])
+        return edge_difference + contracted_neighbors[node] + levels[node]
+
+    queue = [(priority(node), node) for node in range(node_count)]
+    heapq.heapify(queue)
+    rank = np.zeros(node_count, dtype=np.int32)
+    up_edges = []
+    down_edges = []
+    next_rank = 0
+
+    while queue:
+        _, node = heapq.heappop(queue)
+
+        # Leniwa aktualizacja: jeśli priorytet się pogorszył, węzeł wraca do kolejki
+        current_priority = priority(node)
+        if queue and current_priority > queue[0][0]:
+            heapq.heappush(queue, (current_priority, node))
+            continue
+
+        rank[node] = next_rank
+        next_rank += 1
+        shortcuts = _shortcuts(node, in_edges, out_edges)
+
+        for w, (weight, middle) in out_edges[node].items():
+            up_edges.append((node, w, weight, middle))
+            del in_edges[w][node]
+        for u, (weight, middle) in in_edges[node].items():
+            down_edges.append((node, u, weight, middle))
+            del out_edges[u][node]
+
+        neighbors = set(out_edges[node]) | set(in_edges[node])
+        out_edges[node] = {}
+        in_edges[node] = {}
+
+        for u, w, cost in shortcuts:
+            if cost < out_edges[u].get(w, (float('inf'),))[0]:
+                out_edges[u][w] = (cost, node)
+                in_edges[w][u] = (cost, node)
+
+        for neighbor in neighbors:
+            contracted_neighbors[neighbor] += 1
+            levels[neighbor] = max(levels[neighbor], levels[node] + 1)
+
+    return ContractionHierarchy(
+        graph.city_ids, rank, _to_csr(node_count, up_edges), _to_csr(node_count, down_edges), fingerprint
+    )
+
+
+def load_or_build_hierarchy(graph, path, fingerprint):
+    """
+    Wczytuje hierarchię z pliku obok bazy danych lub buduje ją i zapisuje.
+
+    Plik jest przebudowywany, gdy jego odcisk nie zgadza się z odciskiem
+    bieżących danych (np. po zmianie wierszy tabeli ``connections``).
+    """
+    if os.path.exists(path):
+        try:
+            hierarchy = ContractionHierarchy.load(path)
+            if hierarchy.fingerprint == fingerprint and np.array_equal(hierarchy.city_ids, graph.city_ids):
+                return hierarchy
+            print(f"Hierarchia kontrakcji w {path} jest nieaktualna, trwa przebudowa.")
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Błąd odczytu hierarchii kontrakcji: {e}")
+
+    hierarchy = build_hierarchy(graph, fingerprint)
+    try:
+        hierarchy.save(path)
+    except OSError as e:
+        print(f"Nie udało się zapisać hierarchii kontrakcji: {e}")
+    return hierarchy
+
+
+def get_hierarchy(graph):
+    """
+    Zwraca hierarchię przypiętą do grafu, wczytując lub budując ją przy pierwszym użyciu.
+
+    Jeśli graf pochodzi z bazy danych, ``Dataset`` zapisuje w ``graph.derived``
+    ścieżkę pliku hierarchii i odcisk danych, dzięki czemu hierarchia jest
+    trwała między uruchomieniami aplikacji.
+    """
+    hierarchy = graph.derived.get(HIERARCHY_KEY)
+    if hierarchy is None:
+        if HIERARCHY_FILE_KEY in graph.derived:
+            path, fingerprint = graph.derived[HIERARCHY_FILE_KEY]
+            hierarchy = load_or_build_hierarchy(graph, path, fingerprint)
+        else:
+            hierarchy = build_hierarchy(graph)
+        graph.derived[HIERARCHY_KEY] = hierarchy
+    return hierarchy
+
+
+def contraction_hierarchy(graph, start, end, stats=None, trace=TRACE_NONE, progress=None):
+    """
+    Zapytanie o najkrótszą ścieżkę z użyciem hierarchii kontrakcji.
+
+    Przeszukiwanie dwukierunkowe porusza się wyłącznie w górę hierarchii,
+    a skróty na znalezionej ścieżce są rozwijane do krawędzi oryginalnych.
+
+    :param graph: Obiekt grafu (CSRGraph lub NetworkX)
+    :param start: Węzeł początkowy
+    :param end: Węzeł końcowy
+    :param stats: Opcjonalny słownik, do którego zapisywana jest liczba ustalonych węzłów ("settled")
+        i poprawionych odległości ("relaxed")
+    :param trace: Tryb zapisu kroków: "none" (domyślnie), "list" lub "lazy" (iterator)
+    :param progress: Opcjonalna funkcja progress(ustalone) wywoływana co PROGRESS_INTERVAL węzłów;
+        zgłoszenie w niej wyjątku SearchCancelled przerywa przeszukiwanie
+    :return: Najkrótsza ścieżka jako lista węzłów, całkowity koszt, kroki algorytmu
+    """
+    graph = as_csr_graph(graph)
+    hierarchy = get_hierarchy(graph)
+    return run_search(functools.partial(_contraction_hierarchy, graph, hierarchy, start, end), trace, stats, progress)
+
+
+def _contraction_hierarchy(graph, hierarchy, start, end, stats=None, record=False, progress=None):
+    """Dwukierunkowe przeszukiwanie w górę hierarchii (generator kroków, patrz ``run_search``)."""
+    names = graph.names
+    source = graph.node_id(start)
+    target = graph.node_id(end)
+    adjacency = hierarchy.adjacency()
+
+    distances = ({source: 0}, {target: 0})
+    previous_nodes = ({source: -1}, {target: -1})
+    queues = ([(0, source)], [(0, target)])
+    settled = [0, 0]
+    relaxed = 0
+
+    best = float('inf')
+    meeting_node = None
+
+    while queues[0] or queues[1]:
+        # Kierunek jest zamykany, gdy jego minimum nie może już poprawić wyniku
+        for side in (0, 1):
+            if queues[side] and queues[side][0][0] >= best:
+                queues[side].clear()
+        if not queues[0] and not queues[1]:
+            break
+        side = 0 if queues[0] and (not queues[1] or queues[0][0][0] <= queues[1][0][0]) else 1
+
+        current_distance, current_node = heapq.heappop(queues[side])
+        if current_distance > distances[side][current_node]:
+            continue
+        settled[side] += 1
+        if progress is not None and (settled[0] + settled[1]) % PROGRESS_INTERVAL == 0:
+            progress(settled[0] + settled[1])
+
+        other_distances = distances[1 - side]
+        if current_node in other_distances and current_distance + other_distances[current_node] < best:
+            best = current_distance + other_distances[current_node]
+            meeting_node = current_node
+
+        own_distances = distances[side]
+        neighbors, weights = adjacency[side][current_node]
+        for neighbor, weight in zip(neighbors, weights):
+            distance = current_distance + weight
+            if distance < own_distances.get(neighbor, float('inf')):
+                own_distances[neighbor] = distance
+                previous_nodes[side][neighbor] = current_node
+                heapq.heappush(queues[side], (distance, neighbor))
+                relaxed += 1
+                if record:
+                    if side == 0:
+                        yield names[current_node], names[neighbor], weight
+                    else:
+                        yield names[neighbor], names[current_node], weight
+
+    if stats is not None:
+        stats["settled"] = settled[0] + settled[1]
+        stats["relaxed"] = relaxed
+
+    if meeting_node is None:
+        return [], float('inf')
+
+    # Łańcuch krawędzi hierarchii: start -> węzeł spotkania -> koniec
+    chain = []
+    current_node = meeting_node
+    while current_node != -1:
+        chain.append(current_node)
+        current_node = previous_nodes[0][current_node]
+    chain.reverse()
+    current_node = previous_nodes[1][meeting_node]
+    while current_node != -1:
+        chain.append(current_node)
+        current_node = previous_nodes[1][current_node]
+
+    nodes = [chain[0]]
+    for u, v in zip(chain, chain[1:]):
+        nodes.extend(hierarchy.unpack(u, v)[1:])
+
+    return [names[node] for node in nodes], best
+
+
+if __name__ == "__main__":
+    import argparse
+    from app.db_handler import get_connection, get_data_fingerprint
+    from app.algorithms.csr_graph import CSRGraph
+
+    parser = argparse.ArgumentParser(description="Buduje hierarchię kontrakcji dla bazy danych.")
+    parser.add_argument("--db", required=True, help="Ścieżka do bazy danych SQLite")
+    args = parser.parse_args()
+
+    conn = get_connection(args.db)
+    graph = CSRGraph.from_database(conn)
+    fingerprint = get_data_fingerprint(conn)
+
+    hierarchy_path = args.db + ".ch.npz"
+    hierarchy = load_or_build_hierarchy(graph, hierarchy_path, fingerprint)
+    print(f"Hierarchia kontrakcji: {graph.node_count} węzłów, {hierarchy.shortcut_count} skrótów -> {hierarchy_path}")
@@ -0,0 +1,292 @@
+import numpy as np
+
+# Klucze ``derived`` zależne tylko od struktury grafu (zachowywane przy zmianie wag)
+STRUCTURAL_KEYS = ("node_of_city",)
+
+# Szacunkowy rozmiar list sąsiedztwa Pythona (``CSRGraph.adjacency``) na krawędź w bajtach,
+# zmierzony narzędziem tracemalloc na syntetycznej sieci 100 000 miast
+ADJACENCY_BYTES_PER_EDGE = 115
+
+# Klucze ``derived`` zależne od współrzędnych ``projected`` (usuwane przy ich zmianie)
+PROJECTION_KEYS = ("heuristic_scale:euclidean",)
+
+# Klucz ``derived`` z odciskiem danych bazy, z której zbudowano graf (usuwany przy zmianie wag)
+FINGERPRINT_KEY = "fingerprint"
+
+# Klucze ``derived`` z hierarchią kontrakcji i jej plikiem (ścieżka, odcisk); zdefiniowane tutaj,
+# aby moduły czytające je nie importowały ``app.algorithms.contraction`` przed wyborem algorytmu CH
+HIERARCHY_KEY = "contraction_hierarchy"
+HIERARCHY_FILE_KEY = "contraction_hierarchy_file"
+
+
+class CSRGraph:
+    """
+    Zwarty graf w formacie CSR (Compressed Sparse Row).
+
+    Węzły mają identyfikatory całkowite 0..n-1. Sąsiedzi węzła ``u`` to
+    ``targets[offsets[u]:offsets[u + 1]]``, a wagi krawędzi leżą pod tymi
+    samymi indeksami w ``weights``. Indeks ``names``/``index`` tłumaczy
+    nazwy miast na identyfikatory i z powrotem. Opcjonalna tablica
+    ``coordinates`` przechowuje współrzędne geograficzne (lon, lat) węzłów,
+    a ``projected`` współrzędne w metrycznym CRS mapy.
+    """
+
+    def __init__(self, names, offsets, targets, weights, city_ids=None, directed=False, coordinates=None):
+        self.names = list(names)
+        self.index = {name: node for node, name in enumerate(self.names)}
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        if city_ids is None:
+            city_ids = np.arange(len(self.names))
+        self.city_ids = np.asarray(city_ids, dtype=np.int64)
+        self.directed = directed
+        self.coordinates = None if coordinates is None else np.asarray(coordinates, dtype=np.float64)
+        self._projected = None
+        # Dane pochodne wyliczane leniwie przez algorytmy (np. skale heurystyk)
+        self.derived = {}
+        # Licznik zmian wag (``set_edge_weight``) - pozwala wykryć nieaktualne wyniki
+        self.version = 0
+        self._adjacency = None
+        self._reverse = None
+
+    @classmethod
+    def from_edges(cls, names, edges, city_ids=None, directed=False, coordinates=None):
+        """
+        Buduje graf z listy krawędzi.
+
+        :param names: Nazwy węzłów (pozycja na liście = identyfikator węzła)
+        :param edges: Iterowalna kolekcja krotek (u, v, waga) z identyfikatorami węzłów
+        :param city_ids: Opcjonalne identyfikatory miast z bazy danych
+        :param directed: Czy krawędzie są skierowane
+        :param coordinates: Opcjonalna tablica (n, 2) współrzędnych (lon, lat)
+        :return: Obiekt CSRGraph
+        """
+        edges = np.asarray(list(edges), dtype=np.float64).reshape(-1, 3)
+        sources = edges[:, 0].astype(np.int64)
+        targets = edges[:, 1].astype(np.int64)
+        weights = edges[:, 2]
+
+        if not directed:
+            sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+            weights = np.concatenate([weights, weights])
+
+        # Sortowanie krawędzi po węźle źródłowym i wyznaczenie przesunięć
+        order = np.argsort(sources, kind="stable")
+        counts = np.bincount(sources, minlength=len(names))
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        return cls(names, offsets, targets[order], weights[order], city_ids, directed, coordinates)
+
+    @classmethod
+    def from_rows(cls, cities, connections, directed=False):
+        """
+        Buduje graf bezpośrednio z wierszy tabel ``cities`` i ``connections``.
+
+        :param cities: Wiersze (id, city_name, longitude, latitude)
+        :param connections: Wiersze (id, city_a, city_b, distance)
+        :param directed: Czy połączenia są skierowane
+        :return: Obiekt CSRGraph
+        """
+        names = [city[1] for city in cities]
+        city_ids = [city[0] for city in cities]
+        coordinates = [(city[2], city[3]) for city in cities]  # (lon, lat)
+        node_of_city = {city_id: node for node, city_id in enumerate(city_ids)}
+
+        # Połączenia wskazujące na nieistniejące miasta są pomijane
+        edges = [
+            (node_of_city[city_a], node_of_city[city_b], distance)
+            for _, city_a, city_b, distance in connections
+            if city_a in node_of_city and city_b in node_of_city
+        ]
+        return cls.from_edges(names, edges, city_ids, directed, coordinates)
+
+    @classmethod
+    def from_database(cls, conn, directed=False, bbox=None):
+        """
+        Buduje graf z otwartego połączenia z bazą danych.
+
+        Połączenia są czytane strumieniowo, bez wczytywania całej tabeli do listy.
+
+        :param bbox: Opcjonalny prostokąt (min_lon, min_lat, max_lon, max_lat) - wczytywany jest
+            tylko fragment grafu z miastami w jego wnętrzu
+        """
+        from app.db_handler import iter_cities, iter_connections
+
+        return cls.from_rows(list(iter_cities(conn, bbox)), iter_connections(conn, bbox), directed)
+
+    @classmethod
+    def from_networkx(cls, graph):
+        """Konwertuje graf NetworkX (z atrybutem ``weight``) na CSRGraph."""
+        names = list(graph.nodes)
+        index = {name: node for node, name in enumerate(names)}
+        edges = [(index[u], index[v], data.get("weight", 1)) for u, v, data in graph.edges(data=True)]
+        return cls.from_edges(names, edges, directed=graph.is_directed())
+
+    def reverse(self):
+        """
+        Zwraca graf z odwróconymi krawędziami.
+
+        Dla grafu nieskierowanego jest to ten sam obiekt.
+        """
+        if not self.directed:
+            return self
+        if self._reverse is None:
+            edges = np.column_stack([self.targets, self.edge_sources(), self.weights])
+            self._reverse = CSRGraph.from_edges(self.names, edges, self.city_ids, True, self.coordinates)
+            self._reverse.projected = self.projected
+        return self._reverse
+
+    @property
+    def projected(self):
+        return self._projected
+
+    @projected.setter
+    def projected(self, projected):
+        """Ustawia współrzędne rzutowane; dane pochodne od poprzednich współrzędnych są usuwane."""
+        self._projected = projected
+        for key in PROJECTION_KEYS:
+            self.derived.pop(key, None)
+        if self._reverse is not None:
+            self._reverse.projected = projected
+
+    def edge_sources(self):
+        """Zwraca tablicę węzłów źródłowych równoległą do ``targets``."""
+        return np.repeat(np.arange(self.node_count, dtype=np.int32), np.diff(self.offsets))
+
+    @property
+    def node_count(self):
+        return len(self.names)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    @property
+    def nbytes(self):
+        """
+        Szacowany rozmiar grafu w pamięci w bajtach: tablice, listy sąsiedztwa i graf odwrotny.
+
+        Nie obejmuje nazw miast, współrzędnych ``projected`` ani danych ``derived``.
+        """
+        size = self._csr_nbytes() + self.city_ids.nbytes
+        if self.coordinates is not None:
+            size += self.coordinates.nbytes
+        # Graf odwrotny (tylko dla grafu skierowanego) współdzieli z grafem identyfikatory i współrzędne
+        if self._reverse is not None:
+            size += self._reverse._csr_nbytes()
+        return size
+
+    def _csr_nbytes(self):
+        """Rozmiar tablic CSR i zbudowanych z nich list sąsiedztwa."""
+        size = self.offsets.nbytes + self.targets.nbytes + self.weights.nbytes
+        if self._adjacency is not None:
+            size += self.edge_count * ADJACENCY_BYTES_PER_EDGE
+        return size
+
+    def adjacency(self):
+        """
+        Zwraca listy sąsiedztwa w postaci list Pythona.
+
+        Pętla przeszukiwania w czystym Pythonie czyta elementy list znacznie
+        szybciej niż pojedyncze elementy tablic NumPy, więc widok jest
+        budowany raz i zapamiętywany. Jest to świadomy kompromis: na sieci
+        100 000 miast pełne przeszukiwanie Dijkstry po tych listach trwa
+        0,28 s, a po wycinkach ``targets``/``weights`` 0,55 s, ale listy
+        zajmują około 115 B na krawędź (tablice CSR - 20 B). Rozmiar widoku
+        jest wliczany do ``nbytes``, a więc do budżetu pamięci załadowanych
+        krajów (``app.dataset_manager``), a ``benchmarks.run`` mierzy jego budowę
+        jako osobny etap "adjacency".
+        """
+        if self._adjacency is None:
+            offsets = self.offsets.tolist()
+            targets = self.targets.tolist()
+            weights = self.weights.tolist()
+            self._adjacency = [
+                (targets[offsets[u]:offsets[u + 1]], weights[offsets[u]:offsets[u + 1]])
+                for u in range(self.node_count)
+            ]
+        return self._adjacency
+
+    def neighbors(self, node):
+        """Zwraca identyfikatory sąsiadów węzła."""
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def edge_weight(self, u, v):
+        """Zwraca wagę krawędzi u -> v lub ``inf``, jeśli krawędź nie istnieje."""
+        start, stop = self.offsets[u], self.offsets[u + 1]
+        matches = np.nonzero(self.targets[start:stop] == v)[0]
+        if len(matches) == 0:
+            return float("inf")
+        return float(self.weights[start:stop][matches].min())
+
+    def set_edge_weight(self, u, v, weight):
+        """
+        Zmienia wagę krawędzi u -> v (w grafie nieskierowanym również v -> u).
+
+        Waga ``inf`` usuwa krawędź - struktura CSR pozostaje bez zmian, ale
+        algorytmy nigdy jej nie relaksują. Równoległe krawędzie między tymi
+        samymi węzłami dostają tę samą wagę. Tablice wczytane tylko do odczytu
+        (np. ze zrzutu binarnego) są przy pierwszej zmianie kopiowane do pamięci.
+        Dane pochodne zależne od wag są usuwane, a licznik ``version`` rośnie -
+        także w zapamiętanym grafie odwrotnym (``reverse``), który dostaje tę
+        samą zmianę wagi.
+
+        :return: Poprzednia waga krawędzi (najmniejsza z równoległych)
+        :raises KeyError: Jeśli krawędź nie istnieje
+        """
+        if not self._has_edge(u, v):
+            raise KeyError(f"Brak krawędzi {self.names[u]} -> {self.names[v]}")
+        old_weight = self.edge_weight(u, v)
+        if not self.weights.flags.writeable:
+            self.weights = self.weights.copy()
+
+        for a, b in ((u, v), (v, u)) if not self.directed else ((u, v),):
+            self._assign_weight(a, b, weight)
+        self._weights_changed()
+        if self._reverse is not None:
+            self._reverse._assign_weight(v, u, weight)
+            self._reverse._weights_changed()
+            self._reverse.version = self.version
+        return old_weight
+
+    def _weights_changed(self):
+        # Zostają tylko dane zależne od struktury grafu, a nie od wag
+        self.derived = {key: value for key, value in self.derived.items() if key in STRUCTURAL_KEYS}
+        self.version += 1
+
+    def _has_edge(self, u, v):
+        return bool(np.any(self.targets[self.offsets[u]:self.offsets[u + 1]] == v))
+
+    def _assign_weight(self, u, v, weight):
+        start = self.offsets[u]
+        positions = np.nonzero(self.targets[start:self.offsets[u + 1]] == v)[0]
+        self.weights[start + positions] = weight
+        if self._adjacency is not None:
+            weights = self._adjacency[u][1]
+            for position in positions.tolist():
+                weights[position] = weight
+
+    def node_id(self, name):
+        """Zwraca identyfikator węzła o podanej nazwie."""
+        return self.index[name]
+
+    def node_of_city(self, city_id):
+        """Zwraca identyfikator węzła dla identyfikatora miasta z tabeli ``cities``."""
+        if "node_of_city" not in self.derived:
+            self.derived["node_of_city"] = {city: node for node, city in enumerate(self.city_ids.tolist())}
+        return self.derived["node_of_city"][city_id]
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return self.node_count
+
+
+def as_csr_graph(graph):
+    """Zwraca graf w postaci CSRGraph, konwertując w razie potrzeby graf NetworkX."""
+    if isinstance(graph, CSRGraph):
+        return graph
+    return CSRGraph.from_networkx(graph)
@@ -1,20 +1,79 @@
+import functools
 import heapq
-import networkx as nx
+from app.algorithms.csr_graph import CSRGraph, as_csr_graph
+from app.algorithms.heap import IndexedHeap
+from app.algorithms.trace import TRACE_NONE, run_search
+from app.algorithms.progress import PROGRESS_INTERVAL
 
-def dijkstra(graph, start, end):
+# Klucz w słowniku ``stats``: jeśli jest w nim obecny, przeszukiwanie CSRGraph zapisuje pod nim
+# ``SearchSpace`` z odległościami ustalonych węzłów (korzysta z tego pamięć podręczna zapytań)
+SEARCH_SPACE_KEY = "search_space"
+
+
+class SearchSpace:
+    """
+    Odległości i poprzedniki węzłów z przeszukiwania Dijkstry od węzła ``source``.
+
+    Przeszukiwanie ustala węzły w kolejności odległości, więc po zatrzymaniu
+    w celu odległości mniejsze niż ``bound`` (odległość celu) są ostateczne.
+    Jeśli cel był nieosiągalny, ``bound`` to ``inf`` - przeszukana została cała
+    składowa, a węzły spoza ``distances`` są nieosiągalne.
+    """
+
+    def __init__(self, source, distances, previous_nodes, bound):
+        self.source = source
+        self.distances = distances
+        self.previous_nodes = previous_nodes
+        self.bound = bound
+
+    def path_to(self, target):
+        """
+        Zwraca ścieżkę (identyfikatory węzłów) i koszt dojścia do węzła ``target``.
+
+        :return: Lista węzłów i koszt, ([], inf) dla węzła nieosiągalnego
+            lub None, jeśli przeszukiwanie nie ustaliło węzła
+        """
+        distance = self.distances.get(target, float('inf'))
+        if distance >= self.bound:
+            if self.bound == float('inf'):
+                return [], float('inf')
+            return None
+        path = []
+        node = target
+        while node != -1:
+            path.append(node)
+            node = self.previous_nodes[node]
+        path.reverse()
+        return path, distance
+
+def dijkstra(graph, start, end, stats=None, trace=TRACE_NONE, progress=None):
     """
     Implementacja algorytmu Dijkstry.
 
-    :param graph: Obiekt grafu (NetworkX)
+    :param graph: Obiekt grafu (NetworkX lub CSRGraph)
     :param start: Węzeł początkowy
     :param end: Węzeł końcowy
+    :param stats: Opcjonalny słownik, do którego zapisywana jest liczba ustalonych węzłów ("settled")
+        i poprawionych odległości ("relaxed"); dla CSRGraph także ``SearchSpace``, jeśli słownik
+        zawiera klucz SEARCH_SPACE_KEY
+    :param trace: Tryb zapisu kroków: "none" (domyślnie), "list" lub "lazy" (iterator)
+    :param progress: Opcjonalna funkcja progress(ustalone) wywoływana co PROGRESS_INTERVAL węzłów;
+        zgłoszenie w niej wyjątku SearchCancelled przerywa przeszukiwanie
     :return: Najkrótsza ścieżka jako lista węzłów, całkowity koszt, kroki algorytmu
     """
+    if isinstance(graph, CSRGraph):
+        return run_search(functools.partial(_dijkstra_csr, graph, start, end), trace, stats, progress)
+    return run_search(functools.partial(_dijkstra_networkx, graph, start, end), trace, stats, progress)
+
+
+def _dijkstra_networkx(graph, start, end, stats=None, record=False, progress=None):
+    """Wariant algorytmu Dijkstry dla grafu NetworkX (generator kroków, patrz ``run_search``)."""
     distances = {node: float('inf') for node in graph.nodes}
     distances[start] = 0
     previous_nodes = {node: None for node in graph.nodes}
     priority_queue = [(0, start)]
-    steps = []
+    settled = 0
+    relaxed = 0
 
     while priority_queue:
         current_distance, current_node = heapq.heappop(priority_queue)
@@ -24,6 +83,9 @@ def dijkstra(graph, start, end):
 
         if current_distance > distances[current_node]:
             continue
+        settled += 1
+        if progress is not None and settled % PROGRESS_INTERVAL == 0:
+            progress(settled)
 
         for neighbor in graph.neighbors(current_node):
             weight = graph[current_node][neighbor]['weight']
@@ -33,10 +95,16 @@ def dijkstra(graph, start, end):
                 distances[neighbor] = distance
                 previous_nodes[neighbor] = current_node
                 heapq.heappush(priority_queue, (distance, neighbor))
-                steps.append((current_node, neighbor, weight))
+                relaxed += 1
+                if record:
+                    yield current_node, neighbor, weight
+
+    if stats is not None:
+        stats["settled"] = settled
+        stats["relaxed"] = relaxed
 
     if distances[end] == float('inf'):
-        return [], float('inf'), steps
+        return [], float('inf')
 
     path = []
     current_node = end
@@ -45,4 +113,139 @@ def dijkstra(graph, start, end):
         current_node = previous_nodes[current_node]
     path.reverse()
 
-    return path, distances[end], steps
+    return path, distances[end]
+
+
+def _dijkstra_csr(graph, start, end, stats=None, record=False, progress=None):
+    """
+    Wariant algorytmu Dijkstry dla grafu CSRGraph (generator kroków, patrz ``run_search``).
+
+    Odległości i poprzedniki są trzymane w słownikach tylko dla odwiedzonych
+    węzłów, a kolejka zawiera identyfikatory całkowite, więc koszt jednego
+    wywołania nie zależy od rozmiaru całego grafu.
+    """
+    names = graph.names
+    source = graph.node_id(start)
+    target = graph.node_id(end)
+    adjacency = graph.adjacency()
+
+    distances = {source: 0}
+    previous_nodes = {source: -1}
+    priority_queue = [(0, source)]
+    settled = 0
+    relaxed = 0
+
+    while priority_queue:
+        current_distance, current_node = heapq.heappop(priority_queue)
+
+        if current_node == target:
+            break
+
+        if current_distance > distances[current_node]:
+            continue
+        settled += 1
+        if progress is not None and settled % PROGRESS_INTERVAL == 0:
+            progress(settled)
+
+        neighbors, weights = adjacency[current_node]
+        for neighbor, weight in zip(neighbors, weights):
+            distance = current_distance + weight
+
+            if distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance
+                previous_nodes[neighbor] = current_node
+                heapq.heappush(priority_queue, (distance, neighbor))
+                relaxed += 1
+                if record:
+                    yield names[current_node], names[neighbor], weight
+
+    if stats is not None:
+        stats["settled"] = settled
+        stats["relaxed"] = relaxed
+        if SEARCH_SPACE_KEY in stats:
+            bound = distances.get(target, float('inf'))
+            stats[SEARCH_SPACE_KEY] = SearchSpace(source, distances, previous_nodes, bound)
+
+    if target not in distances:
+        return [], float('inf')
+
+    path = []
+    current_node = target
+    while current_node != -1:
+        path.append(names[current_node])
+        current_node = previous_nodes[current_node]
+    path.reverse()
+
+    return path, distances[target]
+
+
+def dijkstra_indexed(graph, start, end, stats=None, trace=TRACE_NONE, progress=None):
+    """
+    Algorytm Dijkstry z indeksowaną kolejką priorytetową (``IndexedHeap``).
+
+    Poprawa odległości zmniejsza klucz węzła już obecnego w kolejce zamiast
+    dodawać nowy wpis, więc kolejka nie zawiera nieaktualnych wpisów, a jej
+    rozmiar jest ograniczony liczbą węzłów. Opłaca się na grafach gęstych;
+    na rzadkich sieciach drogowych ``dijkstra`` z ``heapq`` jest szybszy
+    (porównanie: ``python -m benchmarks.heap``). Parametry i wynik jak
+    w ``dijkstra``; graf NetworkX jest konwertowany na CSRGraph.
+    """
+    graph = as_csr_graph(graph)
+    return run_search(functools.partial(_dijkstra_indexed, graph, start, end), trace, stats, progress)
+
+
+def _dijkstra_indexed(graph, start, end, stats=None, record=False, progress=None):
+    """Wariant ``_dijkstra_csr`` z kolejką ze zmniejszaniem klucza (generator kroków, patrz ``run_search``)."""
+    names = graph.names
+    source = graph.node_id(start)
+    target = graph.node_id(end)
+    adjacency = graph.adjacency()
+
+    distances = {source: 0}
+    previous_nodes = {source: -1}
+    queue = IndexedHeap(graph.node_count)
+    queue.push(source, 0)
+    settled = 0
+    relaxed = 0
+
+    while queue:
+        current_distance, current_node = queue.pop()
+
+        if current_node == target:
+            break
+
+        # Każdy węzeł jest zdejmowany z kolejki tylko raz, z ostateczną odległością
+        settled += 1
+        if progress is not None and settled % PROGRESS_INTERVAL == 0:
+            progress(settled)
+
+        neighbors, weights = adjacency[current_node]
+        for neighbor, weight in zip(neighbors, weights):
+            distance = current_distance + weight
+
+            if distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance
+                previous_nodes[neighbor] = current_node
+                queue.push(neighbor, distance)
+                relaxed += 1
+                if record:
+                    yield names[current_node], names[neighbor], weight
+
+    if stats is not None:
+        stats["settled"] = settled
+        stats["relaxed"] = relaxed
+        if SEARCH_SPACE_KEY in stats:
+            bound = distances.get(target, float('inf'))
+            stats[SEARCH_SPACE_KEY] = SearchSpace(source, distances, previous_nodes, bound)
+
+    if target not in distances:
+        return [], float('inf')
+
+    path = []
+    current_node = target
+    while current_node != -1:
+        path.append(names[current_node])
+        current_node = previous_nodes[current_node]
+    path.reverse()
+
+    return path, distances[target]
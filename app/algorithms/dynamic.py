@@ -0,0 +1,208 @@
+"""
+Zmiany wag krawędzi z przyrostową naprawą drzew najkrótszych ścieżek.
+
+Drzewa najkrótszych ścieżek (od jednego źródła do wszystkich węzłów) są
+przypięte do grafu w ``graph.derived[TREES_KEY]``. Po zmianie wagi krawędzi
+każde drzewo jest naprawiane lokalnie (wariant algorytmu Ramalingama-Repsa):
+
+* zmniejszenie wagi - nowe, krótsze odległości są propagowane algorytmem
+  Dijkstry od końca krawędzi, tylko przez węzły, których odległość maleje;
+* zwiększenie wagi (lub usunięcie) krawędzi drzewa - odległości tracą tylko
+  węzły z poddrzewa pod tą krawędzią; dostają one najlepszą odległość przez
+  sąsiadów spoza poddrzewa, a następnie są poprawiane algorytmem Dijkstry.
+
+Zmiana krawędzi spoza drzewa, która ją wydłuża, nie wymaga żadnej pracy.
+"""
+import heapq
+from app.algorithms.csr_graph import as_csr_graph
+from app.algorithms.progress import PROGRESS_INTERVAL
+
+# Klucz w ``graph.derived`` ze słownikiem węzeł źródłowy -> ShortestPathTree
+TREES_KEY = "shortest_path_trees"
+
+
+class ShortestPathTree:
+    """
+    Drzewo najkrótszych ścieżek od węzła ``source`` do wszystkich węzłów grafu.
+
+    ``distances[x]`` to odległość do węzła ``x`` (``inf``, gdy jest nieosiągalny),
+    a ``parents[x]`` jego poprzednik na najkrótszej ścieżce (-1 dla źródła
+    i węzłów nieosiągalnych). ``relaxed`` to liczba poprawionych odległości
+    przy budowie drzewa.
+    """
+
+    def __init__(self, graph, source, progress=None):
+        """
+        :param graph: Obiekt CSRGraph
+        :param source: Węzeł źródłowy
+        :param progress: Opcjonalna funkcja progress(ustalone) wywoływana co PROGRESS_INTERVAL węzłów;
+            zgłoszenie w niej wyjątku SearchCancelled przerywa budowę drzewa
+        """
+        self.graph = graph
+        self.source = source
+        node_count = graph.node_count
+        self.distances = [float('inf')] * node_count
+        self.parents = [-1] * node_count
+        self.distances[source] = 0
+        self.relaxed = self._propagate([(0, source)], progress=progress)
+        self.version = graph.version
+
+    def _propagate(self, priority_queue, touched=None, progress=None):
+        """
+        Algorytm Dijkstry od węzłów z kolejki, poprawiający tylko odległości, które maleją.
+
+        :return: Liczba poprawionych odległości
+        """
+        heapq.heapify(priority_queue)
+        adjacency = self.graph.adjacency()
+        distances = self.distances
+        parents = self.parents
+        relaxed = 0
+        settled = 0
+        while priority_queue:
+            current_distance, current_node = heapq.heappop(priority_queue)
+            if current_distance > distances[current_node]:
+                continue
+            settled += 1
+            if progress is not None and settled % PROGRESS_INTERVAL == 0:
+                progress(settled)
+            neighbors, weights = adjacency[current_node]
+            for neighbor, weight in zip(neighbors, weights):
+                distance = current_distance + weight
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    parents[neighbor] = current_node
+                    heapq.heappush(priority_queue, (distance, neighbor))
+                    relaxed += 1
+                    if touched is not None:
+                        touched.add(neighbor)
+        return relaxed
+
+    def _edges(self, u, v):
+        """Kierunki krawędzi u - v, których dotyczy zmiana."""
+        return ((u, v),) if self.graph.directed else ((u, v), (v, u))
+
+    def repair(self, u, v, old_weight, new_weight):
+        """
+        Naprawia drzewo po zmianie wagi krawędzi u -> v (już zapisanej w grafie).
+
+        :return: Liczba węzłów, których odległość lub poprzednik zostały zmienione
+        """
+        touched = set()
+        distances = self.distances
+        if new_weight < old_weight:
+            queue = []
+            for a, b in self._edges(u, v):
+                if distances[a] + new_weight < distances[b]:
+                    distances[b] = distances[a] + new_weight
+                    self.parents[b] = a
+                    queue.append((distances[b], b))
+                    touched.add(b)
+            self._propagate(queue, touched)
+        elif new_weight > old_weight:
+            for a, b in self._edges(u, v):
+                if self.parents[b] == a:
+                    touched |= self._reattach_subtree(b)
+        self.version = self.graph.version
+        return len(touched)
+
+    def _reattach_subtree(self, root):
+        """Wyznacza na nowo odległości węzłów poddrzewa o korzeniu ``root``."""
+        adjacency = self.graph.adjacency()
+        incoming = self.graph.reverse().adjacency()
+        distances = self.distances
+        parents = self.parents
+
+        # Poddrzewo: potomkowie to sąsiedzi, których poprzednikiem jest bieżący węzeł
+        subtree = [root]
+        for node in subtree:
+            for neighbor in adjacency[node][0]:
+                if parents[neighbor] == node:
+                    subtree.append(neighbor)
+        for node in subtree:
+            distances[node] = float('inf')
+            parents[node] = -1
+
+        # Najlepsze połączenie z częścią drzewa, której zmiana nie dotyczy
+        queue = []
+        for node in subtree:
+            neighbors, weights = incoming[node]
+            for neighbor, weight in zip(neighbors, weights):
+                if distances[neighbor] + weight < distances[node]:
+                    distances[node] = distances[neighbor] + weight
+                    parents[node] = neighbor
+            if distances[node] < float('inf'):
+                queue.append((distances[node], node))
+        self._propagate(queue)
+        return set(subtree)
+
+    def path_to(self, target):
+        """
+        Zwraca ścieżkę (identyfikatory węzłów) i koszt dojścia do węzła ``target``.
+
+        :return: Lista węzłów i koszt lub ([], inf), jeśli węzeł jest nieosiągalny
+        """
+        if self.distances[target] == float('inf'):
+            return [], float('inf')
+        path = []
+        node = target
+        while node != -1:
+            path.append(node)
+            node = self.parents[node]
+        path.reverse()
+        return path, self.distances[target]
+
+
+def shortest_path_tree(graph, source, progress=None):
+    """
+    Zwraca drzewo najkrótszych ścieżek od miasta ``source``, budując je przy pierwszym użyciu.
+
+    Drzewo jest przypięte do grafu i naprawiane przy każdej zmianie wagi
+    wykonanej przez ``update_edge_weight``.
+
+    :param graph: Obiekt grafu (CSRGraph lub NetworkX)
+    :param source: Nazwa miasta początkowego
+    :param progress: Opcjonalna funkcja postępu budowy drzewa (patrz ``ShortestPathTree``)
+    """
+    graph = as_csr_graph(graph)
+    trees = graph.derived.setdefault(TREES_KEY, {})
+    node = graph.node_id(source)
+    tree = trees.get(node)
+    if tree is None or tree.version != graph.version:
+        tree = trees[node] = ShortestPathTree(graph, node, progress)
+    return tree
+
+
+def update_edge_weight(graph, city_a, city_b, weight, stats=None):
+    """
+    Zmienia wagę połączenia między miastami i naprawia przypięte drzewa najkrótszych ścieżek.
+
+    :param graph: Obiekt CSRGraph
+    :param city_a: Nazwa pierwszego miasta
+    :param city_b: Nazwa drugiego miasta
+    :param weight: Nowa waga (``inf`` usuwa połączenie)
+    :param stats: Opcjonalny słownik, do którego zapisywana jest liczba zmienionych węzłów
+        w każdym drzewie ("touched": źródło -> liczba)
+    :return: Łączna liczba węzłów zmienionych we wszystkich drzewach
+    :raises KeyError: Jeśli miasta nie są połączone
+    """
+    u = graph.node_id(city_a)
+    v = graph.node_id(city_b)
+    trees = graph.derived.get(TREES_KEY, {})
+    old_weight = graph.set_edge_weight(u, v, weight)
+    new_weight = graph.edge_weight(u, v)
+
+    touched = {}
+    for source, tree in trees.items():
+        touched[graph.names[source]] = tree.repair(u, v, old_weight, new_weight)
+    # set_edge_weight usuwa dane pochodne zależne od wag - naprawione drzewa wracają do grafu
+    graph.derived[TREES_KEY] = trees
+
+    if stats is not None:
+        stats["touched"] = touched
+    return sum(touched.values())
+
+
+def remove_edge(graph, city_a, city_b, stats=None):
+    """Usuwa połączenie między miastami (patrz ``update_edge_weight``)."""
+    return update_edge_weight(graph, city_a, city_b, float('inf'), stats)
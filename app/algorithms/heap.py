@@ -0,0 +1,146 @@
+"""
+Indeksowana kolejka priorytetowa (kopiec d-arny) z operacją zmniejszenia klucza.
+
+W przeciwieństwie do ``heapq`` z leniwym pomijaniem nieaktualnych wpisów
+każdy węzeł występuje w kopcu co najwyżej raz: poprawa odległości przesuwa
+istniejący wpis w górę zamiast dodawać nową krotkę. Kopiec ma więc najwyżej
+tyle elementów, ile jest węzłów na froncie przeszukiwania (a nie O(E)), nie
+tworzy krotek przy relaksacji, a remisy nie wymagają porównywania węzłów.
+
+Węzły to liczby całkowite 0..capacity-1. Kopiec jest przechowywany w dwóch
+płaskich listach (klucze i węzły na pozycjach kopca) oraz liście pozycji
+węzłów w kopcu.
+
+Kopiec jest napisany w Pythonie, a ``heapq`` w C, więc przy rzadkich sieciach
+drogowych (mało nieaktualnych wpisów) ``heapq`` pozostaje szybszy; indeksowany
+kopiec wygrywa na grafach gęstych, gdzie poprawy odległości są częste
+(wyniki: ``python -m benchmarks.heap``).
+"""
+
+# Liczba dzieci węzła kopca - przy 4 kopiec jest płytszy niż binarny, a przesuwanie
+# w górę (zmniejszanie klucza, częstsze niż zdejmowanie minimum) jest tańsze
+DEFAULT_ARITY = 4
+
+# Pozycja węzła, którego nie ma w kopcu
+ABSENT = -1
+
+
+class IndexedHeap:
+    """
+    Kopiec d-arny minimów nad węzłami 0..capacity-1 z operacją ``push`` zmniejszającą klucz.
+    """
+
+    def __init__(self, capacity, arity=DEFAULT_ARITY):
+        """
+        :param capacity: Liczba węzłów (identyfikatory 0..capacity-1)
+        :param arity: Liczba dzieci węzła kopca (co najmniej 2)
+        """
+        if arity < 2:
+            raise ValueError("Kopiec musi mieć co najmniej 2 dzieci na węzeł")
+        self.arity = arity
+        self.keys = []
+        self.nodes = []
+        self.position = [ABSENT] * capacity
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __bool__(self):
+        return bool(self.nodes)
+
+    def __contains__(self, node):
+        return self.position[node] != ABSENT
+
+    def peek(self):
+        """Zwraca parę (klucz, węzeł) o najmniejszym kluczu bez zdejmowania jej z kopca."""
+        return self.keys[0], self.nodes[0]
+
+    def push(self, node, key):
+        """
+        Dodaje węzeł lub zmniejsza jego klucz.
+
+        :return: True, jeśli węzeł został dodany lub jego klucz zmniejszony;
+            False, jeśli węzeł jest w kopcu z kluczem nie większym niż ``key``
+        """
+        keys = self.keys
+        nodes = self.nodes
+        position = self.position
+        index = position[node]
+        if index == ABSENT:
+            index = len(nodes)
+            keys.append(key)
+            nodes.append(node)
+        elif key >= keys[index]:
+            return False
+
+        # Przesunięcie w górę (wpisane tutaj - push jest wywoływany przy każdej relaksacji)
+        arity = self.arity
+        while index > 0:
+            parent = (index - 1) // arity
+            parent_key = keys[parent]
+            if parent_key <= key:
+                break
+            parent_node = nodes[parent]
+            keys[index] = parent_key
+            nodes[index] = parent_node
+            position[parent_node] = index
+            index = parent
+        keys[index] = key
+        nodes[index] = node
+        position[node] = index
+        return True
+
+    def pop(self):
+        """
+        Zdejmuje węzeł o najmniejszym kluczu.
+
+        :return: Para (klucz, węzeł)
+        :raises IndexError: Jeśli kopiec jest pusty
+        """
+        keys = self.keys
+        nodes = self.nodes
+        key = keys[0]
+        node = nodes[0]
+        self.position[node] = ABSENT
+        last_key = keys.pop()
+        last_node = nodes.pop()
+        if nodes:
+            self._sift_down(0, last_node, last_key)
+        return key, node
+
+    def clear(self):
+        """Usuwa wszystkie węzły z kopca."""
+        position = self.position
+        for node in self.nodes:
+            position[node] = ABSENT
+        self.keys.clear()
+        self.nodes.clear()
+
+    def _sift_down(self, index, node, key):
+        """Umieszcza węzeł o kluczu ``key`` na pozycji ``index`` lub niżej."""
+        keys = self.keys
+        nodes = self.nodes
+        position = self.position
+        arity = self.arity
+        size = len(nodes)
+        while True:
+            first = index * arity + 1
+            if first >= size:
+                break
+            # Dziecko o najmniejszym kluczu
+            smallest = first
+            smallest_key = keys[first]
+            for child in range(first + 1, min(first + arity, size)):
+                if keys[child] < smallest_key:
+                    smallest = child
+                    smallest_key = keys[child]
+            if smallest_key >= key:
+                break
+            child_node = nodes[smallest]
+            keys[index] = smallest_key
+            nodes[index] = child_node
+            position[child_node] = index
+            index = smallest
+        keys[index] = key
+        nodes[index] = node
+        position[node] = index
@@ -0,0 +1,82 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def great_circle(coordinates, target):
+    """
+    Odległości po ortodromie (wzór haversine) od wszystkich węzłów do węzła docelowego.
+
+    :param coordinates: Tablica (n, 2) współrzędnych (lon, lat) w stopniach
+    :param target: Identyfikator węzła docelowego
+    :return: Tablica odległości w kilometrach
+    """
+    return _edge_great_circle(coordinates, np.arange(len(coordinates)), target)
+
+
+def euclidean(coordinates, target):
+    """Odległości euklidesowe od wszystkich węzłów do węzła docelowego (współrzędne rzutowane)."""
+    delta = coordinates - coordinates[target]
+    return np.hypot(delta[:, 0], delta[:, 1])
+
+
+HEURISTICS = {
+    "great_circle": great_circle,
+    "euclidean": euclidean,
+}
+
+
+def _heuristic_coordinates(graph, kind):
+    if kind == "euclidean":
+        return graph.projected
+    return graph.coordinates
+
+
+def heuristic_scale(graph, kind):
+    """
+    Wyznacza współczynnik skalujący heurystykę do jednostek wag krawędzi.
+
+    Współczynnik to najmniejszy stosunek wagi krawędzi do odległości
+    geometrycznej między jej końcami. Dzięki temu heurystyka pozostaje
+    dopuszczalna i spójna niezależnie od jednostek (km w bazie, metry
+    w CRS mapy) oraz od zaokrągleń odległości zapisanych w tabeli.
+    Wynik jest zapamiętywany w ``graph.derived``; skala heurystyki
+    euklidesowej jest usuwana przy zmianie ``graph.projected``
+    (``PROJECTION_KEYS`` w ``app.algorithms.csr_graph``).
+    """
+    key = f"heuristic_scale:{kind}"
+    if key not in graph.derived:
+        coordinates = _heuristic_coordinates(graph, kind)
+        sources = graph.edge_sources()
+        if kind == "euclidean":
+            delta = coordinates[sources] - coordinates[graph.targets]
+            lengths = np.hypot(delta[:, 0], delta[:, 1])
+        else:
+            lengths = _edge_great_circle(coordinates, sources, graph.targets)
+        mask = lengths > 0
+        graph.derived[key] = float(np.min(graph.weights[mask] / lengths[mask])) if mask.any() else 0.0
+    return graph.derived[key]
+
+
+def _edge_great_circle(coordinates, sources, targets):
+    """Odległości haversine w kilometrach między parami węzłów (sources[i], targets[i])."""
+    lon, lat = np.radians(coordinates[:, 0]), np.radians(coordinates[:, 1])
+    h = (np.sin((lat[sources] - lat[targets]) / 2) ** 2
+         + np.cos(lat[sources]) * np.cos(lat[targets]) * np.sin((lon[sources] - lon[targets]) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+
+def potential(graph, target, kind="great_circle"):
+    """
+    Zwraca listę wartości heurystyki (dolnych ograniczeń odległości) do węzła docelowego.
+
+    Jeśli graf nie ma współrzędnych wymaganych przez heurystykę, zwracane są
+    zera, a A* sprowadza się do zwykłego algorytmu Dijkstry.
+    """
+    if kind not in HEURISTICS:
+        raise ValueError(f"Nieznana heurystyka: {kind}")
+    coordinates = _heuristic_coordinates(graph, kind)
+    if coordinates is None:
+        return [0.0] * graph.node_count
+    scale = heuristic_scale(graph, kind)
+    return (HEURISTICS[kind](coordinates, target) * scale).tolist()
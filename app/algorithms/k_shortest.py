@@ -0,0 +1,330 @@
+"""
+Trasy alternatywne: k najkrótszych ścieżek prostych (algorytm Yena)
+i zróżnicowane objazdy przez węzły pośrednie.
+
+Yen wyznacza kolejne ścieżki proste w kolejności rosnącego kosztu: dla
+każdego węzła poprzedniej ścieżki (węzła odgałęzienia) szuka najkrótszej
+ścieżki do celu, która nie wraca do początku ścieżki i nie powtarza
+odgałęzień już znalezionych ścieżek.
+
+Wszystkie te przeszukiwania kończą się w tym samym celu, więc raz
+zbudowane drzewo najkrótszych ścieżek do celu (patrz
+``app.algorithms.dynamic``) jest używane wielokrotnie:
+
+* pierwsza ścieżka to ścieżka w drzewie;
+* odległości w drzewie są dokładną heurystyką A* dla przeszukiwań
+  odgałęzień (zablokowanie węzłów i krawędzi odległości tylko wydłuża);
+* jeśli najlepsza dozwolona krawędź z węzła odgałęzienia prowadzi do
+  węzła, którego ścieżka w drzewie omija zablokowane węzły, ta ścieżka jest
+  optymalna i przeszukiwanie nie jest potrzebne - tak jest dla większości
+  odgałęzień.
+
+Dla grafu nieskierowanego z podaną pamięcią podręczną (``QueryCache``)
+drzewo jest przypięte do grafu i naprawiane przy zmianach wag, więc kolejne
+zapytania do tego samego celu (także zwykłe zapytania z tego miasta) nie
+budują go ponownie.
+
+Aby trasy były rzeczywiście różne, ścieżka jest przyjmowana tylko wtedy,
+gdy jej część wspólna z każdą przyjętą już trasą nie przekracza
+``max_overlap`` jej długości. Kolejne ścieżki Yena w sieci drogowej
+różnią się jednak zwykle pojedynczymi objazdami, więc przy takim limicie
+kandydatami są ścieżki s -> v -> t przez węzeł pośredni v, złożone z drzew
+najkrótszych ścieżek od źródła i do celu i uporządkowane według kosztu
+(metoda węzłów pośrednich, "via-node") - wystarczają do tego dwa pełne
+przeszukiwania. Część wspólna ścieżki przez v z najkrótszą trasą wynika
+z przodków v na tej trasie w obu drzewach, więc zbyt podobni kandydaci są
+odrzucani dla wszystkich węzłów naraz, bez budowania ścieżek.
+"""
+import heapq
+import numpy as np
+from app.algorithms.csr_graph import as_csr_graph
+from app.algorithms.dynamic import ShortestPathTree
+
+# Domyślna liczba kandydatów sprawdzanych przed poddaniem się (ogranicza czas przy ostrym limicie nakładania)
+DEFAULT_MAX_CANDIDATES = 5000
+
+
+def _target_tree(graph, target, cache, progress):
+    """Drzewo najkrótszych ścieżek do węzła ``target`` (``parents[x]`` to następny węzeł w stronę celu)."""
+    if graph.directed:
+        # Drzewa grafu odwrotnego nie są naprawiane przy zmianach wag, więc drzewo nie jest zapamiętywane
+        return ShortestPathTree(graph.reverse(), target, progress)
+    if cache is not None:
+        return cache.tree(graph, graph.names[target], progress)
+    return ShortestPathTree(graph, target, progress)
+
+
+def _edge_cost(adjacency, u, v):
+    neighbors, weights = adjacency[u]
+    return min(weight for neighbor, weight in zip(neighbors, weights) if neighbor == v)
+
+
+def _edges(path, directed):
+    """Krawędzie ścieżki (w grafie nieskierowanym bez kierunku)."""
+    if directed:
+        return list(zip(path, path[1:]))
+    return [(u, v) if u < v else (v, u) for u, v in zip(path, path[1:])]
+
+
+class _SpurSearch:
+    """Przeszukiwania odgałęzień z heurystyką i skrótami z drzewa najkrótszych ścieżek do celu."""
+
+    def __init__(self, graph, target, tree):
+        self.adjacency = graph.adjacency()
+        self.target = target
+        self.distances = tree.distances
+        self.next_hop = tree.parents
+        self.settled = 0
+        self.relaxed = 0
+        self.searches = 0
+        self.tree_hits = 0
+
+    def __call__(self, spur, blocked_nodes, blocked_next):
+        """
+        Najkrótsza ścieżka od ``spur`` do celu omijająca zablokowane węzły
+        i nie zaczynająca się krawędzią do węzłów z ``blocked_next``.
+
+        :return: Lista węzłów i koszt lub (None, inf), jeśli cel jest nieosiągalny
+        """
+        distances = self.distances
+        neighbors, weights = self.adjacency[spur]
+        best, best_cost = -1, float('inf')
+        for neighbor, weight in zip(neighbors, weights):
+            if neighbor in blocked_next or neighbor in blocked_nodes:
+                continue
+            cost = weight + distances[neighbor]
+            if cost < best_cost:
+                best, best_cost = neighbor, cost
+        if best == -1 or best_cost == float('inf'):
+            return None, float('inf')
+
+        # Ścieżka w drzewie od najlepszego sąsiada osiąga dolne ograniczenie kosztu, jeśli jest dozwolona
+        path = [spur]
+        node = best
+        next_hop = self.next_hop
+        while node != -1:
+            if node in blocked_nodes or node == spur:
+                break
+            path.append(node)
+            node = next_hop[node]
+        else:
+            self.tree_hits += 1
+            return path, best_cost
+        return self._search(spur, blocked_nodes, blocked_next)
+
+    def _search(self, spur, blocked_nodes, blocked_next):
+        """A* z odległościami z drzewa jako heurystyką (dopuszczalną i spójną)."""
+        self.searches += 1
+        adjacency = self.adjacency
+        heuristic = self.distances
+        target = self.target
+        costs = {spur: 0}
+        previous = {spur: -1}
+        queue = [(heuristic[spur], 0, spur)]
+        settled = set()
+        while queue:
+            _, cost, node = heapq.heappop(queue)
+            if node in settled:
+                continue
+            settled.add(node)
+            if node == target:
+                break
+            neighbors, weights = adjacency[node]
+            for neighbor, weight in zip(neighbors, weights):
+                if neighbor in blocked_nodes or neighbor in settled:
+                    continue
+                if node == spur and neighbor in blocked_next:
+                    continue
+                new_cost = cost + weight
+                if new_cost < costs.get(neighbor, float('inf')):
+                    costs[neighbor] = new_cost
+                    previous[neighbor] = node
+                    heapq.heappush(queue, (new_cost + heuristic[neighbor], new_cost, neighbor))
+                    self.relaxed += 1
+        self.settled += len(settled)
+        if target not in settled:
+            return None, float('inf')
+        path = []
+        node = target
+        while node != -1:
+            path.append(node)
+            node = previous[node]
+        path.reverse()
+        return path, costs[target]
+
+
+def _yen_paths(graph, source, target, tree, spur_search):
+    """
+    Generator kolejnych ścieżek prostych Yena (koszt, lista węzłów) w kolejności rosnącego kosztu.
+    """
+    adjacency = spur_search.adjacency
+    if tree.distances[source] == float('inf'):
+        return
+    # Pierwsza ścieżka prowadzi wzdłuż drzewa do celu
+    path = [source]
+    while path[-1] != target:
+        path.append(tree.parents[path[-1]])
+    cost = tree.distances[source]
+    found = []
+    candidates = []
+    seen = {tuple(path)}
+
+    while True:
+        found.append(path)
+        yield cost, path
+
+        # Odgałęzienia od każdego węzła ostatniej ścieżki (oprócz celu)
+        root_cost = 0
+        blocked_nodes = set()  # węzły korzenia przed węzłem odgałęzienia
+        sharing = found  # ścieżki o tym samym początku co bieżący korzeń
+        for index in range(len(path) - 1):
+            spur = path[index]
+            sharing = [other for other in sharing if len(other) > index + 1 and other[index] == spur]
+            blocked_next = {other[index + 1] for other in sharing}
+            spur_path, spur_cost = spur_search(spur, blocked_nodes, blocked_next)
+            if spur_path is not None:
+                candidate = path[:index] + spur_path
+                key = tuple(candidate)
+                if key not in seen:
+                    seen.add(key)
+                    heapq.heappush(candidates, (root_cost + spur_cost, candidate))
+            root_cost += _edge_cost(adjacency, spur, path[index + 1])
+            blocked_nodes.add(spur)
+
+        if not candidates:
+            return
+        cost, path = heapq.heappop(candidates)
+
+
+def _ancestors_on(parents, on_path):
+    """
+    Dla każdego węzła zwraca najbliższego przodka w drzewie (lub sam węzeł) leżącego na ścieżce.
+
+    Przodkowie są wyznaczani przeskokami wskaźników (po każdym kroku
+    wskaźnik sięga dwa razy wyżej), więc wystarcza O(log głębokości)
+    operacji na tablicach.
+
+    :param parents: Tablica poprzedników w drzewie (-1 dla korzenia i węzłów nieosiągalnych)
+    :param on_path: Maska węzłów ścieżki (korzeń drzewa musi na niej leżeć)
+    :return: Tablica przodków (-1 dla węzłów nieosiągalnych)
+    """
+    nodes = np.arange(len(parents))
+    ancestors = np.where(on_path, nodes, -1)
+    pointers = np.where(on_path | (parents == -1), nodes, parents)
+    unresolved = np.nonzero((ancestors == -1) & (pointers != nodes))[0]
+    while len(unresolved):
+        ancestors[unresolved] = ancestors[pointers[unresolved]]
+        pointers[unresolved] = pointers[pointers[unresolved]]
+        unresolved = unresolved[(ancestors[unresolved] == -1) & (pointers[unresolved] != unresolved)]
+    return ancestors
+
+
+def _via_paths(source, target, source_tree, target_tree, max_overlap):
+    """
+    Generator ścieżek prostych s -> v -> t złożonych z drzew od źródła i do celu,
+    w kolejności rosnącego kosztu przez węzeł pośredni v (pierwsza jest najkrótsza).
+
+    Ścieżka przez v pokrywa się z najkrótszą ścieżką P na odcinku od s do
+    ostatniego przodka v na P w drzewie od źródła oraz od ostatniego przodka v
+    na P w drzewie do celu do t. Węzły, dla których ta część przekracza
+    ``max_overlap`` długości ścieżki, są odrzucane od razu, bez budowania
+    ścieżek. Pomijane są też węzły leżące na już zwróconej ścieżce (ścieżka
+    przez nie byłaby taka sama) oraz ścieżki z zawracaniem, które nie są proste.
+    """
+    source_distances = np.asarray(source_tree.distances)
+    target_distances = np.asarray(target_tree.distances)
+    totals = source_distances + target_distances
+    if not np.isfinite(totals[source]):
+        return
+    shortest = [source]
+    while shortest[-1] != target:
+        shortest.append(target_tree.parents[shortest[-1]])
+    yield float(totals[source]), shortest
+
+    on_path = np.zeros(len(totals), dtype=bool)
+    on_path[shortest] = True
+    branch_from = _ancestors_on(np.asarray(source_tree.parents), on_path)
+    branch_to = _ancestors_on(np.asarray(target_tree.parents), on_path)
+    with np.errstate(invalid="ignore"):
+        shared = source_distances[branch_from] + target_distances[branch_to]
+        admissible = np.isfinite(totals) & ~on_path & (shared <= max_overlap * totals)
+    candidates = np.nonzero(admissible)[0]
+    covered = set(shortest)
+    for via in candidates[np.argsort(totals[candidates], kind="stable")].tolist():
+        if via in covered:
+            continue
+        path, _ = source_tree.path_to(via)
+        node = target_tree.parents[via]
+        while node != -1:
+            path.append(node)
+            node = target_tree.parents[node]
+        covered.update(path)
+        if len(set(path)) == len(path):
+            yield float(totals[via]), path
+
+
+def k_shortest_paths(graph, start, end, k=3, max_overlap=1.0, max_candidates=DEFAULT_MAX_CANDIDATES,
+                     stats=None, progress=None, cache=None):
+    """
+    Wyznacza do ``k`` tras, z których każde dwie dzielą najwyżej ``max_overlap`` długości.
+
+    Przy ``max_overlap`` równym 1.0 są to dokładnie k najkrótszych ścieżek
+    prostych (algorytm Yena). Przy ostrzejszym limicie kolejne ścieżki Yena
+    różnią się zwykle tylko drobnymi objazdami, więc kandydatami są ścieżki
+    przez węzeł pośredni złożone z drzew najkrótszych ścieżek od źródła
+    i do celu (metoda węzłów pośrednich) - pierwsza trasa jest zawsze
+    najkrótsza, kolejne są najtańszymi dostatecznie różnymi objazdami.
+
+    :param graph: Obiekt grafu (CSRGraph lub NetworkX)
+    :param start: Miasto początkowe
+    :param end: Miasto końcowe
+    :param k: Liczba tras
+    :param max_overlap: Największa dopuszczalna część długości trasy (0..1) wspólna z wcześniejszą trasą
+    :param max_candidates: Największa liczba sprawdzanych ścieżek-kandydatów
+    :param stats: Opcjonalny słownik, do którego zapisywane są liczby ustalonych węzłów ("settled")
+        i poprawionych odległości ("relaxed") w przeszukiwaniach odgałęzień Yena, liczba sprawdzonych
+        kandydatów ("candidates"), przeszukiwań ("spur_searches") i odgałęzień odczytanych z drzewa ("tree_spurs")
+    :param progress: Opcjonalna funkcja progress(liczba) wywoływana w trakcie budowy drzew (ustalone węzły)
+        i po każdym kandydacie (sprawdzeni kandydaci); zgłoszenie w niej wyjątku SearchCancelled
+        przerywa wyszukiwanie
+    :param cache: Opcjonalna pamięć podręczna (QueryCache), w której są trzymane drzewa najkrótszych ścieżek
+    :return: Lista par (ścieżka jako lista miast, koszt) w kolejności rosnącego kosztu
+    """
+    graph = as_csr_graph(graph)
+    source = graph.node_id(start)
+    target = graph.node_id(end)
+    target_tree = _target_tree(graph, target, cache, progress)
+    spur_search = _SpurSearch(graph, target, target_tree)
+    if max_overlap >= 1.0:
+        candidates = _yen_paths(graph, source, target, target_tree, spur_search)
+    else:
+        source_tree = ShortestPathTree(graph, source, progress) if graph.directed or cache is None \
+            else cache.tree(graph, start, progress)
+        candidates = _via_paths(source, target, source_tree, target_tree, max_overlap)
+
+    adjacency = spur_search.adjacency
+    routes = []
+    accepted_edges = []
+    checked = 0
+    for cost, path in candidates:
+        checked += 1
+        edges = _edges(path, graph.directed)
+        edge_costs = [_edge_cost(adjacency, u, v) for u, v in zip(path, path[1:])]
+        if all(
+            sum(weight for edge, weight in zip(edges, edge_costs) if edge in route_edges) <= max_overlap * cost
+            for route_edges in accepted_edges
+        ):
+            routes.append(([graph.names[node] for node in path], cost))
+            accepted_edges.append(set(edges))
+        if progress is not None:
+            progress(checked)
+        if len(routes) == k or checked >= max_candidates:
+            break
+
+    if stats is not None:
+        stats["settled"] = spur_search.settled
+        stats["relaxed"] = spur_search.relaxed
+        stats["candidates"] = checked
+        stats["spur_searches"] = spur_search.searches
+        stats["tree_spurs"] = spur_search.tree_hits
+    return routes
@@ -0,0 +1,6 @@
+# Co ile ustalonych węzłów algorytmy wywołują funkcję ``progress``
+PROGRESS_INTERVAL = 1000
+
+
+class SearchCancelled(Exception):
+    """Zgłaszany przez funkcję ``progress``, aby przerwać trwające przeszukiwanie."""
@@ -0,0 +1,108 @@
+"""
+Rejestr algorytmów wyszukiwania ścieżek.
+
+Algorytmy są rejestrowane w ``app.config.ALGORITHMS`` (nazwa -> ścieżka
+"moduł.funkcja"), a ich moduły importowane dopiero przy pierwszym użyciu.
+Każda funkcja algorytmu ma postać
+``algorytm(graph, start, end, stats=None, trace="none", progress=None)``
+i zwraca ścieżkę, koszt i kroki; ``run`` opakowuje wynik w ``SearchResult``
+z tymi samymi miarami dla każdego algorytmu, więc nowy algorytm wystarczy
+dopisać do ``ALGORITHMS``.
+"""
+import importlib
+import time
+from app import profiling
+from app.config import ALGORITHMS
+from app.algorithms.trace import TRACE_NONE
+
+# Zaimportowane funkcje algorytmów: ścieżka "moduł.funkcja" -> funkcja
+_functions = {}
+
+
+class SearchResult:
+    """
+    Wynik jednego wyszukiwania ścieżki.
+
+    ``steps`` to kroki algorytmu zgodne z trybem ``trace`` (pusta krotka dla
+    "none"), ``settled`` i ``relaxed`` to liczby ustalonych węzłów i poprawionych
+    odległości (0 dla wyników z pamięci podręcznej), a ``wall_time`` to czas
+    wyszukiwania w sekundach.
+    """
+
+    def __init__(self, algorithm, path, cost, steps=(), settled=0, relaxed=0, wall_time=0.0, cached=False):
+        self.algorithm = algorithm
+        self.path = path
+        self.cost = cost
+        self.steps = steps
+        self.settled = settled
+        self.relaxed = relaxed
+        self.wall_time = wall_time
+        self.cached = cached
+
+    def as_dict(self):
+        """Zwraca wynik (bez kroków) w postaci słownika gotowego do zapisu jako JSON."""
+        return {
+            "algorithm": self.algorithm,
+            "path": self.path,
+            "cost": self.cost if self.path else None,
+            "settled": self.settled,
+            "relaxed": self.relaxed,
+            "time_ms": round(self.wall_time * 1000, 3),
+            "cached": self.cached,
+        }
+
+
+def get_function(algorithm_path):
+    """Importuje (raz) funkcję algorytmu wskazaną ścieżką "moduł.funkcja"."""
+    function = _functions.get(algorithm_path)
+    if function is None:
+        module_name, function_name = algorithm_path.rsplit(".", 1)
+        function = _functions[algorithm_path] = getattr(importlib.import_module(module_name), function_name)
+    return function
+
+
+def algorithm_path(name):
+    """
+    Zwraca ścieżkę "moduł.funkcja" algorytmu o nazwie z ``ALGORITHMS``.
+
+    :raises ValueError: Jeśli algorytm nie jest zarejestrowany
+    """
+    if name not in ALGORITHMS:
+        raise ValueError(f"Nieznany algorytm: {name}")
+    return ALGORITHMS[name]
+
+
+def get_algorithm(name):
+    """Importuje funkcję algorytmu o nazwie z ``ALGORITHMS``."""
+    return get_function(algorithm_path(name))
+
+
+def run(name, graph, start, end, trace=TRACE_NONE, progress=None, cache=None):
+    """
+    Uruchamia algorytm o podanej nazwie i zwraca ``SearchResult``.
+
+    :param name: Nazwa algorytmu z ``ALGORITHMS``
+    :param graph: Obiekt grafu (CSRGraph lub NetworkX; pamięć podręczna wymaga CSRGraph)
+    :param start: Miasto początkowe
+    :param end: Miasto końcowe
+    :param trace: Tryb zapisu kroków: "none" (domyślnie), "list" lub "lazy"
+    :param progress: Opcjonalna funkcja postępu (patrz ``app.algorithms.progress``)
+    :param cache: Opcjonalna pamięć podręczna wyników (QueryCache)
+    :raises ValueError: Jeśli algorytm nie jest zarejestrowany
+    """
+    path = algorithm_path(name)
+    stats = {}
+    with profiling.span(f"wyszukiwanie: {name}", start=start, end=end):
+        started = time.perf_counter()
+        if cache is not None:
+            nodes, cost, steps = cache.search(graph, path, start, end, stats=stats, trace=trace, progress=progress)
+        else:
+            nodes, cost, steps = get_function(path)(graph, start, end, stats=stats, trace=trace, progress=progress)
+        wall_time = time.perf_counter() - started
+    # Liczniki są dodawane po przeszukiwaniu - pętle algorytmów nie są instrumentowane
+    profiling.count("settled", stats.get("settled", 0))
+    profiling.count("relaxed", stats.get("relaxed", 0))
+    return SearchResult(
+        name, nodes, cost, steps, stats.get("settled", 0), stats.get("relaxed", 0), wall_time,
+        stats.get("cached", False),
+    )
@@ -0,0 +1,59 @@
+# Tryby zapisu kroków (relaksacji krawędzi) algorytmów wyszukiwania ścieżek
+TRACE_NONE = "none"    # bez zapisu kroków - najszybsza ścieżka wykonania
+TRACE_LIST = "list"    # pełna lista kroków
+TRACE_LAZY = "lazy"    # iterator zwracający kroki na żądanie
+
+TRACE_MODES = (TRACE_NONE, TRACE_LIST, TRACE_LAZY)
+
+# Same kroki bez wyznaczania wyniku (ścieżka i koszt są None) - dla wyników
+# znanych już z pamięci podręcznej, których kroki są pobierane na żądanie
+TRACE_STEPS = "steps"
+
+
+def run_search(search, trace=TRACE_NONE, stats=None, progress=None):
+    """
+    Uruchamia przeszukiwanie w wybranym trybie zapisu kroków.
+
+    ``search(record=..., stats=..., progress=...)`` zwraca generator, który przy
+    ``record=True`` zwraca kolejne kroki (u, v, waga), a po zakończeniu
+    zwraca krotkę (ścieżka, koszt). W trybie ``TRACE_LAZY`` wynik jest
+    wyznaczany bez zapisu kroków, a kroki są odtwarzane ponownym, leniwie
+    wykonywanym przeszukiwaniem - w pamięci nigdy nie jest trzymany cały
+    zapis. Odtworzenie nie dostaje ``stats`` ani ``progress``, więc liczniki
+    opisują tylko przeszukiwanie, które wyznaczyło wynik.
+
+    :param search: Funkcja tworząca generator przeszukiwania
+    :param trace: Tryb zapisu kroków (TRACE_NONE, TRACE_LIST, TRACE_LAZY lub TRACE_STEPS)
+    :param stats: Opcjonalny słownik liczników przekazywany do przeszukiwania
+    :param progress: Opcjonalna funkcja postępu przekazywana do przeszukiwania
+    :return: Ścieżka, koszt, kroki (pusta krotka, lista lub iterator)
+    """
+    if trace == TRACE_NONE:
+        path, cost = _exhaust(search(record=False, stats=stats, progress=progress))
+        return path, cost, ()
+    if trace == TRACE_LIST:
+        steps = []
+        path, cost = _exhaust(search(record=True, stats=stats, progress=progress), steps.append)
+        return path, cost, steps
+    if trace == TRACE_LAZY:
+        path, cost = _exhaust(search(record=False, stats=stats, progress=progress))
+        return path, cost, _replay(search)
+    if trace == TRACE_STEPS:
+        return None, None, _replay(search)
+    raise ValueError(f"Nieznany tryb zapisu kroków: {trace}")
+
+
+def _exhaust(generator, on_step=None):
+    """Wykonuje generator do końca i zwraca jego wynik."""
+    while True:
+        try:
+            step = next(generator)
+        except StopIteration as stop:
+            return stop.value
+        if on_step is not None:
+            on_step(step)
+
+
+def _replay(search):
+    """Leniwie odtwarza kroki przeszukiwania (bez liczników i postępu)."""
+    yield from search(record=True, stats=None, progress=None)
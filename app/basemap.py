@@ -0,0 +1,167 @@
+import os
+import numpy as np
+from matplotlib.path import Path
+
+# Tolerancje uproszczenia geometrii (w jednostkach CRS mapy) dla kolejnych poziomów szczegółowości
+DEFAULT_TOLERANCES = (0, 250, 1000, 4000)
+# Wersja sposobu upraszczania; zmiana unieważnia pamięć podręczną zapisaną starszym kodem
+SIMPLIFICATION_VERSION = "coverage-1"
+
+
+class Basemap:
+    """
+    Rzutowana geometria mapy podkładowej w postaci ścieżek matplotlib.
+
+    ``levels`` to lista list ścieżek (po jednej na obiekt mapy) dla kolejnych
+    tolerancji uproszczenia z ``tolerances``; poziom 0 to geometria pełna
+    (lub uproszczona najmniej).
+    """
+
+    def __init__(self, crs, tolerances, levels):
+        self.crs = crs
+        self.tolerances = tuple(tolerances)
+        self.levels = levels
+
+    def paths_for_resolution(self, units_per_pixel):
+        """
+        Zwraca ścieżki najbardziej uproszczonego poziomu, którego tolerancja
+        nie przekracza rozmiaru piksela przy bieżącym powiększeniu.
+        """
+        level = 0
+        for index, tolerance in enumerate(self.tolerances):
+            if tolerance <= units_per_pixel:
+                level = index
+        return self.levels[level]
+
+    def save(self, path, key):
+        """Zapisuje geometrię do pliku ``.npz`` razem z kluczem ważności."""
+        arrays = {"key": np.array(key), "crs": np.array(self.crs), "tolerances": np.array(self.tolerances)}
+        for index, paths in enumerate(self.levels):
+            arrays[f"vertices_{index}"] = np.concatenate([p.vertices for p in paths]) if paths else np.empty((0, 2))
+            arrays[f"codes_{index}"] = (
+                np.concatenate([p.codes for p in paths]) if paths else np.empty(0, dtype=Path.code_type)
+            )
+            arrays[f"offsets_{index}"] = np.cumsum([0] + [len(p.vertices) for p in paths])
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Wczytuje geometrię zapisaną metodą ``save``; zwraca (Basemap, klucz)."""
+        with np.load(path) as data:
+            tolerances = data["tolerances"].tolist()
+            levels = []
+            for index in range(len(tolerances)):
+                vertices = data[f"vertices_{index}"]
+                codes = data[f"codes_{index}"]
+                offsets = data[f"offsets_{index}"].tolist()
+                levels.append([
+                    Path(vertices[start:stop], codes[start:stop])
+                    for start, stop in zip(offsets, offsets[1:])
+                ])
+            return cls(str(data["crs"]), tolerances, levels), str(data["key"])
+
+
+def _geometry_to_path(geometry):
+    """Zamienia (Multi)Polygon shapely na ścieżkę matplotlib (zewnętrzne pierścienie CCW, otwory CW)."""
+    from shapely.geometry.polygon import orient
+
+    polygons = getattr(geometry, "geoms", [geometry])
+    vertices = []
+    codes = []
+    for polygon in polygons:
+        if polygon.is_empty or polygon.geom_type != "Polygon":
+            continue
+        polygon = orient(polygon, 1.0)
+        for ring in [polygon.exterior, *polygon.interiors]:
+            coordinates = np.asarray(ring.coords)[:, :2]
+            ring_codes = np.full(len(coordinates), Path.LINETO, dtype=Path.code_type)
+            ring_codes[0] = Path.MOVETO
+            ring_codes[-1] = Path.CLOSEPOLY
+            vertices.append(coordinates)
+            codes.append(ring_codes)
+    if not vertices:
+        # Obiekt zredukowany przez uproszczenie do pustej geometrii: pusta ścieżka z kodami,
+        # żeby zapis poziomów mógł złączyć kody wszystkich ścieżek
+        return Path(np.empty((0, 2)), np.empty(0, dtype=Path.code_type))
+    return Path(np.concatenate(vertices), np.concatenate(codes))
+
+
+def _simplify_coverage(geometries, tolerance):
+    """
+    Upraszcza obiekty mapy jako pokrycie: każda granica wspólna dla dwóch
+    obiektów upraszczana jest raz, więc sąsiednie regiony nadal do siebie
+    przylegają (bez szczelin i nakładek).
+
+    Upraszczanie każdego obiektu osobno prowadzi wspólną granicę różnie po obu
+    stronach i przy większych tolerancjach zostawia widoczne szczeliny. Jeśli
+    shapely nie obsługuje upraszczania pokryć (wymaga shapely 2.1 i GEOS 3.12),
+    zwracana jest geometria pełna.
+
+    :param geometries: tablica geometrii shapely (bez wartości ``None``)
+    :param tolerance: tolerancja uproszczenia w jednostkach CRS
+    """
+    import shapely
+
+    if tolerance == 0:
+        return geometries
+    try:
+        return shapely.coverage_simplify(geometries, tolerance)
+    except (AttributeError, shapely.errors.UnsupportedGEOSVersionError):
+        print("Upraszczanie pokrycia niedostępne w tej wersji shapely/GEOS, używana jest pełna geometria")
+        return geometries
+
+
+def build_basemap(shp_path, crs, tolerances=DEFAULT_TOLERANCES):
+    """Czyta plik shapefile, rzutuje go do ``crs`` i przygotowuje poziomy uproszczenia."""
+    import geopandas as gpd
+
+    gdf = gpd.read_file(shp_path)
+    if gdf.crs is not None and gdf.crs.to_string() != crs:
+        gdf = gdf.to_crs(crs)
+    geometries = np.asarray(gdf.geometry[gdf.geometry.notna()])
+
+    levels = []
+    for tolerance in tolerances:
+        levels.append([_geometry_to_path(geometry) for geometry in _simplify_coverage(geometries, tolerance)])
+    return Basemap(crs, tolerances, levels)
+
+
+def cache_path(shp_path, crs):
+    """Ścieżka pliku pamięci podręcznej obok pliku shapefile."""
+    root, _ = os.path.splitext(shp_path)
+    return f"{root}.{crs.replace(':', '_')}.basemap.npz"
+
+
+def _cache_key(shp_path, crs, tolerances):
+    """Klucz ważności pamięci podręcznej: czas modyfikacji i rozmiar pliku, CRS, tolerancje, wersja upraszczania."""
+    stat = os.stat(shp_path)
+    return (
+        f"{stat.st_mtime_ns}|{stat.st_size}|{crs}|{','.join(str(t) for t in tolerances)}"
+        f"|{SIMPLIFICATION_VERSION}"
+    )
+
+
+def load_basemap(shp_path, crs, tolerances=DEFAULT_TOLERANCES):
+    """
+    Zwraca mapę podkładową, korzystając z pamięci podręcznej na dysku.
+
+    Pamięć podręczna jest ważna, dopóki nie zmieni się plik shapefile, docelowy
+    CRS lub tolerancje uproszczenia; w przeciwnym razie geometria jest czytana
+    ponownie (geopandas importowany jest tylko w tym przypadku).
+    """
+    key = _cache_key(shp_path, crs, tolerances)
+    path = cache_path(shp_path, crs)
+    if os.path.exists(path):
+        try:
+            basemap, cached_key = Basemap.load(path)
+            if cached_key == key:
+                return basemap
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Błąd odczytu pamięci podręcznej mapy: {e}")
+
+    basemap = build_basemap(shp_path, crs, tolerances)
+    try:
+        basemap.save(path, key)
+    except OSError as e:
+        print(f"Nie udało się zapisać pamięci podręcznej mapy: {e}")
+    return basemap
@@ -12,4 +12,38 @@ MAPS_AND_DATABASES = {
 # Lista dostępnych algorytmów
 ALGORITHMS = {
     "Dijkstra": "app.algorithms.dijkstra.dijkstra",
+    "Dijkstra (kopiec indeksowany)": "app.algorithms.dijkstra.dijkstra_indexed",
+    "A*": "app.algorithms.astar.astar",
+    "Dijkstra dwukierunkowy": "app.algorithms.bidirectional.bidirectional_dijkstra",
+    "Hierarchie kontrakcji": "app.algorithms.contraction.contraction_hierarchy",
 }
+
+
+# Tolerancja kliknięcia w miasto na mapie (w pikselach ekranu, niezależna od powiększenia)
+CLICK_TOLERANCE_PX = 10
+
+# Maksymalna liczba podpisów miast rysowanych jednocześnie (przy większej liczbie
+# widocznych miast podpisywane są te o największej liczbie połączeń)
+MAX_CITY_LABELS = 150
+
+# Maksymalna liczba połączeń i miast rysowanych w jednym widoku - przy większej
+# liczbie widocznych elementów rysowane są tylko ważniejsze (patrz app.level_of_detail)
+MAX_DRAWN_CONNECTIONS = 30000
+MAX_DRAWN_CITIES = 20000
+
+# Automatyczne odtwarzanie kroków algorytmu
+AUTOPLAY_INTERVAL_MS = 100      # odstęp między klatkami
+AUTOPLAY_STEPS_PER_FRAME = 1    # liczba kroków wykonywanych w jednej klatce
+
+# Pamięć podręczna wyników zapytań (patrz app.algorithms.cache.QueryCache)
+QUERY_CACHE_SIZE = 1000         # maksymalna liczba zapamiętanych wyników
+SHORTEST_PATH_TREES = 8         # maksymalna liczba zapamiętanych drzew najkrótszych ścieżek
+
+# Załadowane kraje (patrz app.dataset_manager.DatasetManager)
+DATASET_MEMORY_BUDGET_MB = 1024  # szacowany limit pamięci wszystkich załadowanych krajów
+PRELOAD_DATASETS = True          # wczytywanie krajów z MAPS_AND_DATABASES w tle przy starcie
+
+# Trasy alternatywne (patrz app.algorithms.k_shortest)
+ALTERNATIVE_ROUTES = 3          # domyślna liczba tras
+ALTERNATIVE_MAX_OVERLAP = 0.5   # największa część długości trasy wspólna z inną trasą (1.0 - k najkrótszych ścieżek)
+ALTERNATIVE_COLORS = ("blue", "darkorange", "purple", "magenta", "brown", "cyan")  # kolory kolejnych tras
@@ -0,0 +1,107 @@
+import numpy as np
+from app import profiling
+from app.algorithms.csr_graph import CSRGraph, FINGERPRINT_KEY, HIERARCHY_FILE_KEY
+from app.config import MAX_DRAWN_CONNECTIONS, MAX_DRAWN_CITIES
+from app.snapshot import load_snapshot
+
+
+class Dataset:
+    """
+    Załadowany zbiór danych kraju: graf gotowy do uruchamiania algorytmów
+    oraz wyliczone z niego struktury do rysowania.
+
+    Miasta (nazwy, identyfikatory, współrzędne) i połączenia są czytane
+    wprost z tablic grafu, więc graf ze zrzutu binarnego (patrz
+    ``app.snapshot``) nie wymaga odczytu tabel bazy danych.
+    """
+
+    def __init__(self, graph, database_path=None, fingerprint=None):
+        """
+        :param graph: Obiekt CSRGraph ze współrzędnymi i identyfikatorami miast
+        :param database_path: Ścieżka bazy, z której pochodzi graf
+        :param fingerprint: Odcisk danych bazy (``get_data_fingerprint``)
+        """
+        self.database_path = database_path
+        self.fingerprint = fingerprint
+        self.graph = graph
+        # Końce połączeń jako identyfikatory węzłów grafu (do wsadowego rysowania);
+        # w grafie nieskierowanym każde połączenie jest zapisane w obu kierunkach
+        sources = graph.edge_sources()
+        edge_nodes = np.column_stack([sources, graph.targets]).astype(np.int64)
+        if not graph.directed:
+            edge_nodes = edge_nodes[sources < graph.targets]
+        self.edge_nodes = edge_nodes
+        self.projected = {}  # CRS -> (x, y) w kolejności węzłów grafu
+        self.tiled = {}  # CRS -> TiledNetwork (kafle i poziomy szczegółowości do rysowania)
+
+        if fingerprint:
+            self.graph.derived[FINGERPRINT_KEY] = fingerprint
+        # Hierarchia kontrakcji jest trzymana w pliku obok bazy danych
+        if database_path and fingerprint:
+            self.graph.derived[HIERARCHY_FILE_KEY] = (database_path + ".ch.npz", fingerprint)
+
+    @classmethod
+    def from_rows(cls, cities, connections, database_path=None, fingerprint=None):
+        """
+        Buduje zbiór danych z wierszy tabel ``cities`` i ``connections``.
+
+        :param cities: Wiersze (id, city_name, longitude, latitude)
+        :param connections: Wiersze (id, city_a, city_b, distance)
+        """
+        return cls(CSRGraph.from_rows(cities, connections), database_path, fingerprint)
+
+    @classmethod
+    def from_database(cls, database_path):
+        """
+        Ładuje zbiór danych z bazy SQLite.
+
+        Graf jest czytany z aktualnego zrzutu binarnego; baza danych jest
+        otwierana tylko wtedy, gdy zrzutu nie ma lub jest nieaktualny.
+
+        :param database_path: Ścieżka do bazy danych
+        :return: Obiekt Dataset lub None, jeśli nie udało się połączyć z bazą
+        """
+        with profiling.span("zrzut grafu"):
+            graph, fingerprint = load_snapshot(database_path)
+        if graph is None:
+            return None
+        with profiling.span("budowa zbioru danych"):
+            return cls(graph, database_path, fingerprint)
+
+    def city_points(self):
+        """Zwraca słownik nazwa -> (id, lon, lat) w formacie używanym przez wizualizator."""
+        coordinates = self.graph.coordinates.tolist()
+        return {
+            name: (city_id, lon, lat)
+            for name, city_id, (lon, lat) in zip(self.graph.names, self.graph.city_ids.tolist(), coordinates)
+        }
+
+    def project(self, crs):
+        """
+        Zwraca współrzędne miast w podanym CRS, przeliczając je tylko przy pierwszym użyciu.
+
+        :param crs: Docelowy układ współrzędnych (np. "EPSG:2180")
+        :return: Tablice x, y w kolejności węzłów grafu
+        """
+        if crs not in self.projected:
+            from app.projection import project
+
+            coordinates = self.graph.coordinates
+            self.projected[crs] = project(coordinates[:, 0], coordinates[:, 1], crs)
+        return self.projected[crs]
+
+    def tiled_network(self, crs):
+        """
+        Zwraca miasta i połączenia w podanym CRS podzielone na kafle i poziomy szczegółowości,
+        budując je tylko przy pierwszym użyciu.
+        """
+        if crs not in self.tiled:
+            from app.level_of_detail import TiledNetwork, node_importance
+
+            x, y = self.project(crs)
+            self.tiled[crs] = TiledNetwork(
+                np.column_stack([x, y]), self.edge_nodes, node_importance(self.graph),
+                MAX_DRAWN_CONNECTIONS, MAX_DRAWN_CITIES,
+            )
+        return self.tiled[crs]
+
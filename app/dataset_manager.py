@@ -0,0 +1,192 @@
+"""
+Menedżer załadowanych map krajów z limitem pamięci.
+
+Każdy załadowany kraj (mapa podkładowa, zbiór danych z grafem, współrzędne
+miast rzutowane do CRS mapy i ich podział na kafle) jest trzymany w pamięci podręcznej LRU.
+Gdy szacowany rozmiar wszystkich krajów przekracza budżet, usuwane są
+najdawniej używane. ``preload`` wczytuje kraje w wątkach w tle (np. przy
+starcie aplikacji), więc późniejsze przełączenie kraju nie wymaga
+odczytu plików.
+"""
+import threading
+from collections import OrderedDict
+from app import profiling
+from app.basemap import load_basemap
+from app.algorithms.dynamic import TREES_KEY
+from app.dataset import Dataset
+from app.snapshot import source_key
+
+# Szacunkowy rozmiar obiektów Pythona (nazwy i indeksy miast) na miasto w bajtach,
+# zmierzony narzędziem tracemalloc na syntetycznej sieci 100 000 miast
+CITY_BYTES = 250
+# Drzewo najkrótszych ścieżek (listy odległości i poprzedników) na węzeł grafu
+TREE_BYTES_PER_NODE = 40
+
+
+class LoadedMap:
+    """Mapa podkładowa i zbiór danych kraju gotowe do narysowania."""
+
+    def __init__(self, basemap, dataset, modified):
+        self.basemap = basemap
+        self.dataset = dataset
+        # Klucz modyfikacji bazy z chwili ładowania (patrz ``app.snapshot.source_key``)
+        self.modified = modified
+
+    def estimated_size(self):
+        """
+        Szacowany rozmiar w pamięci w bajtach (rośnie np. po zbudowaniu list sąsiedztwa grafu
+        lub drzew najkrótszych ścieżek przypiętych do grafu).
+        """
+        dataset = self.dataset
+        graph = dataset.graph
+        size = graph.node_count * CITY_BYTES + dataset.edge_nodes.nbytes + graph.nbytes
+        size += len(graph.derived.get(TREES_KEY, ())) * graph.node_count * TREE_BYTES_PER_NODE
+        size += sum(x.nbytes + y.nbytes for x, y in dataset.projected.values())
+        size += sum(network.nbytes for network in dataset.tiled.values())
+        size += sum(path.vertices.nbytes + (0 if path.codes is None else path.codes.nbytes)
+                    for paths in self.basemap.levels for path in paths)
+        return size
+
+
+class DatasetManager:
+    """
+    Pamięć podręczna LRU załadowanych krajów z budżetem pamięci.
+
+    Kraj jest identyfikowany trójką (plik mapy, baza danych, CRS). Wpis jest
+    ważny, dopóki nie zmieni się plik bazy; ostatnio pobrany kraj nie jest
+    usuwany, nawet jeśli sam przekracza budżet. Metody mogą być wywoływane
+    z wielu wątków - ten sam kraj jest wczytywany tylko raz, a pozostałe
+    wątki czekają na wynik.
+    """
+
+    def __init__(self, memory_budget):
+        """
+        :param memory_budget: Budżet pamięci w bajtach
+        """
+        self.memory_budget = memory_budget
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._loading = {}  # klucz -> threading.Event ustawiany po zakończeniu wczytywania
+        self._lock = threading.Lock()
+
+    def get(self, map_path, database_path, crs):
+        """
+        Zwraca załadowany kraj, wczytując go, jeśli nie ma go w pamięci lub baza się zmieniła.
+
+        :param crs: CRS mapy kraju (np. "EPSG:2180")
+        :return: LoadedMap lub None, jeśli nie udało się połączyć z bazą danych
+        """
+        key = (map_path, database_path, crs)
+        while True:
+            with self._lock:
+                entry = self._fresh(key)
+                if entry is not None:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                event = self._loading.get(key)
+                if event is None:
+                    event = self._loading[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Kraj wczytuje inny wątek (np. wstępne ładowanie) - wystarczy poczekać na wynik
+            event.wait()
+
+        try:
+            entry = self._load(map_path, database_path, crs)
+            if entry is not None:
+                with self._lock:
+                    self.entries[key] = entry
+                    self.entries.move_to_end(key)
+                    self._evict()
+        finally:
+            with self._lock:
+                del self._loading[key]
+            event.set()
+        return entry
+
+    def cached(self, map_path, database_path, crs):
+        """Zwraca kraj, jeśli jest już załadowany i aktualny (bez wczytywania), lub None."""
+        with self._lock:
+            return self._fresh((map_path, database_path, crs))
+
+    def _fresh(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and entry.modified != source_key(key[1]):
+            del self.entries[key]
+            return None
+        return entry
+
+    def _load(self, map_path, database_path, crs):
+        from pyproj import CRS
+
+        with profiling.span("mapa podkładowa", path=map_path):
+            basemap = load_basemap(map_path, crs)
+        with profiling.span("zbiór danych", path=database_path):
+            dataset = Dataset.from_database(database_path)
+        if dataset is None:
+            return None
+        map_crs = f"EPSG:{CRS.from_user_input(basemap.crs).to_epsg()}"
+        with profiling.span("projekcja miast"):
+            dataset.project(map_crs)
+        with profiling.span("kafle i poziomy szczegółowości"):
+            dataset.tiled_network(map_crs)
+        profiling.memory_snapshot("po przygotowaniu mapy")
+        # Klucz odczytany po załadowaniu uwzględnia dziennik, który odczyt bazy w trybie WAL tworzy obok niej
+        return LoadedMap(basemap, dataset, source_key(database_path))
+
+    def _evict(self):
+        """Usuwa najdawniej używane kraje, dopóki łączny rozmiar przekracza budżet."""
+        while len(self.entries) > 1 and self._memory_usage() > self.memory_budget:
+            key, _ = self.entries.popitem(last=False)
+            print(f"Usunięto z pamięci mapę {key[0]} z bazą {key[1]} (przekroczony budżet pamięci)")
+
+    def _memory_usage(self):
+        return sum(entry.estimated_size() for entry in self.entries.values())
+
+    def memory_usage(self):
+        """Szacowany łączny rozmiar załadowanych krajów w bajtach."""
+        with self._lock:
+            return self._memory_usage()
+
+    def preload(self, countries, on_loaded=None):
+        """
+        Wczytuje kraje w wątkach w tle (po jednym wątku na kraj).
+
+        Kraje, które nie mieszczą się w budżecie, są wczytywane, ale zaraz
+        wypierają najdawniej używane - warto podawać je od najmniej ważnego.
+
+        :param countries: Lista trójek (plik mapy, baza danych, CRS)
+        :param on_loaded: Opcjonalna funkcja on_loaded(plik mapy, LoadedMap lub None)
+            wywoływana w wątku w tle po wczytaniu kraju
+        :return: Lista uruchomionych wątków
+        """
+        threads = []
+        for map_path, database_path, crs in countries:
+            thread = threading.Thread(
+                target=self._preload_one, args=(map_path, database_path, crs, on_loaded), daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def _preload_one(self, map_path, database_path, crs, on_loaded):
+        try:
+            entry = self.get(map_path, database_path, crs)
+        except Exception as e:
+            print(f"Błąd wstępnego ładowania mapy {map_path}: {e}")
+            entry = None
+        if on_loaded is not None:
+            on_loaded(map_path, entry)
+
+    def counters(self):
+        """Zwraca liczniki trafień i chybień, liczbę krajów i szacowane zużycie pamięci."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries),
+                    "memory": self._memory_usage()}
+
+    def clear(self):
+        """Usuwa wszystkie załadowane kraje."""
+        with self._lock:
+            self.entries.clear()
@@ -1,4 +1,27 @@
+import hashlib
+import os
 import sqlite3
+import threading
+from urllib.parse import quote
+
+# Rozmiar obszaru pliku bazy mapowanego do pamięci przez połączenia tylko do odczytu
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Liczba wierszy pobieranych z kursora jednym wywołaniem fetchmany
+FETCH_SIZE = 4096
+
+# Indeksy zakładane przez ``prepare_database``. Indeksy połączeń zawierają
+# oba końce i odległość (id jest kluczem wiersza), więc zapytania o sąsiadów
+# i połączenia w obszarze nie muszą czytać samej tabeli.
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_connections_city_a ON connections(city_a, city_b, distance)",
+    "CREATE INDEX IF NOT EXISTS idx_connections_city_b ON connections(city_b, city_a, distance)",
+    "CREATE INDEX IF NOT EXISTS idx_cities_position ON cities(longitude, latitude)",
+)
+
+# Pula połączeń tylko do odczytu: bezwzględna ścieżka bazy -> połączenie
+_connections = {}
+_connections_lock = threading.Lock()
 
 def connect_to_db(database_path):
     """Nawiązuje połączenie z bazą danych."""
@@ -10,14 +33,177 @@ def connect_to_db(database_path):
         print(f"Błąd połączenia z bazą danych: {e}")
         return None
 
-def get_cities(conn):
+def prepare_database(database_path):
+    """
+    Włącza dziennik WAL i zakłada indeksy z ``INDEXES`` (jednorazowa migracja bazy).
+
+    Obie zmiany są trwałe (zapisywane w pliku bazy), więc migrację wykonuje
+    się raz, jawnie (``python -m app.query --db <baza> --prepare-db``).
+    ``get_connection`` nigdy nie zapisuje bazy - nieprzygotowana baza jest
+    nadal czytana, tylko bez indeksów.
+
+    :return: True, jeśli bazę przygotowano, False w przypadku błędu
+    """
+    try:
+        conn = sqlite3.connect(database_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in INDEXES:
+                conn.execute(statement)
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"Nie udało się przygotować bazy danych: {e}")
+        return False
+    return True
+
+def get_connection(database_path):
+    """
+    Zwraca współdzielone połączenie tylko do odczytu z bazą danych.
+
+    Połączenie jest otwierane raz na bazę w trybie ``mode=ro`` (plik bazy nie
+    jest zmieniany) i może być używane z wielu wątków. Nie należy go
+    zamykać - służy do tego ``close_connections``.
+
+    Bazy w trybie WAL (po ``prepare_database``) nie da się tak odczytać
+    z katalogu bez prawa zapisu, jeśli nie ma w nim plików ``-shm``/``-wal``
+    (np. na nośniku tylko do odczytu). Wtedy baza jest otwierana jako
+    niezmienna (``immutable=1``) - SQLite nie używa plików dziennika, więc
+    zapisy pozostawione w nieprzeniesionym do bazy dzienniku nie są widoczne.
+
+    :return: Połączenie lub None, jeśli nie udało się go nawiązać
+    """
+    key = os.path.abspath(database_path)
+    with _connections_lock:
+        if key in _connections:
+            return _connections[key]
+
+        print(f"Łączenie z bazą danych: {database_path}")
+        if not os.path.isfile(key):
+            print(f"Błąd połączenia z bazą danych: brak pliku {database_path}")
+            return None
+        try:
+            conn = _open_read_only(key)
+        except sqlite3.Error as e:
+            print(f"Błąd połączenia z bazą danych: {e}")
+            return None
+        _connections[key] = conn
+        return conn
+
+def _open_read_only(path):
+    """Otwiera bazę tylko do odczytu, a z katalogu bez prawa zapisu w razie potrzeby jako niezmienną."""
+    conn = None
+    try:
+        conn = sqlite3.connect(_read_only_uri(path), uri=True, check_same_thread=False)
+        # Plik jest otwierany leniwie - dopiero odczyt ujawnia brak dostępu do plików dziennika WAL
+        conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+    except sqlite3.Error:
+        if conn is not None:
+            conn.close()
+        if os.access(os.path.dirname(path), os.W_OK):
+            raise
+        conn = sqlite3.connect(_read_only_uri(path, immutable=True), uri=True, check_same_thread=False)
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    return conn
+
+def _read_only_uri(path, immutable=False):
+    """Adres URI SQLite otwierający bazę tylko do odczytu (np. file:///C:/dane/polska.db?mode=ro)."""
+    path = path.replace(os.sep, "/")
+    if not path.startswith("/"):
+        path = "/" + path
+    uri = f"file://{quote(path, safe='/:')}?mode=ro"
+    return uri + "&immutable=1" if immutable else uri
+
+def close_connections():
+    """Zamyka wszystkie połączenia z puli."""
+    with _connections_lock:
+        for conn in _connections.values():
+            conn.close()
+        _connections.clear()
+
+def _iter_rows(cursor, size=FETCH_SIZE):
+    """Zwraca wiersze kursora porcjami po ``size`` bez wczytywania całego wyniku."""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+def iter_cities(conn, bbox=None):
+    """
+    Zwraca iterator wierszy (id, city_name, longitude, latitude) tabeli ``cities``.
+
+    :param bbox: Opcjonalny prostokąt (min_lon, min_lat, max_lon, max_lat) - tylko miasta w jego wnętrzu
+    """
+    if bbox is None:
+        cursor = conn.execute("SELECT id, city_name, longitude, latitude FROM cities ORDER BY id")
+    else:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        cursor = conn.execute(
+            "SELECT id, city_name, longitude, latitude FROM cities "
+            "WHERE longitude BETWEEN ? AND ? AND latitude BETWEEN ? AND ? ORDER BY id",
+            (min_lon, max_lon, min_lat, max_lat),
+        )
+    return _iter_rows(cursor)
+
+def iter_connections(conn, bbox=None):
+    """
+    Zwraca iterator wierszy (id, city_a, city_b, distance) tabeli ``connections``.
+
+    :param bbox: Opcjonalny prostokąt (min_lon, min_lat, max_lon, max_lat) - tylko połączenia,
+        których oba końce leżą w jego wnętrzu
+    """
+    if bbox is None:
+        cursor = conn.execute("SELECT id, city_a, city_b, distance FROM connections ORDER BY id")
+    else:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        inside = "SELECT id FROM cities WHERE longitude BETWEEN ? AND ? AND latitude BETWEEN ? AND ?"
+        cursor = conn.execute(
+            f"SELECT id, city_a, city_b, distance FROM connections "
+            f"WHERE city_a IN ({inside}) AND city_b IN ({inside}) ORDER BY id",
+            (min_lon, max_lon, min_lat, max_lat) * 2,
+        )
+    return _iter_rows(cursor)
+
+def get_cities(conn, bbox=None):
     """Pobiera miasta z bazy danych."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM cities")
-    return cursor.fetchall()
+    return list(iter_cities(conn, bbox))
 
-def get_connections(conn):
+def get_connections(conn, bbox=None):
     """Pobiera połączenia między miastami z bazy danych."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM connections")
+    return list(iter_connections(conn, bbox))
+
+def get_neighbors(conn, city_id):
+    """
+    Pobiera sąsiadów miasta (połączenia są nieskierowane).
+
+    :return: Lista krotek (id sąsiada, odległość)
+    """
+    cursor = conn.execute(
+        "SELECT city_b, distance FROM connections WHERE city_a = ? "
+        "UNION ALL SELECT city_a, distance FROM connections WHERE city_b = ?",
+        (city_id, city_id),
+    )
     return cursor.fetchall()
+
+def get_data_fingerprint(conn):
+    """
+    Zwraca odcisk danych grafu (liczba wierszy, maksymalne id, sumy kontrolne i skrót nazw miast).
+
+    Odcisk zmienia się po każdej modyfikacji tabel ``cities`` i ``connections``
+    (także po zmianie samej nazwy miasta), więc służy do unieważniania danych
+    wyliczonych z grafu i zapisanych na dysku.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*), MAX(id), TOTAL(longitude), TOTAL(latitude) FROM cities")
+    cities = cursor.fetchone()
+    cursor.execute(
+        "SELECT COUNT(*), MAX(id), TOTAL(distance), TOTAL(city_a * 1000003 + city_b), "
+        "TOTAL(id * distance) FROM connections"
+    )
+    connections = cursor.fetchone()
+    names = hashlib.sha1()
+    for city_id, city_name in _iter_rows(conn.execute("SELECT id, city_name FROM cities ORDER BY id")):
+        names.update(f"{city_id}\t{city_name}\n".encode("utf-8"))
+    return "|".join(repr(value) for value in cities + connections) + "|" + names.hexdigest()
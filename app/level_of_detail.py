@@ -0,0 +1,244 @@
+"""
+Poziomy szczegółowości (LOD) i podział na kafle sieci drogowej do rysowania.
+
+Każde miasto i połączenie dostaje poziom ważności: miasta są porządkowane
+według rangi w hierarchii kontrakcji (jeśli jest już wczytana) albo stopnia
+(remisy rozstrzyga łączna długość połączeń miasta), a połączenie jest tak
+ważne jak mniej ważny z jego końców. Poziom l zawiera około 1/4^l
+najważniejszych elementów, więc każdy kolejny poziom jest czterokrotnie
+rzadszy.
+
+Rzutowana geometria jest dzielona na kwadratowe kafle; w obrębie kafla
+elementy są posortowane od najważniejszych, dzięki czemu elementy kafla
+o poziomie co najmniej l to ciągły przedział tablicy. Widok rysuje tylko
+kafle przecinające bieżące granice osi, na najdokładniejszym poziomie,
+przy którym liczba elementów nie przekracza limitu. Połączenie należy do
+kafla swojego środka, a kafel pamięta prostokąt obejmujący wszystkie swoje
+połączenia - jest rysowany, gdy ten prostokąt przecina widok. Długie
+połączenie powiększa więc tylko prostokąt własnego kafla.
+"""
+import math
+import numpy as np
+from app.algorithms.csr_graph import HIERARCHY_KEY
+
+# Liczba kafli wzdłuż dłuższego boku obszaru sieci
+TILES_PER_SIDE = 64
+
+# Kolejny poziom szczegółowości zawiera tyle razy mniej elementów
+LEVEL_RATIO = 4
+
+
+def node_importance(graph):
+    """
+    Zwraca ważność węzłów grafu jako ich pozycję w porządku rosnącej ważności (0..n-1).
+
+    Używana jest ranga z hierarchii kontrakcji, jeśli graf już ją ma
+    (hierarchia nie jest tu budowana), a w przeciwnym razie stopień węzła.
+    """
+    hierarchy = graph.derived.get(HIERARCHY_KEY)
+    if hierarchy is not None:
+        order = np.argsort(hierarchy.rank, kind="stable")
+    else:
+        degree = np.diff(graph.offsets)
+        sources = np.repeat(np.arange(graph.node_count), degree)
+        length = np.bincount(sources, weights=graph.weights, minlength=graph.node_count)
+        order = np.lexsort((length, degree))
+    importance = np.empty(graph.node_count, dtype=np.int64)
+    importance[order] = np.arange(graph.node_count)
+    return importance
+
+
+def _levels(importance, limit):
+    """
+    Przypisuje elementom poziomy szczegółowości na podstawie ich ważności.
+
+    :param importance: Ważność elementów (większa - ważniejszy)
+    :param limit: Liczba elementów, którą musi zmieścić najrzadszy poziom
+    :return: Poziomy elementów, liczba poziomów
+    """
+    count = len(importance)
+    level_count = 1 + max(0, math.ceil(math.log(max(count, 1) / max(limit, 1), LEVEL_RATIO)))
+    # Pozycja w porządku malejącej ważności (0 - najważniejszy)
+    position = np.empty(count, dtype=np.int64)
+    position[np.argsort(-importance, kind="stable")] = np.arange(count)
+    levels = np.floor(np.log(count / (position + 1)) / math.log(LEVEL_RATIO)).astype(np.int64)
+    return np.minimum(levels, level_count - 1), level_count
+
+
+class TiledLayer:
+    """
+    Elementy jednej warstwy (miasta lub połączenia) podzielone na kafle i poziomy szczegółowości.
+
+    ``geometry`` to tablica współrzędnych elementów w kolejności kafli
+    (punkty (n, 2) lub odcinki (n, 2, 2)), ``order`` - numery elementów
+    w tej kolejności, a ``counts[kafel, l]`` - liczba elementów kafla
+    o poziomie co najmniej l.
+    """
+
+    def __init__(self, geometry, anchors, levels, level_count, grid):
+        """
+        :param geometry: Współrzędne elementów (punkty lub odcinki)
+        :param anchors: Punkt każdego elementu decydujący o jego kaflu (np. środek odcinka)
+        :param levels: Poziomy szczegółowości elementów
+        :param level_count: Liczba poziomów
+        :param grid: Siatka kafli (origin_x, origin_y, tile_size, columns, rows)
+        """
+        origin_x, origin_y, tile_size, columns, rows = grid
+        column = np.clip(((anchors[:, 0] - origin_x) // tile_size).astype(np.int64), 0, columns - 1)
+        row = np.clip(((anchors[:, 1] - origin_y) // tile_size).astype(np.int64), 0, rows - 1)
+        tiles = row * columns + column
+
+        self.order = np.lexsort((-levels, tiles))
+        self.geometry = geometry[self.order]
+        self.level_count = level_count
+        tile_count = columns * rows
+        self.starts = np.searchsorted(tiles[self.order], np.arange(tile_count))
+        counts = np.zeros((tile_count, level_count), dtype=np.int64)
+        np.add.at(counts, (tiles, levels), 1)
+        # Liczba elementów o poziomie co najmniej l (suma od najrzadszego poziomu)
+        self.counts = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]
+        # Odcinki wystające poza kafel swojego środka: prostokąt (lower, upper) obejmujący odcinki kafla
+        if geometry.ndim == 3:
+            self.lower = np.full((tile_count, 2), np.inf)
+            self.upper = np.full((tile_count, 2), -np.inf)
+            np.minimum.at(self.lower, tiles, geometry.min(axis=1))
+            np.maximum.at(self.upper, tiles, geometry.max(axis=1))
+        else:
+            self.lower = self.upper = None
+
+    @property
+    def nbytes(self):
+        extents = self.lower.nbytes + self.upper.nbytes if self.lower is not None else 0
+        return self.geometry.nbytes + self.order.nbytes + self.starts.nbytes + self.counts.nbytes + extents
+
+    def overlapping(self, left, right, bottom, top):
+        """Numery kafli, których odcinki mogą przecinać prostokąt (tylko warstwa odcinków)."""
+        return np.nonzero(
+            (self.lower[:, 0] <= right) & (self.upper[:, 0] >= left)
+            & (self.lower[:, 1] <= top) & (self.upper[:, 1] >= bottom)
+        )[0]
+
+    def select(self, tiles, limit):
+        """
+        Wybiera elementy podanych kafli na najdokładniejszym poziomie mieszczącym się w limicie.
+
+        :param tiles: Numery widocznych kafli
+        :param limit: Maksymalna liczba elementów
+        :return: Poziom szczegółowości, indeksy w ``geometry``
+        """
+        totals = self.counts[tiles].sum(axis=0)
+        fitting = np.nonzero(totals <= limit)[0]
+        level = int(fitting[0]) if len(fitting) else self.level_count - 1
+        lengths = self.counts[tiles, level]
+        starts = self.starts[tiles]
+        # Sklejenie przedziałów [start, start + długość) kolejnych kafli bez pętli w Pythonie
+        total = int(lengths.sum())
+        ends = np.cumsum(lengths)
+        indices = np.arange(total) + np.repeat(starts - (ends - lengths), lengths)
+        return level, indices
+
+
+class TiledNetwork:
+    """
+    Miasta i połączenia sieci w rzutowanych współrzędnych podzielone na kafle i poziomy szczegółowości.
+
+    Przykład:
+        network = TiledNetwork(xy, edge_nodes, node_importance(graph), 30000, 20000)
+        view = network.view((x_min, x_max), (y_min, y_max))
+        collection.set_segments(network.connections.geometry[view.connections])
+    """
+
+    def __init__(self, xy, edge_nodes, importance, connection_limit, city_limit, tiles_per_side=TILES_PER_SIDE):
+        """
+        :param xy: Rzutowane współrzędne miast (n, 2) w kolejności węzłów grafu
+        :param edge_nodes: Końce połączeń jako węzły grafu (m, 2)
+        :param importance: Ważność miast (patrz ``node_importance``)
+        :param connection_limit: Maksymalna liczba rysowanych połączeń
+        :param city_limit: Maksymalna liczba rysowanych miast
+        :param tiles_per_side: Liczba kafli wzdłuż dłuższego boku obszaru sieci
+        """
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        edge_nodes = np.asarray(edge_nodes, dtype=np.int64).reshape(-1, 2)
+        if len(xy):
+            (x_min, y_min), (x_max, y_max) = xy.min(axis=0), xy.max(axis=0)
+        else:
+            x_min = y_min = 0.0
+            x_max = y_max = 1.0
+        tile_size = max(x_max - x_min, y_max - y_min, 1e-9) / tiles_per_side
+        columns = max(1, math.ceil((x_max - x_min) / tile_size))
+        rows = max(1, math.ceil((y_max - y_min) / tile_size))
+        self.grid = (x_min, y_min, tile_size, columns, rows)
+        self.importance = np.asarray(importance)
+        self.connection_limit = connection_limit
+        self.city_limit = city_limit
+
+        city_levels, city_level_count = _levels(importance, city_limit)
+        self.cities = TiledLayer(xy, xy, city_levels, city_level_count, self.grid)
+
+        segments = xy[edge_nodes]
+        edge_importance = np.minimum(importance[edge_nodes[:, 0]], importance[edge_nodes[:, 1]])
+        edge_levels, edge_level_count = _levels(edge_importance, connection_limit)
+        self.connections = TiledLayer(
+            segments, segments.mean(axis=1), edge_levels, edge_level_count, self.grid
+        )
+
+    @property
+    def nbytes(self):
+        return self.importance.nbytes + self.cities.nbytes + self.connections.nbytes
+
+    def _tile_range(self, xlim, ylim):
+        """Kolumny i wiersze siatki (bez przycięcia do siatki) obejmujące prostokąt widoku."""
+        origin_x, origin_y, tile_size, _, _ = self.grid
+        (x_min, x_max), (y_min, y_max) = sorted(xlim), sorted(ylim)
+        return (
+            math.floor((x_min - origin_x) / tile_size), math.floor((x_max - origin_x) / tile_size),
+            math.floor((y_min - origin_y) / tile_size), math.floor((y_max - origin_y) / tile_size),
+        )
+
+    def _tiles(self, xlim, ylim):
+        """Numery kafli przecinających prostokąt widoku."""
+        _, _, _, columns, rows = self.grid
+        first_column, last_column, first_row, last_row = self._tile_range(xlim, ylim)
+        first_column, last_column = max(0, first_column), min(columns - 1, last_column)
+        first_row, last_row = max(0, first_row), min(rows - 1, last_row)
+        if first_column > last_column or first_row > last_row:
+            return np.empty(0, dtype=np.int64), None
+        tiles = (np.arange(first_row, last_row + 1)[:, None] * columns
+                 + np.arange(first_column, last_column + 1)[None, :]).ravel()
+        return tiles, (first_column, last_column, first_row, last_row)
+
+    def view(self, xlim, ylim):
+        """
+        Wybiera miasta i połączenia do narysowania w widoku o granicach osi ``xlim``, ``ylim``.
+
+        :return: NetworkView z indeksami w ``cities.geometry`` i ``connections.geometry``
+        """
+        city_tiles, city_range = self._tiles(xlim, ylim)
+        # Widok jest rozszerzany do granic kafli siatki, więc wybór połączeń zależy tylko od tych granic
+        origin_x, origin_y, tile_size, _, _ = self.grid
+        connection_range = self._tile_range(xlim, ylim)
+        first_column, last_column, first_row, last_row = connection_range
+        connection_tiles = self.connections.overlapping(
+            origin_x + first_column * tile_size, origin_x + (last_column + 1) * tile_size,
+            origin_y + first_row * tile_size, origin_y + (last_row + 1) * tile_size,
+        )
+        city_level, cities = self.cities.select(city_tiles, self.city_limit)
+        connection_level, connections = self.connections.select(connection_tiles, self.connection_limit)
+        key = (city_range, connection_range, city_level, connection_level)
+        return NetworkView(key, cities, connections, city_level, connection_level)
+
+
+class NetworkView:
+    """
+    Wybór elementów do narysowania w jednym widoku.
+
+    ``key`` jest taki sam dla widoków obejmujących te same kafle na tych
+    samych poziomach - wtedy rysowanie można pominąć.
+    """
+
+    def __init__(self, key, cities, connections, city_level, connection_level):
+        self.key = key
+        self.cities = cities
+        self.connections = connections
+        self.city_level = city_level
+        self.connection_level = connection_level
@@ -0,0 +1,246 @@
+"""
+Lekki pomiar czasu etapów, liczników i pamięci aplikacji.
+
+Pomiar jest domyślnie wyłączony; wtedy ``span`` zwraca wspólny, pusty
+kontekst, a ``count`` i ``memory_snapshot`` od razu wracają, więc
+instrumentacja w kodzie kosztuje jedno sprawdzenie flagi. Odcinki (spans)
+obejmują całe etapy (ładowanie, wyszukiwanie, rysowanie), a nie pojedyncze
+kroki pętli - liczniki przeszukiwania są dodawane po jego zakończeniu
+z ``stats`` algorytmów.
+
+Przykład:
+    profiling.enable()
+    with profiling.span("odczyt bazy", path=database_path):
+        ...
+    profiling.count("settled", stats["settled"])
+    print(profiling.report())
+    profiling.export_chrome_trace("slad.json")  # chrome://tracing lub https://ui.perfetto.dev
+
+Wyniki z wielu wątków (np. ładowanie mapy w tle) są zbierane razem;
+każdy odcinek pamięta identyfikator swojego wątku.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+# Liczba zapamiętanych zmian liczników (starsze są usuwane, sumy liczników zostają pełne)
+MAX_COUNTER_EVENTS = 10000
+
+_enabled = False
+_started_tracemalloc = False  # Czy śledzenie pamięci włączył ``enable`` (a nie np. benchmark lub -X tracemalloc)
+_lock = threading.Lock()
+_origin = time.perf_counter()
+_spans = []       # (nazwa, początek, czas trwania, wątek, argumenty)
+_counters = {}    # nazwa -> suma
+_counter_events = deque(maxlen=MAX_COUNTER_EVENTS)  # (nazwa, czas, suma) - ostatnie zmiany liczników
+_memory = []      # (etykieta, czas, bieżąca pamięć tracemalloc, szczyt tracemalloc, maksymalny RSS)
+
+
+class _NullSpan:
+    """Pusty kontekst zwracany przy wyłączonym pomiarze."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Odcinek czasu zapisywany po wyjściu z bloku ``with``."""
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.start
+        with _lock:
+            _spans.append((self.name, self.start - _origin, duration, threading.get_ident(), self.args))
+        return False
+
+
+def enable(memory=False):
+    """
+    Włącza pomiar.
+
+    :param memory: Czy śledzić alokacje pamięci (tracemalloc) - spowalnia program,
+        ale ``memory_snapshot`` podaje wtedy bieżącą i szczytową pamięć Pythona
+    """
+    global _enabled, _started_tracemalloc
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _enabled = True
+
+
+def disable():
+    """
+    Wyłącza pomiar (zebrane dane zostają do wywołania ``reset``).
+
+    Śledzenie pamięci jest zatrzymywane tylko wtedy, gdy włączył je ``enable``.
+    """
+    global _enabled, _started_tracemalloc
+    _enabled = False
+    if _started_tracemalloc and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _started_tracemalloc = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Usuwa zebrane odcinki, liczniki i migawki pamięci."""
+    global _origin
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _counter_events.clear()
+        _memory.clear()
+        _origin = time.perf_counter()
+
+
+def span(name, **args):
+    """
+    Zwraca kontekst mierzący czas bloku ``with``.
+
+    :param name: Nazwa etapu (odcinki o tej samej nazwie są sumowane w raporcie)
+    :param args: Dodatkowe informacje zapisywane w śladzie (np. ścieżka pliku)
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def count(name, value=1):
+    """Dodaje ``value`` do licznika ``name``."""
+    if not _enabled:
+        return
+    with _lock:
+        total = _counters[name] = _counters.get(name, 0) + value
+        _counter_events.append((name, time.perf_counter() - _origin, total))
+
+
+def memory_snapshot(label):
+    """Zapisuje bieżące zużycie pamięci (tracemalloc, jeśli jest włączony, i maksymalny RSS procesu)."""
+    if not _enabled:
+        return
+    current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+    with _lock:
+        _memory.append((label, time.perf_counter() - _origin, current, peak, max_rss()))
+
+
+def max_rss():
+    """Szczytowy rozmiar pamięci procesu w bajtach lub None, jeśli system go nie udostępnia."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux podaje kilobajty, macOS bajty
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def _megabytes(value):
+    return "-" if value is None else f"{value / 2 ** 20:.1f} MB"
+
+
+def summary():
+    """
+    Zwraca zebrane dane w postaci słownika gotowego do zapisu jako JSON.
+
+    Odcinki są zgrupowane po nazwie (liczba, łączny i najdłuższy czas w ms).
+    """
+    with _lock:
+        spans = list(_spans)
+        counters = dict(_counters)
+        memory = list(_memory)
+    grouped = {}
+    for name, _, duration, _, _ in spans:
+        entry = grouped.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["count"] += 1
+        entry["total_ms"] += duration * 1000
+        entry["max_ms"] = max(entry["max_ms"], duration * 1000)
+    for entry in grouped.values():
+        entry["total_ms"] = round(entry["total_ms"], 3)
+        entry["max_ms"] = round(entry["max_ms"], 3)
+    return {
+        "spans": grouped,
+        "counters": counters,
+        "memory": [
+            {"label": label, "time_s": round(moment, 6), "traced": current, "traced_peak": peak, "max_rss": rss}
+            for label, moment, current, peak, rss in memory
+        ],
+    }
+
+
+def report():
+    """Zwraca czytelny raport tekstowy (np. do panelu kroków)."""
+    data = summary()
+    lines = ["Profil (czasy w ms):"]
+    for name, entry in sorted(data["spans"].items(), key=lambda item: -item[1]["total_ms"]):
+        lines.append(f"  {name}: {entry['count']} x, łącznie {entry['total_ms']:.1f}, najdłużej {entry['max_ms']:.1f}")
+    if data["counters"]:
+        lines.append("Liczniki:")
+        lines.extend(f"  {name}: {value}" for name, value in data["counters"].items())
+    if data["memory"]:
+        lines.append("Pamięć:")
+        lines.extend(
+            f"  {entry['label']}: {_megabytes(entry['traced'])} (szczyt {_megabytes(entry['traced_peak'])}), "
+            f"RSS {_megabytes(entry['max_rss'])}"
+            for entry in data["memory"]
+        )
+    if len(lines) == 1:
+        lines.append("  brak pomiarów (włącz profilowanie i powtórz działanie)")
+    return "\n".join(lines)
+
+
+def export_json(path):
+    """Zapisuje podsumowanie (``summary``) do pliku JSON."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(summary(), file, ensure_ascii=False, indent=2)
+
+
+def export_chrome_trace(path):
+    """
+    Zapisuje ślad w formacie Chrome Trace Event (chrome://tracing, Perfetto).
+
+    Odcinki są zdarzeniami "X" z czasem w mikrosekundach, liczniki
+    i pamięć - zdarzeniami "C" (wykresy wartości w czasie), a etykiety
+    migawek pamięci - znacznikami "i".
+    """
+    process = os.getpid()
+    with _lock:
+        spans = list(_spans)
+        counter_events = list(_counter_events)
+        memory = list(_memory)
+    events = [
+        {"name": name, "ph": "X", "ts": round(start * 1e6, 1), "dur": round(duration * 1e6, 1),
+         "pid": process, "tid": thread, "args": args}
+        for name, start, duration, thread, args in spans
+    ]
+    events.extend(
+        {"name": name, "ph": "C", "ts": round(moment * 1e6, 1), "pid": process, "args": {name: total}}
+        for name, moment, total in counter_events
+    )
+    for label, moment, current, peak, rss in memory:
+        values = {key: value for key, value in (("traced", current), ("traced_peak", peak), ("max_rss", rss))
+                  if value is not None}
+        events.append({"name": "pamięć", "ph": "C", "ts": round(moment * 1e6, 1), "pid": process, "args": values})
+        events.append({"name": label, "ph": "i", "s": "p", "ts": round(moment * 1e6, 1), "pid": process, "tid": 0})
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file, ensure_ascii=False)
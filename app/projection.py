@@ -0,0 +1,28 @@
+from functools import lru_cache
+import numpy as np
+
+# Układ współrzędnych, w którym zapisane są miasta w bazie danych (lon/lat)
+DATABASE_CRS = "EPSG:4326"
+
+
+@lru_cache(maxsize=None)
+def get_transformer(source_crs, target_crs):
+    """Zwraca transformator pyproj dla pary układów współrzędnych (tworzony raz na parę)."""
+    from pyproj import Transformer
+
+    return Transformer.from_crs(source_crs, target_crs, always_xy=True)
+
+
+def project(lon, lat, target_crs, source_crs=DATABASE_CRS):
+    """
+    Przelicza całe kolumny współrzędnych jednym wywołaniem transformatora.
+
+    :param lon: Tablica długości geograficznych
+    :param lat: Tablica szerokości geograficznych
+    :param target_crs: Docelowy układ współrzędnych (np. "EPSG:2180")
+    :param source_crs: Źródłowy układ współrzędnych
+    :return: Tablice współrzędnych x, y w układzie docelowym
+    """
+    transformer = get_transformer(source_crs, target_crs)
+    x, y = transformer.transform(np.asarray(lon, dtype=np.float64), np.asarray(lat, dtype=np.float64))
+    return np.asarray(x), np.asarray(y)
@@ -0,0 +1,159 @@
+"""
+Bezgłówny interfejs zapytań o najkrótsze ścieżki.
+
+Moduł ładuje wyłącznie ``db_handler``, ``dataset`` oraz moduły algorytmów - bez PyQt5,
+matplotlib i geopandas - dzięki czemu może działać na serwerze bez ekranu.
+
+Przykłady:
+    python -m app.query --db app/data/polska.db --from Gdańsk --to Kraków
+    python -m app.query --db app/data/polska.db --batch < zapytania.jsonl
+    python -m app.query --db app/data/polska.db --batch --cache wyniki.json < zapytania.jsonl
+    python -m app.query --db app/data/polska.db --from Gdańsk --to Kraków --profile slad.json
+    python -m app.query --db app/data/polska.db --prepare-db
+
+W trybie wsadowym każdy wiersz wejścia to obiekt JSON z polami "from", "to"
+i opcjonalnie "algorithm"; każdy wiersz wyjścia to obiekt JSON z wynikiem.
+"""
+import time
+
+_import_started = time.perf_counter()
+
+import argparse
+import contextlib
+import json
+import sys
+from app import profiling
+from app.config import ALGORITHMS
+from app.dataset import Dataset
+from app.algorithms import registry
+from app.algorithms.cache import QueryCache
+from app.db_handler import prepare_database
+
+
+def load_graph(database_path):
+    """
+    Ładuje graf z bazy danych lub zwraca None, jeśli połączenie się nie powiodło.
+
+    Graf jest przygotowywany przez ``Dataset`` (odcisk danych, plik hierarchii
+    kontrakcji) tak samo jak w interfejsie graficznym.
+    """
+    # Komunikaty diagnostyczne trafiają na stderr, aby nie mieszać ich z wynikami
+    with contextlib.redirect_stdout(sys.stderr):
+        dataset = Dataset.from_database(database_path)
+    return None if dataset is None else dataset.graph
+
+
+def resolve_city(graph, city):
+    """Zwraca nazwę miasta podanego nazwą lub identyfikatorem z tabeli ``cities``."""
+    city = str(city)
+    if city in graph:
+        return city
+    if city.isdigit():
+        try:
+            return graph.names[graph.node_of_city(int(city))]
+        except KeyError:
+            pass
+    raise KeyError(f"Nieznane miasto: {city}")
+
+
+def run_query(graph, start, end, algorithm_name="Dijkstra", cache=None):
+    """
+    Wykonuje jedno zapytanie i zwraca wynik w postaci słownika gotowego do zapisu jako JSON.
+
+    :param cache: Opcjonalna pamięć podręczna wyników (QueryCache)
+    """
+    start = resolve_city(graph, start)
+    end = resolve_city(graph, end)
+    result = registry.run(algorithm_name, graph, start, end, cache=cache)
+    return {"from": start, "to": end, **result.as_dict()}
+
+
+def run_batch(graph, lines, output, default_algorithm="Dijkstra", cache=None):
+    """
+    Wykonuje zapytania wsadowe (JSONL) i zapisuje wyniki (JSONL).
+
+    Błędne zapytania nie przerywają przetwarzania - dla nich zapisywany jest
+    obiekt z polem "error".
+
+    :param cache: Opcjonalna pamięć podręczna wyników (QueryCache)
+    :return: Liczba przetworzonych zapytań
+    """
+    count = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        count += 1
+        try:
+            query = json.loads(line)
+            result = run_query(graph, query["from"], query["to"], query.get("algorithm", default_algorithm), cache)
+        except KeyError as e:
+            result = {"error": str(e.args[0]), "query": line}
+        except (ValueError, TypeError) as e:
+            result = {"error": str(e), "query": line}
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return count
+
+
+def main(argv=None):
+    started = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Zapytania o najkrótsze ścieżki bez interfejsu graficznego.")
+    parser.add_argument("--db", required=True, help="Ścieżka do bazy danych SQLite")
+    parser.add_argument("--from", dest="start", help="Miasto początkowe (nazwa lub id)")
+    parser.add_argument("--to", dest="end", help="Miasto końcowe (nazwa lub id)")
+    parser.add_argument("--algorithm", default="Dijkstra", choices=list(ALGORITHMS), help="Algorytm")
+    parser.add_argument("--batch", action="store_true", help="Czytaj zapytania JSONL ze standardowego wejścia")
+    parser.add_argument("--timing", action="store_true", help="Wypisz czasy etapów na stderr")
+    parser.add_argument("--cache", help="Plik JSON z pamięcią podręczną wyników (wczytywany i zapisywany)")
+    parser.add_argument("--profile", help="Zapisz ślad etapów w formacie Chrome Trace (chrome://tracing)")
+    parser.add_argument("--prepare-db", action="store_true",
+                        help="Załóż indeksy i włącz dziennik WAL w bazie (jednorazowa migracja) i zakończ")
+    args = parser.parse_args(argv)
+
+    if args.prepare_db:
+        return 0 if prepare_database(args.db) else 1
+    if not args.batch and (args.start is None or args.end is None):
+        parser.error("podaj --from i --to albo użyj --batch")
+
+    if args.profile:
+        profiling.enable()
+    with profiling.span("ładowanie grafu", path=args.db):
+        graph = load_graph(args.db)
+    if graph is None:
+        print(f"Błąd: Nie udało się nawiązać połączenia z bazą danych {args.db}", file=sys.stderr)
+        return 1
+    loaded = time.perf_counter()
+
+    cache = QueryCache(path=args.cache) if args.cache else None
+    exit_code = 0
+    if args.batch:
+        count = run_batch(graph, sys.stdin, sys.stdout, args.algorithm, cache)
+    else:
+        count = 1
+        try:
+            result = run_query(graph, args.start, args.end, args.algorithm, cache)
+        except KeyError as e:
+            result = {"error": str(e.args[0])}
+            exit_code = 1
+        print(json.dumps(result, ensure_ascii=False))
+    finished = time.perf_counter()
+    if cache is not None:
+        cache.save()
+    if args.profile:
+        profiling.memory_snapshot("koniec")
+        profiling.export_chrome_trace(args.profile)
+
+    if args.timing:
+        print(
+            f"Import modułów: {(started - _import_started) * 1000:.1f} ms, "
+            f"ładowanie grafu: {(loaded - started) * 1000:.1f} ms, "
+            f"zapytania ({count}): {(finished - loaded) * 1000:.1f} ms",
+            file=sys.stderr,
+        )
+        if cache is not None:
+            print(f"Pamięć podręczna: {cache.counters()}", file=sys.stderr)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
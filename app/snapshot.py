@@ -0,0 +1,203 @@
+"""
+Binarny zrzut grafu wczytywany przez mapowanie pliku do pamięci.
+
+Zrzut leży obok bazy danych (``<baza>.graph.bin``) i zawiera tablice CSR
+grafu, identyfikatory i współrzędne miast oraz tablicę nazw. Tablice są
+czytane przez ``numpy.memmap`` bez kopiowania, więc wczytanie trwa niemal
+stały czas, a procesy korzystające z tego samego pliku współdzielą strony
+pamięci systemu operacyjnego.
+
+Eksport zrzutów dla baz z ``MAPS_AND_DATABASES``:
+    python -m app.snapshot
+    python -m app.snapshot --db app/data/polska.db
+"""
+import json
+import os
+import struct
+import numpy as np
+from app.algorithms.csr_graph import CSRGraph
+
+MAGIC = b"GRAPHSNP"
+VERSION = 1
+ALIGNMENT = 64
+
+# Klucz w ``graph.derived`` ze ścieżką zrzutu, z którego pochodzi graf
+SNAPSHOT_KEY = "snapshot_path"
+
+_HEADER = struct.Struct("<8sII")  # znacznik, wersja, długość nagłówka JSON
+
+
+def snapshot_path(database_path):
+    """Ścieżka pliku zrzutu obok bazy danych."""
+    return database_path + ".graph.bin"
+
+
+def source_key(database_path):
+    """
+    Czas modyfikacji i rozmiar bazy (oraz niepustego dziennika WAL) - szybki test, czy baza się zmieniła.
+
+    Używany przez zrzut grafu i przez ``DatasetManager``, więc oba zgadzają się
+    co do aktualności danych. Pusty dziennik tworzą same połączenia tylko do
+    odczytu, więc jest pomijany; plik ``-shm`` nie zawiera danych. Dla
+    nieistniejącej bazy zwracany jest pusty napis.
+    """
+    parts = []
+    for path in (database_path, database_path + "-wal"):
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            stat = os.stat(path)
+            parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+    return "|".join(parts)
+
+
+def _align(position):
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_snapshot(graph, path, fingerprint, source=""):
+    """
+    Zapisuje graf do pliku zrzutu.
+
+    Plik jest najpierw zapisywany pod nazwą tymczasową i podmieniany w całości,
+    więc inne procesy nigdy nie widzą zrzutu zapisanego w połowie.
+
+    :param fingerprint: Odcisk danych bazy (``get_data_fingerprint``)
+    :param source: Klucz pliku bazy (``source_key``) pozwalający pominąć liczenie odcisku
+    """
+    encoded = [name.encode("utf-8") for name in graph.names]
+    arrays = {
+        "offsets": graph.offsets,
+        "targets": graph.targets,
+        "weights": graph.weights,
+        "city_ids": graph.city_ids,
+        "name_offsets": np.cumsum([0] + [len(name) for name in encoded], dtype=np.int64),
+        "name_bytes": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    }
+    if graph.coordinates is not None:
+        arrays["coordinates"] = graph.coordinates
+
+    # Przesunięcia tablic liczone są od początku danych, który leży za nagłówkiem
+    layout = {}
+    position = 0
+    for name, array in arrays.items():
+        array = np.asarray(array)
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": position}
+        position = _align(position + array.nbytes)
+    header = json.dumps({
+        "fingerprint": fingerprint,
+        "source": source,
+        "directed": graph.directed,
+        "arrays": layout,
+    }).encode("utf-8")
+    data_start = _align(_HEADER.size + len(header))
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, len(header)))
+        file.write(header)
+        for name, array in arrays.items():
+            file.seek(data_start + layout[name]["offset"])
+            file.write(np.ascontiguousarray(array).tobytes())
+        file.truncate(data_start + position)
+    os.replace(temporary, path)
+
+
+def _read_header(path):
+    with open(path, "rb") as file:
+        magic, version, length = _HEADER.unpack(file.read(_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Nieobsługiwany format zrzutu grafu: {path}")
+        header = json.loads(file.read(length).decode("utf-8"))
+    header["data_start"] = _align(_HEADER.size + length)
+    return header
+
+
+def read_snapshot(path):
+    """
+    Wczytuje graf z pliku zrzutu.
+
+    Tablice grafu są widokami tylko do odczytu na pliku mapowanym do pamięci;
+    kopiowana jest jedynie tablica nazw (potrzebna jako lista Pythona).
+
+    :return: Graf, nagłówek zrzutu (słownik z polami "fingerprint" i "source")
+    """
+    header = _read_header(path)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {
+        name: np.ndarray(tuple(spec["shape"]), dtype=np.dtype(spec["dtype"]), buffer=buffer,
+                          offset=header["data_start"] + spec["offset"])
+        for name, spec in header["arrays"].items()
+    }
+    name_bytes = arrays["name_bytes"].tobytes()
+    name_offsets = arrays["name_offsets"].tolist()
+    names = [name_bytes[start:stop].decode("utf-8") for start, stop in zip(name_offsets, name_offsets[1:])]
+
+    graph = CSRGraph(
+        names, arrays["offsets"], arrays["targets"], arrays["weights"],
+        arrays["city_ids"], header["directed"], arrays.get("coordinates"),
+    )
+    graph.derived[SNAPSHOT_KEY] = path
+    return graph, header
+
+
+def load_snapshot(database_path):
+    """
+    Zwraca graf bazy danych z pliku zrzutu, tworząc lub odświeżając zrzut w razie potrzeby.
+
+    Zrzut jest aktualny, jeśli nie zmienił się plik bazy (czas modyfikacji
+    i rozmiar) - wtedy baza nie jest nawet otwierana. W przeciwnym razie
+    porównywany jest odcisk danych, a przy niezgodności graf jest budowany
+    z bazy i zapisywany ponownie.
+
+    :return: Graf i odcisk danych lub (None, None), jeśli nie udało się połączyć z bazą
+    """
+    path = snapshot_path(database_path)
+    header = None
+    if os.path.exists(path):
+        try:
+            graph, header = read_snapshot(path)
+            if header["source"] and header["source"] == source_key(database_path):
+                return graph, header["fingerprint"]
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Błąd odczytu zrzutu grafu: {e}")
+
+    from app.db_handler import get_connection, get_data_fingerprint
+
+    conn = get_connection(database_path)
+    if conn is None:
+        return None, None
+    fingerprint = get_data_fingerprint(conn)
+    source = source_key(database_path)
+    if header is not None and header["fingerprint"] == fingerprint:
+        # Dane się nie zmieniły (np. baza dostała tylko indeksy) - wystarczy odświeżyć klucz pliku
+        try:
+            save_snapshot(graph, path, fingerprint, source)
+            graph = read_snapshot(path)[0]
+        except OSError as e:
+            print(f"Nie udało się zapisać zrzutu grafu: {e}")
+        return graph, fingerprint
+
+    if header is not None:
+        print(f"Zrzut grafu {path} jest nieaktualny, trwa przebudowa.")
+    graph = CSRGraph.from_database(conn)
+    try:
+        save_snapshot(graph, path, fingerprint, source)
+        graph.derived[SNAPSHOT_KEY] = path
+    except OSError as e:
+        print(f"Nie udało się zapisać zrzutu grafu: {e}")
+    return graph, fingerprint
+
+
+if __name__ == "__main__":
+    import argparse
+    from app.config import MAPS_AND_DATABASES
+
+    parser = argparse.ArgumentParser(description="Zapisuje binarne zrzuty grafów baz danych.")
+    parser.add_argument("--db", action="append", help="Ścieżka do bazy danych (domyślnie wszystkie z konfiguracji)")
+    args = parser.parse_args()
+
+    for database_path in args.db or [data["database_path"] for data in MAPS_AND_DATABASES.values()]:
+        graph, _ = load_snapshot(database_path)
+        if graph is None:
+            print(f"Pominięto {database_path}: brak połączenia z bazą danych")
+            continue
+        print(f"Zrzut grafu: {graph.node_count} węzłów, {graph.edge_count} krawędzi -> {snapshot_path(database_path)}")
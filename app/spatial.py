@@ -0,0 +1,94 @@
+import math
+import numpy as np
+
+
+class GridIndex:
+    """
+    Indeks przestrzenny punktów oparty na regularnej siatce komórek.
+
+    Punkty są przypisywane do kwadratowych komórek o boku ``cell_size``.
+    Wyszukiwanie najbliższego punktu przegląda komórki pierścieniami wokół
+    zapytania i kończy się, gdy kolejny pierścień nie może zawierać punktu
+    bliższego od już znalezionego.
+    """
+
+    def __init__(self, x, y, cell_size=None):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        if cell_size is None:
+            cell_size = self._default_cell_size()
+        self.cell_size = cell_size
+
+        cells = {}
+        columns = np.floor(self.x / cell_size).astype(np.int64)
+        rows = np.floor(self.y / cell_size).astype(np.int64)
+        for point, key in enumerate(zip(columns.tolist(), rows.tolist())):
+            cells.setdefault(key, []).append(point)
+        self.cells = {key: np.array(points) for key, points in cells.items()}
+        self.bounds = (
+            (int(columns.min()), int(rows.min()), int(columns.max()), int(rows.max())) if len(self.x) else None
+        )
+
+    def _default_cell_size(self):
+        """Dobiera rozmiar komórki tak, by przypadało średnio kilka punktów na komórkę."""
+        if len(self.x) < 2:
+            return 1.0
+        width = np.ptp(self.x)
+        height = np.ptp(self.y)
+        area = max(width * height, max(width, height) ** 2 / len(self.x), 1e-9)
+        return max(math.sqrt(area * 4 / len(self.x)), 1e-9)
+
+    def __len__(self):
+        return len(self.x)
+
+    def nearest(self, x, y, max_distance=float('inf')):
+        """
+        Zwraca najbliższy punkt w odległości nie większej niż ``max_distance``.
+
+        :param x: Współrzędna x zapytania
+        :param y: Współrzędna y zapytania
+        :param max_distance: Maksymalna odległość (tolerancja)
+        :return: Indeks punktu i odległość albo (None, inf), jeśli brak punktu
+        """
+        if len(self.x) == 0:
+            return None, float('inf')
+
+        column = math.floor(x / self.cell_size)
+        row = math.floor(y / self.cell_size)
+        best_point, best_distance = None, float('inf')
+        # Pierścienie dalej niż krawędź siatki lub niż tolerancja nie zawierają kandydatów
+        min_column, min_row, max_column, max_row = self.bounds
+        max_ring = max(abs(column - min_column), abs(column - max_column), abs(row - min_row), abs(row - max_row))
+        if max_distance != float('inf'):
+            max_ring = min(max_ring, math.ceil(max_distance / self.cell_size))
+
+        for ring in range(max_ring + 1):
+            # Najbliższy możliwy punkt w pierścieniu jest odległy o co najmniej (ring - 1) komórek
+            if (ring - 1) * self.cell_size > min(best_distance, max_distance):
+                break
+            for key in _ring_cells(column, row, ring):
+                points = self.cells.get(key)
+                if points is None:
+                    continue
+                distances = np.hypot(self.x[points] - x, self.y[points] - y)
+                closest = int(np.argmin(distances))
+                if distances[closest] < best_distance:
+                    best_point, best_distance = int(points[closest]), float(distances[closest])
+
+        if best_distance > max_distance:
+            return None, float('inf')
+        return best_point, best_distance
+
+
+def _ring_cells(column, row, ring):
+    """Zwraca klucze komórek leżących na pierścieniu o promieniu ``ring`` wokół komórki."""
+    if ring == 0:
+        return [(column, row)]
+    cells = []
+    for offset in range(-ring, ring + 1):
+        cells.append((column + offset, row - ring))
+        cells.append((column + offset, row + ring))
+    for offset in range(-ring + 1, ring):
+        cells.append((column - ring, row + offset))
+        cells.append((column + ring, row + offset))
+    return cells
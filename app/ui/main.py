@@ -1,9 +1,13 @@
 import sys
 import importlib
-from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QMenuBar, QTextEdit, QWidget, QPushButton, QMessageBox, QDialog, QLabel, QComboBox, QLineEdit
+from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QMenuBar, QTextEdit, QWidget, QPushButton, QMessageBox, QDialog, QLabel, QComboBox, QLineEdit, QSpinBox, QFileDialog
 from PyQt5.QtGui import QFont
+from app import profiling
 from app.ui.map_visualizer import MapVisualizer
-from app.config import MAPS_AND_DATABASES
+from app.config import (
+    MAPS_AND_DATABASES, ALGORITHMS, AUTOPLAY_INTERVAL_MS, AUTOPLAY_STEPS_PER_FRAME, PRELOAD_DATASETS,
+    ALTERNATIVE_ROUTES, ALTERNATIVE_MAX_OVERLAP,
+)
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -27,9 +31,52 @@ class MainWindow(QMainWindow):
         font = QFont("Arial", 14)  # Ustawienie czcionki i rozmiaru
         self.steps_text.setFont(font)
 
+        # Sterowanie krokami algorytmu
+        controls = QHBoxLayout()
+        self.layout.addLayout(controls)
+
         self.next_step_button = QPushButton("Następny krok")
         self.next_step_button.clicked.connect(self.map_visualizer.next_step)
-        self.layout.addWidget(self.next_step_button)
+        controls.addWidget(self.next_step_button)
+
+        self.autoplay_button = QPushButton("Odtwarzaj")
+        self.autoplay_button.clicked.connect(self.toggle_autoplay)
+        controls.addWidget(self.autoplay_button)
+
+        controls.addWidget(QLabel("Kroków na klatkę:"))
+        self.steps_per_frame_input = QSpinBox()
+        self.steps_per_frame_input.setRange(1, 100000)
+        self.steps_per_frame_input.setValue(AUTOPLAY_STEPS_PER_FRAME)
+        controls.addWidget(self.steps_per_frame_input)
+
+        controls.addWidget(QLabel("Odstęp (ms):"))
+        self.autoplay_interval_input = QSpinBox()
+        self.autoplay_interval_input.setRange(1, 10000)
+        self.autoplay_interval_input.setValue(AUTOPLAY_INTERVAL_MS)
+        controls.addWidget(self.autoplay_interval_input)
+
+        # Trasy alternatywne
+        alternatives = QHBoxLayout()
+        self.layout.addLayout(alternatives)
+
+        self.alternatives_button = QPushButton("Trasy alternatywne")
+        self.alternatives_button.clicked.connect(self.find_alternatives)
+        alternatives.addWidget(self.alternatives_button)
+
+        alternatives.addWidget(QLabel("Liczba tras:"))
+        self.alternatives_count_input = QSpinBox()
+        self.alternatives_count_input.setRange(1, 20)
+        self.alternatives_count_input.setValue(ALTERNATIVE_ROUTES)
+        alternatives.addWidget(self.alternatives_count_input)
+
+        alternatives.addWidget(QLabel("Maks. wspólna część (%):"))
+        self.alternatives_overlap_input = QSpinBox()
+        self.alternatives_overlap_input.setRange(0, 100)
+        self.alternatives_overlap_input.setValue(round(ALTERNATIVE_MAX_OVERLAP * 100))
+        alternatives.addWidget(self.alternatives_overlap_input)
+
+        self.map_visualizer.autoplay_timer.timeout.connect(self._update_autoplay_button)
+        self.map_visualizer.map_loaded.connect(self._on_map_loaded)
 
 
         # Menu
@@ -39,6 +86,9 @@ class MainWindow(QMainWindow):
         self._populate_map_menu()
         self._populate_tools_menu()
 
+        if PRELOAD_DATASETS:
+            self.preload_maps()
+
     def _populate_map_menu(self):
         """Tworzy dynamiczne menu map i baz danych."""
         map_menu = self.menu.addMenu("Mapy")
@@ -51,28 +101,104 @@ class MainWindow(QMainWindow):
                 lambda mp=map_path, db=database_path, cm=country_module: self.load_map_and_database(mp, db, cm)
             )
 
+    def preload_maps(self):
+        """Wczytuje w tle wszystkie kraje z ``MAPS_AND_DATABASES``, by przełączenie kraju w menu było natychmiastowe."""
+        countries = []
+        for data in MAPS_AND_DATABASES.values():
+            settings = importlib.import_module(data["module"]).country_specific_settings()
+            countries.append((data["map_path"], data["database_path"], settings["crs"]))
+        self.map_visualizer.dataset_manager.preload(
+            countries, lambda map_path, loaded: print(f"Wstępnie załadowano mapę: {map_path}" if loaded else
+                                                      f"Nie udało się wstępnie załadować mapy: {map_path}")
+        )
+
     def _populate_tools_menu(self):
         """Dodaje przyciski do menu Narzędzia."""
         tools_menu = self.menu.addMenu("Narzędzia")
 
         # Wybór i uruchomienie algorytmów
         algorithm_menu = tools_menu.addMenu("Wybierz algorytm")
-        algorithm_menu.addAction("Dijkstra", lambda: self.run_algorithm("dijkstra"))
+        for algorithm_name in ALGORITHMS:
+            algorithm_menu.addAction(algorithm_name, lambda name=algorithm_name: self.run_algorithm(name))
 
+        tools_menu.addAction("Anuluj", lambda: self.map_visualizer.cancel())
         tools_menu.addAction("Reset", lambda: self.reset())
 
+        # Pomiar czasu etapów, liczników i pamięci (patrz app.profiling)
+        profiling_menu = tools_menu.addMenu("Profilowanie")
+        self.profile_action = profiling_menu.addAction("Włącz pomiar")
+        self.profile_action.setCheckable(True)
+        self.profile_action.toggled.connect(self.update_profiling)
+        self.profile_memory_action = profiling_menu.addAction("Śledź pamięć (wolniej)")
+        self.profile_memory_action.setCheckable(True)
+        self.profile_memory_action.toggled.connect(self.update_profiling)
+        profiling_menu.addAction("Pokaż raport", lambda: self.steps_text.append(profiling.report()))
+        profiling_menu.addAction("Eksportuj ślad...", self.export_profile)
+        profiling_menu.addAction("Wyczyść pomiary", profiling.reset)
+
     def run_algorithm(self, algorithm_name):
         """Ustawia i uruchamia wybrany algorytm."""
-        if algorithm_name == "dijkstra":
-            self.map_visualizer.algorithm = self.map_visualizer.run_dijkstra
-            self.steps_text.append("Wybrano algorytm: Dijkstra")
-            self.map_visualizer.run_dijkstra()  # Uruchomienie Dijkstry
+        if algorithm_name in ALGORITHMS:
+            self.map_visualizer.algorithm = algorithm_name
+            self.steps_text.append(f"Wybrano algorytm: {algorithm_name}")
+            self.map_visualizer.run_algorithm(algorithm_name, background=True)
         else:
             QMessageBox.warning(self, "Błąd", "Nieznany algorytm.")
 
 
+    def find_alternatives(self):
+        """Wyszukuje trasy alternatywne między wybranymi miastami z ustawieniami z panelu."""
+        self.steps_text.append(f"Wyszukiwanie tras alternatywnych: {self.alternatives_count_input.value()}")
+        self.map_visualizer.find_alternatives(
+            self.alternatives_count_input.value(), self.alternatives_overlap_input.value() / 100, background=True
+        )
+
+    def update_profiling(self):
+        """Włącza, wyłącza lub zmienia tryb pomiaru zgodnie z opcjami menu Profilowanie."""
+        profiling.disable()
+        if not self.profile_action.isChecked():
+            self.steps_text.append("Profilowanie wyłączone.")
+            return
+        memory = self.profile_memory_action.isChecked()
+        profiling.enable(memory=memory)
+        self.steps_text.append("Profilowanie włączone" + (" (ze śledzeniem pamięci)." if memory else "."))
+
+    def export_profile(self):
+        """Zapisuje zebrane pomiary jako ślad Chrome (chrome://tracing) lub podsumowanie JSON."""
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Eksportuj ślad", "profil.json", "Ślad Chrome (*.json);;Podsumowanie JSON (*.json)"
+        )
+        if not path:
+            return
+        try:
+            if selected_filter.startswith("Podsumowanie"):
+                profiling.export_json(path)
+            else:
+                profiling.export_chrome_trace(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Błąd", f"Nie udało się zapisać śladu: {e}")
+            return
+        self.steps_text.append(f"Zapisano pomiary: {path}")
+
+    def toggle_autoplay(self):
+        """Uruchamia lub zatrzymuje automatyczne odtwarzanie kroków."""
+        if self.map_visualizer.is_autoplaying():
+            self.map_visualizer.stop_autoplay()
+        else:
+            self.map_visualizer.start_autoplay(
+                self.autoplay_interval_input.value(), self.steps_per_frame_input.value()
+            )
+        self._update_autoplay_button()
+
+    def _update_autoplay_button(self):
+        self.autoplay_button.setText("Zatrzymaj" if self.map_visualizer.is_autoplaying() else "Odtwarzaj")
+
     def load_map_and_database(self, map_path, database_path, country_module):
         """Ładuje mapę, bazę danych oraz moduł kraju."""
+        if self.map_visualizer.is_busy():
+            self.steps_text.append("Poczekaj na zakończenie bieżącego zadania lub je anuluj.")
+            return
+
         # Importowanie modułu kraju
         country = importlib.import_module(country_module)
         settings = country.country_specific_settings()
@@ -82,10 +208,12 @@ class MainWindow(QMainWindow):
 
         # Ładowanie mapy i bazy danych
         self.map_visualizer.set_database(database_path)
-        self.map_visualizer.load_map(map_path)
+        self.map_visualizer.load_map(map_path, background=True)
 
+    def _on_map_loaded(self, map_path):
+        """Informuje o zakończeniu ładowania mapy (mapa ładuje się w tle)."""
         self.steps_text.append(f"Załadowano mapę: {map_path}")
-        self.steps_text.append(f"Ustawiono bazę danych: {database_path}")
+        self.steps_text.append(f"Ustawiono bazę danych: {self.map_visualizer.database_path}")
 
     def reset(self):
         """Resetuje wszystkie ustawienia."""
@@ -101,7 +229,8 @@ class MainWindow(QMainWindow):
             "1. Załaduj mapę, wybierając odpowiedni plik w menu 'Mapy'.\n"
             "2. Kliknij na dwa miasta, aby ustawić punkt początkowy i końcowy.\n"
             "3. Wybierz algorytm w menu 'Narzędzia/Wybierz algorytm'.\n"
-            "4. Przejdź przez kroki algorytmu za pomocą przycisku 'Następny krok'.\n"
+            "4. Przejdź przez kroki algorytmu za pomocą przycisku 'Następny krok'\n"
+            "   lub odtwórz je automatycznie przyciskiem 'Odtwarzaj'.\n"
             "5. Po zakończeniu sprawdź najkrótszą ścieżkę i jej koszt.\n\n"
             "Miłej pracy!"
         )
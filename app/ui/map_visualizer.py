@@ -1,29 +1,122 @@
 from PyQt5.QtWidgets import QMessageBox
 from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import QTimer, pyqtSignal
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
-import networkx as nx
-from app.db_handler import connect_to_db, get_connections
-import math
+from app.dataset_manager import DatasetManager
+from matplotlib.collections import LineCollection, PathCollection
+from pyproj import CRS
+from app.basemap import load_basemap
+from app.config import (
+    CLICK_TOLERANCE_PX, MAX_CITY_LABELS, AUTOPLAY_INTERVAL_MS, AUTOPLAY_STEPS_PER_FRAME,
+    QUERY_CACHE_SIZE, SHORTEST_PATH_TREES, DATASET_MEMORY_BUDGET_MB, ALTERNATIVE_COLORS,
+)
+from app.spatial import GridIndex
+from app import profiling
+from app.algorithms import registry
+from app.algorithms.cache import QueryCache
+from app.algorithms.k_shortest import k_shortest_paths
+from app.algorithms.trace import TRACE_LAZY
+from app.ui.workers import Worker
+import functools
+import itertools
+import time
+import numpy as np
+
+def _prepare_map(manager, shp_path, crs, database_path, progress=None):
+    """
+    Przygotowuje dane mapy bez udziału interfejsu (może działać w wątku w tle):
+    mapę podkładową, zbiór danych i współrzędne miast w CRS mapy. Kraje
+    wczytane wcześniej (także wstępnie, w tle) pochodzą z menedżera ``manager``.
+
+    :return: Mapa podkładowa, zbiór danych (lub None)
+    """
+    loaded = manager.get(shp_path, database_path, crs)
+    if loaded is None:
+        # Brak połączenia z bazą - sama mapa podkładowa (błąd zgłosi _load_cities_and_connections)
+        return load_basemap(shp_path, crs), None
+    return loaded.basemap, loaded.dataset
+
+
+def _run_algorithm(cache, algorithm_name, graph, start, end, progress=None):
+    """
+    Uruchamia algorytm o nazwie z ``ALGORITHMS`` (może działać w wątku w tle),
+    korzystając z pamięci podręcznej wyników.
+
+    :return: Wynik wyszukiwania (SearchResult) z krokami w postaci iteratora
+    """
+    return registry.run(algorithm_name, graph, start, end, trace=TRACE_LAZY, progress=progress, cache=cache)
+
+
+def _find_alternatives(cache, graph, start, end, k, max_overlap, progress=None):
+    """
+    Wyznacza trasy alternatywne (może działać w wątku w tle), korzystając
+    z drzew najkrótszych ścieżek z pamięci podręcznej.
+
+    :return: Lista par (ścieżka, koszt), statystyki wyszukiwania, czas w sekundach
+    """
+    stats = {}
+    with profiling.span("trasy alternatywne", start=start, end=end, k=k):
+        started = time.perf_counter()
+        routes = k_shortest_paths(graph, start, end, k, max_overlap, stats=stats, progress=progress, cache=cache)
+        wall_time = time.perf_counter() - started
+    profiling.count("settled", stats["settled"])
+    profiling.count("relaxed", stats["relaxed"])
+    return routes, stats, wall_time
+
 
 class MapVisualizer(FigureCanvas):
+    # Emitowany po narysowaniu załadowanej mapy (argument: ścieżka pliku mapy)
+    map_loaded = pyqtSignal(str)
+
     def __init__(self, parent):
         self.figure = plt.Figure(figsize=(8, 6))
         super().__init__(self.figure)
         self.ax = None
         self.parent = parent
         self.city_points = {}
-        self.graph = nx.Graph()
+        self.city_index = None
+        self.city_names = []
+        self.city_xy = None
+        self.city_labels = []
+        self.city_label_nodes = []
+        # Miasta i połączenia rysowane zależnie od widoku (patrz app.level_of_detail)
+        self.network = None
+        self.network_view = None
+        self.connection_collection = None
+        self.city_collection = None
+        self.dataset = None
         self.start_city = None
         self.end_city = None
-        self.steps = []
+        self.steps = iter(())  # Kroki algorytmu pobierane leniwie
         self.current_step = 0
         self.shortest_path = []
+        self.total_cost = float('inf')
         self.map_crs = None
+        self.basemap = None
+        self.basemap_collection = None
         self.country_settings = None
         self.database_path = None
         self.mpl_connect("button_press_event", self.on_click)
 
+        # Podświetlenia rysowane przez blitting: (kolor, grubość) -> (kolekcja, odcinki)
+        self.highlight_layers = {}
+        self.background = None
+
+        # Automatyczne odtwarzanie kroków
+        self.autoplay_steps_per_frame = AUTOPLAY_STEPS_PER_FRAME
+        self.autoplay_timer = QTimer(self)
+        self.autoplay_timer.timeout.connect(self._autoplay_tick)
+
+        # Zadanie w tle (ładowanie mapy, algorytm); naraz wykonywane jest jedno
+        self.worker = None
+
+        # Wyniki zapytań (unieważniane przy ładowaniu mapy i resecie)
+        self.query_cache = QueryCache(QUERY_CACHE_SIZE, SHORTEST_PATH_TREES)
+
+        # Załadowane kraje (zachowywane przy resecie, by powrót do kraju był natychmiastowy)
+        self.dataset_manager = DatasetManager(DATASET_MEMORY_BUDGET_MB * 2 ** 20)
+
     def set_database(self, database_path):
         """Ustawia bazę danych dla wizualizacji."""
         self.database_path = database_path
@@ -33,58 +126,71 @@ class MapVisualizer(FigureCanvas):
         self.country_settings = settings
         print(f"Ustawienia kraju: {self.country_settings}")
 
-    def load_map(self, shp_path):
-        """Ładuje mapę i rysuje miasta oraz połączenia."""
-        import geopandas as gpd
-
+    def load_map(self, shp_path, background=False):
+        """
+        Ładuje mapę i rysuje miasta oraz połączenia.
+
+        :param background: Czy czytać dane w wątku w tle (mapa jest rysowana po ich przygotowaniu);
+            kraj załadowany już w menedżerze jest rysowany od razu
+        """
+        crs = self.country_settings["crs"]
+        if background and self.dataset_manager.cached(shp_path, self.database_path, crs) is not None:
+            background = False
+        self._start_task(
+            functools.partial(_prepare_map, self.dataset_manager, shp_path, crs, self.database_path),
+            lambda result: self._show_map(shp_path, *result),
+            "Błąd ładowania mapy",
+            "Ładowanie mapy...",
+            background,
+        )
+
+    def _show_map(self, shp_path, basemap, dataset):
+        """Rysuje przygotowaną mapę podkładową, miasta i połączenia."""
+        with profiling.span("rysowanie mapy"):
+            self._draw_map(basemap, dataset)
+        self.map_loaded.emit(shp_path)
+
+    def _draw_map(self, basemap, dataset):
         if self.ax is None:
             self.ax = self.figure.add_subplot(111)
         self.ax.clear()
-
-        try:
-            gdf = gpd.read_file(shp_path)
-            self.map_crs = gdf.crs
-
-            # Sprawdzanie zgodności CRS
-            if self.map_crs.to_string() != self.country_settings["crs"]:
-                gdf = gdf.to_crs(self.country_settings["crs"])
-                self.map_crs = gdf.crs
-
-            # Rysowanie mapy
-            gdf.plot(ax=self.ax, color="lightgray", edgecolor="black")
-            self.ax.axis("off")
-        except Exception as e:
-            self.parent.steps_text.append(f"Błąd ładowania mapy: {e}")
-            return
-
+        self._clear_highlights()
+
+        # Geometria rzutowana do CRS kraju, czytana z pamięci podręcznej, jeśli jest aktualna
+        self.basemap = basemap
+        self.map_crs = CRS.from_user_input(self.basemap.crs)
+
+        # Rysowanie mapy
+        self.basemap_collection = PathCollection(
+            self.basemap.levels[0], facecolor="lightgray", edgecolor="black", linewidth=0.5
+        )
+        self.ax.add_collection(self.basemap_collection)
+        self.ax.autoscale_view()
+        self.ax.set_aspect("equal")
+        self.ax.axis("off")
+
+        self.dataset = dataset
+        self.query_cache.invalidate()
         self._load_cities_and_connections()
         self._convert_city_coordinates_to_map_crs()
         self._draw_cities_and_connections()
         self.draw()
-        self.figure.canvas.mpl_connect("button_press_event", self.on_click)
-
 
     def _load_cities_and_connections(self):
-        """Ładuje miasta i połączenia z bazy danych."""
-        conn = connect_to_db(self.database_path)
-        if conn:
-            from app.db_handler import get_cities, get_connections
-            # Pobieranie miast
-            cities = get_cities(conn)
-            self.city_points = {city[1]: (city[0], city[3], city[2]) for city in cities}  # (id, lon, lat)
-
-            # Pobieranie połączeń
-            self.connections = get_connections(conn)
-
-            conn.close()
+        """
+        Przejmuje miasta ze zbioru danych przygotowanego przez menedżer krajów.
+
+        Jeśli zbioru nie udało się wczytać, zgłaszany jest błąd - baza nie jest
+        czytana ponownie w wątku interfejsu.
+        """
+        if self.dataset is not None:
+            self.city_points = self.dataset.city_points()
         else:
+            self.city_points = {}
             self.parent.steps_text.append("Błąd: Nie udało się nawiązać połączenia z bazą danych.")
 
     def _convert_city_coordinates_to_map_crs(self):
         """Konwertuje współrzędne miast na CRS mapy."""
-        import pyproj
-        from pyproj import Transformer
-
         if not self.city_points:
             self.parent.steps_text.append("Brak danych o miastach do konwersji.")
             return
@@ -97,28 +203,57 @@ class MapVisualizer(FigureCanvas):
         map_crs_epsg = self.map_crs.to_epsg()
         print(f"Konwersja współrzędnych miast do CRS: EPSG:{map_crs_epsg}")  # Debugowanie CRS
 
-        # Tworzenie transformera
-        transformer = Transformer.from_crs("EPSG:4326", map_crs_epsg, always_xy=True)
-
-        # Konwersja współrzędnych miast
-        for city_name, (id, lon, lat) in self.city_points.items():
-            x, y = transformer.transform(lat, lon)  # Upewniamy się, że kolejność współrzędnych jest poprawna
-            self.city_points[city_name] = (id, x, y)
+        # Konwersja wszystkich współrzędnych naraz (wynik zapamiętywany w zbiorze danych)
+        graph = self.dataset.graph
+        x, y = self.dataset.project(f"EPSG:{map_crs_epsg}")
+        for city_name, city_x, city_y in zip(graph.names, x.tolist(), y.tolist()):
+            self.city_points[city_name] = (self.city_points[city_name][0], city_x, city_y)
+
+        # Współrzędne rzutowane dla heurystyki euklidesowej (A*) i rysowania
+        self.city_xy = np.column_stack([x, y])
+        graph.projected = self.city_xy
+
+        # Indeks przestrzenny do wyszukiwania klikniętego miasta
+        self.city_names = graph.names
+        self.city_index = GridIndex(x, y)
+
+    def nearest_city(self, x, y, max_distance=float('inf')):
+        """
+        Zwraca nazwę miasta najbliższego punktowi (x, y) w CRS mapy.
+
+        :param max_distance: Maksymalna odległość w jednostkach CRS mapy
+        :return: Nazwa miasta lub None, jeśli żadne miasto nie leży dość blisko
+        """
+        if self.city_index is None:
+            return None
+        point, _ = self.city_index.nearest(x, y, max_distance)
+        return None if point is None else self.city_names[point]
+
+    def _click_tolerance(self):
+        """Przelicza tolerancję kliknięcia z pikseli na jednostki mapy przy bieżącym powiększeniu."""
+        x_min, x_max = self.ax.get_xlim()
+        width_px = self.ax.get_window_extent().width
+        return CLICK_TOLERANCE_PX * abs(x_max - x_min) / max(width_px, 1)
 
     def reset(self):
         """Resetuje wizualizator."""
         self.ax.clear()
         self.city_points.clear()
-        self.graph.clear()
+        self.city_index = None
+        self.dataset = None
         self.start_city = None
         self.end_city = None
-        self.steps.clear()
+        self.steps = iter(())
         self.current_step = 0
         self.shortest_path = []
         self.draw()
 
-    def run_dijkstra(self):
-        """Uruchamia algorytm Dijkstry."""
+    def run_algorithm(self, algorithm_name, background=False):
+        """
+        Uruchamia algorytm o nazwie z ``ALGORITHMS`` (moduł algorytmu jest importowany przy pierwszym użyciu).
+
+        :param background: Czy wykonać przeszukiwanie w wątku w tle
+        """
         if not self.start_city or not self.end_city:
             msg_box = QMessageBox(self)
             msg_box.setIcon(QMessageBox.Warning)
@@ -133,72 +268,285 @@ class MapVisualizer(FigureCanvas):
             msg_box.exec_()
             return
 
-        # Budowa grafu
-        for city_name, (id, x, y) in self.city_points.items():
-            self.graph.add_node(city_name, pos=(x, y))
-        for connection in self.connections:
-            _, city_a_id, city_b_id, distance = connection
-            city_a = next((name for name, (id, _, _) in self.city_points.items() if id == city_a_id), None)
-            city_b = next((name for name, (id, _, _) in self.city_points.items() if id == city_b_id), None)
-            if city_a and city_b:
-                self.graph.add_edge(city_a, city_b, weight=distance)
-
-        # Uruchomienie algorytmu
-        try:
-            from app.algorithms.dijkstra import dijkstra
-            path, total_cost, steps = dijkstra(self.graph, self.start_city, self.end_city)
-            self.shortest_path = [(path[i], path[i + 1]) for i in range(len(path) - 1)]
-            self.steps = steps
-            self.current_step = 0
-        except Exception as e:
-            self.parent.steps_text.append(f"Błąd podczas uruchamiania algorytmu: {e}")
+        self.stop_autoplay()
+
+        # Uruchomienie algorytmu na grafie zbudowanym przy ładowaniu mapy
+        self._start_task(
+            functools.partial(
+                _run_algorithm, self.query_cache, algorithm_name, self.dataset.graph, self.start_city, self.end_city
+            ),
+            self._show_algorithm_result,
+            "Błąd podczas uruchamiania algorytmu",
+            "Wyszukiwanie ścieżki...",
+            background,
+        )
+
+    def find_alternatives(self, k, max_overlap, background=False):
+        """
+        Wyznacza do ``k`` tras między wybranymi miastami i rysuje je w różnych kolorach.
+
+        :param max_overlap: Największa część długości trasy (0..1) wspólna z inną trasą
+        :param background: Czy wyszukiwać w wątku w tle
+        """
+        if not self.start_city or not self.end_city:
+            self._show_error("Błąd", "Wybierz miasto początkowe i końcowe.")
+            return
+
+        self.stop_autoplay()
+        self._start_task(
+            functools.partial(
+                _find_alternatives, self.query_cache, self.dataset.graph, self.start_city, self.end_city,
+                k, max_overlap,
+            ),
+            self._show_alternatives,
+            "Błąd wyszukiwania tras alternatywnych",
+            "Wyszukiwanie tras alternatywnych...",
+            background,
+        )
+
+    def _show_alternatives(self, result):
+        routes, stats, wall_time = result
+        self.parent.steps_text.append(
+            f"Sprawdzono tras: {stats['candidates']}, ustalonych węzłów: {stats['settled']}, "
+            f"czas: {wall_time * 1000:.1f} ms"
+        )
+        if not routes:
+            self._show_info("Trasy alternatywne", "Brak ścieżki między wybranymi miastami.")
+            return
+        self._highlight_routes(routes)
+
+    def _show_algorithm_result(self, result):
+        path = result.path
+        self.shortest_path = [(path[i], path[i + 1]) for i in range(len(path) - 1)]
+        self.total_cost = result.cost
+        self.steps = iter(result.steps)
+        self.current_step = 0
+        if result.cached:
+            self.parent.steps_text.append("Wynik z pamięci podręcznej.")
+        else:
+            self.parent.steps_text.append(
+                f"Liczba ustalonych węzłów: {result.settled}, poprawionych odległości: {result.relaxed}, "
+                f"czas: {result.wall_time * 1000:.1f} ms"
+            )
+
+    def is_busy(self):
+        """Czy trwa zadanie w tle."""
+        return self.worker is not None
+
+    def cancel(self):
+        """Przerywa trwające zadanie w tle (jego wynik zostanie pominięty)."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.parent.statusBar().showMessage("Anulowanie...")
+
+    def _start_task(self, function, on_finished, error_prefix, message, background):
+        """
+        Wykonuje ``function(progress)`` i przekazuje wynik do ``on_finished``.
+
+        Przy ``background=True`` funkcja działa w osobnym wątku, a ``on_finished``
+        jest wywoływana w wątku interfejsu po jej zakończeniu; postęp trafia
+        na pasek stanu okna.
+        """
+        if not background:
+            try:
+                result = function(None)
+            except Exception as e:
+                self.parent.steps_text.append(f"{error_prefix}: {e}")
+                return
+            on_finished(result)
+            return
+
+        if self.is_busy():
+            self.parent.steps_text.append("Poczekaj na zakończenie bieżącego zadania lub je anuluj.")
+            return
+
+        worker = Worker(function)
+        worker.signals.progress.connect(
+            lambda settled: self.parent.statusBar().showMessage(f"{message} Ustalono węzłów: {settled}")
+        )
+        worker.signals.finished.connect(lambda result: self._task_done(worker) and on_finished(result))
+        worker.signals.failed.connect(
+            lambda error: self._task_done(worker) and self.parent.steps_text.append(f"{error_prefix}: {error}")
+        )
+        worker.signals.cancelled.connect(
+            lambda: self._task_done(worker) and self.parent.steps_text.append("Anulowano zadanie.")
+        )
+        self.worker = worker
+        self.parent.statusBar().showMessage(message)
+        worker.start()
+
+    def _task_done(self, worker):
+        """Kończy zadanie w tle; zwraca False dla zadań porzuconych (np. po resecie)."""
+        if worker is not self.worker:
+            return False
+        self.worker = None
+        self.parent.statusBar().clearMessage()
+        return True
 
     def next_step(self):
         """Przejście do następnego kroku algorytmu."""
+        if not self._can_step():
+            return
+
+        # Przejście przez kroki algorytmu
+        if not self._advance(1):
+            self._finish()
+
+    def _can_step(self):
+        """Sprawdza, czy można przechodzić przez kroki algorytmu (i informuje, jeśli nie)."""
         # Sprawdzenie, czy mapa została załadowana
         if not self.city_points:
             self._show_error("Błąd", "Najpierw załaduj mapę.")
-            return
+            return False
 
         # Sprawdzenie, czy wybrano miasta początkowe i końcowe
         if not self.start_city or not self.end_city:
             self._show_error("Błąd", "Wybierz miasto początkowe i końcowe przed rozpoczęciem algorytmu.")
-            return
+            return False
 
         # Sprawdzenie, czy wybrano algorytm
         if not hasattr(self, "algorithm") or self.algorithm is None:
             self._show_error("Błąd", "Wybierz algorytm przed rozpoczęciem kroków.")
+            return False
+        return True
+
+    def _advance(self, count):
+        """
+        Wykonuje do ``count`` kolejnych kroków algorytmu jednym odświeżeniem mapy.
+
+        :return: Liczba wykonanych kroków (0, gdy kroki się skończyły)
+        """
+        lines = []
+        edges = []
+        for step in itertools.islice(self.steps, count):
+            current, neighbor, weight = step
+            self.current_step += 1
+            lines.append(f"Krok {self.current_step}: Relaksacja krawędzi {current} -> {neighbor} (waga: {weight})")
+            edges.append((current, neighbor))
+        if lines:
+            self.parent.steps_text.append("\n".join(lines))
+            self._highlight_edges(edges, color='red', linewidth=2)
+        return len(lines)
+
+    def _finish(self):
+        """Pokazuje najkrótszą ścieżkę po wykonaniu wszystkich kroków."""
+        if not self.shortest_path:
+            self._show_info("Najkrótsza ścieżka", "Brak ścieżki między wybranymi miastami.")
+            return
+        self._highlight_shortest_path()
+        self._show_info(
+            "Najkrótsza ścieżka", 
+            f"Najkrótsza ścieżka: {' -> '.join([a for a, b in self.shortest_path]) + ' -> ' + self.shortest_path[-1][1]}\n"
+            f"Koszt: {self.total_cost:.2f}"
+        )
+
+    def start_autoplay(self, interval_ms=None, steps_per_frame=None):
+        """
+        Uruchamia automatyczne odtwarzanie kroków.
+
+        :param interval_ms: Odstęp między klatkami w milisekundach
+        :param steps_per_frame: Liczba kroków wykonywanych w jednej klatce
+        """
+        if not self._can_step():
             return
+        if steps_per_frame is not None:
+            self.autoplay_steps_per_frame = max(1, steps_per_frame)
+        self.autoplay_timer.start(interval_ms if interval_ms is not None else AUTOPLAY_INTERVAL_MS)
 
-        # Przejście przez kroki algorytmu
-        if self.current_step < len(self.steps):
-            current, neighbor, weight = self.steps[self.current_step]
-            self.parent.steps_text.append(f"Krok {self.current_step + 1}: Relaksacja krawędzi {current} -> {neighbor} (waga: {weight})")
-            self._highlight_edge(current, neighbor, color='red', linewidth=2)
-            self.current_step += 1
-        else:
-            self._highlight_shortest_path()
-            self._show_info(
-                "Najkrótsza ścieżka", 
-                f"Najkrótsza ścieżka: {' -> '.join([a for a, b in self.shortest_path]) + ' -> ' + self.shortest_path[-1][1]}\n"
-                f"Koszt: {sum(self.graph[a][b]['weight'] for a, b in self.shortest_path):.2f}"
-            )
+    def stop_autoplay(self):
+        """Zatrzymuje automatyczne odtwarzanie kroków."""
+        self.autoplay_timer.stop()
 
+    def is_autoplaying(self):
+        return self.autoplay_timer.isActive()
 
+    def _autoplay_tick(self):
+        if not self._advance(self.autoplay_steps_per_frame):
+            self.stop_autoplay()
+            self._finish()
 
     def _highlight_shortest_path(self):
         """Podświetla najkrótszą ścieżkę na mapie."""
-        for city_a, city_b in self.shortest_path:
-            self._highlight_edge(city_a, city_b, color='blue', linewidth=2)
+        self._highlight_edges(self.shortest_path, color='blue', linewidth=2)
         self.parent.steps_text.append(f"Najkrótsza ścieżka: {' -> '.join([a for a, b in self.shortest_path]) + ' -> ' + self.shortest_path[-1][1]}")
 
+    def _highlight_routes(self, routes):
+        """
+        Podświetla trasy w kolorach z ALTERNATIVE_COLORS (wcześniejsze podświetlenia są usuwane).
+
+        Pierwsza (najkrótsza) trasa jest najgrubsza, a kolejne są rysowane na niej
+        coraz cieńszymi liniami, więc wspólne odcinki pozostają widoczne.
+        """
+        self._remove_highlights()
+        shortest_cost = routes[0][1]
+        lines = []
+        for index, (path, cost) in enumerate(routes):
+            color = ALTERNATIVE_COLORS[index % len(ALTERNATIVE_COLORS)]
+            linewidth = 2 + 1.5 * (len(routes) - 1 - index)
+            self._highlight_edges(list(zip(path, path[1:])), color=color, linewidth=linewidth)
+            extra = (cost / shortest_cost - 1) * 100 if shortest_cost else 0.0
+            lines.append(f"Trasa {index + 1} ({color}, koszt: {cost:.2f}, +{extra:.1f}%): {' -> '.join(path)}")
+        self.parent.steps_text.append("\n".join(lines))
+
     def _highlight_edge(self, city_a, city_b, color='red', linewidth=2):
         """Podświetla krawędź na mapie."""
-        if city_a in self.city_points and city_b in self.city_points:
-            x1, y1 = self.city_points[city_a][1:]
-            x2, y2 = self.city_points[city_b][1:]
-            self.ax.plot([x1, x2], [y1, y2], color=color, linewidth=linewidth)
+        self._highlight_edges([(city_a, city_b)], color=color, linewidth=linewidth)
+
+    def _highlight_edges(self, edges, color='red', linewidth=2):
+        """
+        Podświetla krawędzie na mapie bez pełnego przerysowania.
+
+        Nowe odcinki są dorysowywane na zapamiętanym tle (blitting), a potem
+        dopisywane do trwałej kolekcji danego koloru, która jest rysowana przy
+        kolejnych pełnych przerysowaniach (np. po zmianie rozmiaru okna).
+        """
+        segments = [
+            (self.city_points[city_a][1:], self.city_points[city_b][1:])
+            for city_a, city_b in edges
+            if city_a in self.city_points and city_b in self.city_points
+        ]
+        if not segments:
+            return
+        profiling.count("highlighted_edges", len(segments))
+
+        key = (color, linewidth)
+        if key not in self.highlight_layers:
+            collection = LineCollection([], colors=color, linewidths=linewidth, zorder=4)
+            self.ax.add_collection(collection, autolim=False)
+            self.highlight_layers[key] = (collection, [])
+        self.highlight_layers[key][1].extend(segments)
+
+        if self.background is None:
             self.draw()
+            return
+
+        self.restore_region(self.background)
+        new_segments = LineCollection(segments, colors=color, linewidths=linewidth, zorder=4)
+        self.ax.add_collection(new_segments, autolim=False)
+        self.ax.draw_artist(new_segments)
+        new_segments.remove()
+        self.blit(self.ax.bbox)
+        self.background = self.copy_from_bbox(self.figure.bbox)
+
+    def _remove_highlights(self):
+        """Usuwa podświetlenia z mapy i przerysowuje ją."""
+        for collection, _ in self.highlight_layers.values():
+            collection.remove()
+        self._clear_highlights()
+        self.draw()
+
+    def _clear_highlights(self):
+        """Usuwa podświetlenia (kolekcje znikają z osi razem z ``ax.clear``)."""
+        self.highlight_layers = {}
+        self.background = None
+
+    def draw(self):
+        """Pełne przerysowanie płótna; zapamiętuje tło do szybkiego podświetlania."""
+        for collection, segments in self.highlight_layers.values():
+            collection.set_segments(segments)
+        with profiling.span("odświeżenie płótna"):
+            super().draw()
+        self.background = self.copy_from_bbox(self.figure.bbox)
 
     def _draw_cities_and_connections(self):
         """Rysuje miasta i połączenia na mapie."""
@@ -206,20 +554,95 @@ class MapVisualizer(FigureCanvas):
             self.parent.steps_text.append("Brak danych o miastach. Upewnij się, że dane są załadowane.")
             return
 
-        # Rysowanie miast
-        for city_name, (_, x, y) in self.city_points.items():
-            self.ax.plot(x, y, 'bo', markersize=5)  # Kropki reprezentujące miasta
-            self.ax.text(x, y, city_name, fontsize=8, ha='right')  # Nazwa miasta
-
-        # Rysowanie połączeń
-        for connection in self.connections:
-            _, city_a_id, city_b_id, distance = connection
-            city_a = next((name for name, (id, _, _) in self.city_points.items() if id == city_a_id), None)
-            city_b = next((name for name, (id, _, _) in self.city_points.items() if id == city_b_id), None)
-            if city_a and city_b:
-                x1, y1 = self.city_points[city_a][1:]
-                x2, y2 = self.city_points[city_b][1:]
-                self.ax.plot([x1, x2], [y1, y2], 'g-', alpha=0.5)  # Linie reprezentujące połączenia
+        # Połączenia i miasta podzielone na kafle i poziomy szczegółowości (budowane raz na zbiór danych)
+        self.network = self.dataset.tiled_network(f"EPSG:{self.map_crs.to_epsg()}")
+        self.network_view = None
+
+        # Jedna kolekcja linii dla połączeń i jeden wykres punktowy dla miast;
+        # ich zawartość zależy od widoku (_update_network_detail)
+        self.connection_collection = LineCollection([], colors='g', alpha=0.5)
+        self.ax.add_collection(self.connection_collection, autolim=False)
+        self.city_collection = self.ax.scatter([], [], s=25, c='b', zorder=3)
+        profiling.count("artists", 2)
+        # Widok obejmuje mapę podkładową i wszystkie miasta
+        self.ax.update_datalim(self.city_xy)
+        self.ax.autoscale_view()
+
+        # Podpisy miast i poziomy szczegółowości są odświeżane przy każdej zmianie widoku
+        self.city_labels = []
+        self._on_view_changed()
+        self.ax.callbacks.connect("xlim_changed", lambda ax: self._on_view_changed())
+        self.ax.callbacks.connect("ylim_changed", lambda ax: self._on_view_changed())
+
+    def _on_view_changed(self):
+        self._update_basemap_detail()
+        self._update_network_detail()
+        self._update_city_labels()
+
+    def _update_network_detail(self):
+        """
+        Rysuje połączenia i miasta tylko z kafli widocznych w bieżącym widoku.
+
+        Gdy widocznych elementów jest więcej niż MAX_DRAWN_CONNECTIONS
+        (MAX_DRAWN_CITIES), rysowane są tylko ważniejsze z nich. Przesunięcie
+        widoku w obrębie tych samych kafli nie zmienia kolekcji.
+        """
+        if self.network is None or self.connection_collection is None:
+            return
+        view = self.network.view(self.ax.get_xlim(), self.ax.get_ylim())
+        if self.network_view is not None and view.key == self.network_view.key:
+            return
+        self.network_view = view
+        self.connection_collection.set_segments(self.network.connections.geometry[view.connections])
+        self.city_collection.set_offsets(self.network.cities.geometry[view.cities])
+        profiling.count("drawn_connections", len(view.connections))
+        profiling.count("drawn_cities", len(view.cities))
+
+    def _update_basemap_detail(self):
+        """Dobiera poziom uproszczenia mapy podkładowej do bieżącego powiększenia."""
+        if self.basemap is None or self.basemap_collection is None:
+            return
+        x_min, x_max = self.ax.get_xlim()
+        units_per_pixel = abs(x_max - x_min) / max(self.ax.get_window_extent().width, 1)
+        paths = self.basemap.paths_for_resolution(units_per_pixel)
+        if paths is not self.basemap_collection.get_paths():
+            self.basemap_collection.set_paths(paths)
+
+    def _update_city_labels(self):
+        """
+        Rysuje podpisy tylko dla miast widocznych w bieżącym widoku.
+
+        Gdy widocznych miast jest więcej niż MAX_CITY_LABELS, podpisywane są
+        miasta najważniejsze (jak przy wyborze poziomu szczegółowości). Podpisy
+        tych samych miast nie są tworzone ponownie.
+        """
+        if self.city_xy is None or self.ax is None:
+            for label in self.city_labels:
+                label.remove()
+            self.city_labels = []
+            return
+
+        (x_min, x_max), (y_min, y_max) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        x, y = self.city_xy[:, 0], self.city_xy[:, 1]
+        visible = np.nonzero((x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max))[0]
+        if len(visible) > MAX_CITY_LABELS:
+            if self.network is not None:
+                importance = self.network.importance[visible]
+            else:
+                importance = np.diff(self.dataset.graph.offsets)[visible]
+            visible = visible[np.argsort(-importance, kind="stable")[:MAX_CITY_LABELS]]
+        if self.city_labels and visible.tolist() == self.city_label_nodes:
+            return
+
+        for label in self.city_labels:
+            label.remove()
+        self.city_labels = []
+        self.city_label_nodes = visible.tolist()
+        for node in self.city_label_nodes:
+            self.city_labels.append(
+                self.ax.text(x[node], y[node], self.city_names[node], fontsize=8, ha='right')  # Nazwa miasta
+            )
+        profiling.count("artists", len(self.city_labels))
 
     def on_click(self, event):
         if not self.city_points:  # Sprawdzenie, czy mapa została załadowana
@@ -229,12 +652,7 @@ class MapVisualizer(FigureCanvas):
             )
             return
         if event.inaxes == self.ax:
-            clicked_city = None
-            for city, (id, x, y) in self.city_points.items():
-                distance = math.sqrt((x - event.xdata) ** 2 + (y - event.ydata) ** 2)
-                if distance <= 20000:  # Tolerancja kliknięcia
-                    clicked_city = city
-                    break
+            clicked_city = self.nearest_city(event.xdata, event.ydata, self._click_tolerance())
 
             if clicked_city:
                 if not self.start_city:
@@ -260,18 +678,35 @@ class MapVisualizer(FigureCanvas):
         self.draw()
 
     def reset(self):
+        self.stop_autoplay()
+        self.query_cache.invalidate()
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
         if self.ax:
             self.figure.delaxes(self.ax)
             self.ax = None
-        self.graph.clear()
+        self._clear_highlights()
+        self.dataset = None
         self.city_points = {}
-        self.connections = []
-        self.steps = []
+        self.city_index = None
+        self.city_names = []
+        self.city_xy = None
+        self.city_labels = []
+        self.city_label_nodes = []
+        self.network = None
+        self.network_view = None
+        self.connection_collection = None
+        self.city_collection = None
+        self.steps = iter(())
         self.current_step = 0
         self.shortest_path = []
+        self.total_cost = float('inf')
         self.start_city = None
         self.end_city = None
         self.map_crs = None
+        self.basemap = None
+        self.basemap_collection = None
         self.country_settings = None
         self.database_path = None
         self.algorithm = None
@@ -0,0 +1,67 @@
+import threading
+import traceback
+from PyQt5.QtCore import QObject, pyqtSignal
+from app.algorithms.progress import SearchCancelled
+
+
+class WorkerSignals(QObject):
+    """Sygnały zadania w tle (dostarczane do wątku interfejsu przez pętlę zdarzeń Qt)."""
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Worker:
+    """
+    Zadanie wykonywane w osobnym wątku.
+
+    Używane są wątki modułu ``threading``, a nie pula wątków Qt: pyproj
+    trzyma kontekst w pamięci wątku, który w wątkach puli Qt jest zwalniany
+    po każdym zadaniu (kolejne użycie pyproj kończyło się błędem ochrony pamięci).
+
+    Funkcja ``function`` otrzymuje jako ostatni argument funkcję ``progress``,
+    którą może przekazać algorytmowi; po wywołaniu ``cancel`` kolejne
+    wywołanie ``progress`` zgłasza SearchCancelled i przerywa zadanie.
+    Wynik, błąd lub anulowanie są zgłaszane sygnałami z ``signals``.
+    """
+
+    def __init__(self, function, *args):
+        self.function = function
+        self.args = args
+        self.signals = WorkerSignals()
+        self.cancel_event = threading.Event()
+        self.done = False
+
+    def start(self):
+        """Uruchamia zadanie w nowym wątku."""
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def cancel(self):
+        """Zgłasza prośbę o przerwanie zadania."""
+        self.cancel_event.set()
+
+    def report_progress(self, value):
+        """Przekazuje postęp do interfejsu albo przerywa zadanie, jeśli je anulowano."""
+        if self.done:
+            return
+        if self.cancel_event.is_set():
+            raise SearchCancelled()
+        self.signals.progress.emit(value)
+
+    def run(self):
+        try:
+            result = self.function(*self.args, self.report_progress)
+        except SearchCancelled:
+            self.done = True
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.done = True
+            traceback.print_exc()
+            self.signals.failed.emit(str(e))
+        else:
+            self.done = True
+            if self.cancel_event.is_set():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.finished.emit(result)
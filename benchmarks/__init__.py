@@ -0,0 +1 @@
+"""Pomiary wydajności na syntetycznych sieciach drogowych (patrz ``benchmarks.run``)."""
@@ -0,0 +1,80 @@
+"""
+Porównanie dwóch wyników ``benchmarks.run``.
+
+Dla każdego rozmiaru sieci obecnego w obu plikach wypisywane są czasy
+etapów, mediany i 99. percentyle zapytań oraz pamięć - stara i nowa
+wartość i zmiana procentowa. Wzrost większy niż ``--threshold`` jest
+oznaczany jako regresja, a skrypt kończy się wtedy kodem 1.
+
+Przykład:
+    python -m benchmarks.compare benchmarks/results/stary.json benchmarks/results/nowy.json
+"""
+import argparse
+import json
+import sys
+
+DEFAULT_THRESHOLD = 0.10
+
+
+def metrics(size_result):
+    """Spłaszcza wynik jednego rozmiaru do słownika nazwa miary -> wartość (im mniej, tym lepiej)."""
+    values = {f"etap {stage} [s]": seconds for stage, seconds in size_result["stages_s"].items()}
+    for name, summary in size_result["queries"].items():
+        values[f"{name} p50 [ms]"] = summary["p50_ms"]
+        values[f"{name} p99 [ms]"] = summary["p99_ms"]
+    for name, megabytes in size_result["memory_mb"].items():
+        if megabytes is not None:
+            values[f"pamięć {name} [MB]"] = megabytes
+    return values
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD, output=sys.stdout):
+    """
+    Wypisuje porównanie wyników.
+
+    :param old: Wynik bazowy (słownik wczytany z pliku JSON)
+    :param new: Wynik porównywany
+    :param threshold: Względny wzrost uznawany za regresję
+    :return: Lista regresji (rozmiar, miara, zmiana względna)
+    """
+    old_sizes = {result["nodes"]: result for result in old["sizes"]}
+    regressions = []
+    print(f"Bazowy: {old.get('commit')}  porównywany: {new.get('commit')}", file=output)
+    for new_result in new["sizes"]:
+        nodes = new_result["nodes"]
+        if nodes not in old_sizes:
+            continue
+        print(f"\nSieć {nodes} miast", file=output)
+        old_values = metrics(old_sizes[nodes])
+        for name, value in metrics(new_result).items():
+            if name not in old_values:
+                continue
+            base = old_values[name]
+            change = (value - base) / base if base else 0.0
+            mark = ""
+            if change > threshold:
+                mark = "  REGRESJA"
+                regressions.append((nodes, name, change))
+            print(f"  {name:<45} {base:>12.4f} {value:>12.4f} {change:>+8.1%}{mark}", file=output)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Porównanie dwóch wyników pomiarów wydajności.")
+    parser.add_argument("old", help="Plik JSON z wynikiem bazowym")
+    parser.add_argument("new", help="Plik JSON z wynikiem porównywanym")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Względny wzrost uznawany za regresję (domyślnie 0.10)")
+    args = parser.parse_args(argv)
+
+    with open(args.old, encoding="utf-8") as file:
+        old = json.load(file)
+    with open(args.new, encoding="utf-8") as file:
+        new = json.load(file)
+    regressions = compare(old, new, args.threshold)
+    print(f"\nRegresje: {len(regressions)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Mikrobenchmark kolejek priorytetowych przeszukiwania: ``heapq`` z leniwym
+pomijaniem nieaktualnych wpisów i ``IndexedHeap`` ze zmniejszaniem klucza.
+
+Dla każdej kolejki wykonywany jest pełny algorytm Dijkstry od kilku źródeł
+na syntetycznej sieci drogowej (patrz ``benchmarks.synthetic``) oraz na gęstym
+grafie losowym, w którym poprawy odległości są częste. Mierzone są: czas,
+największy rozmiar kolejki i liczba wpisów dodanych do kolejki (każdy wpis
+``heapq`` to nowa krotka), a także czas zapytań ``dijkstra``
+i ``dijkstra_indexed`` między losowymi parami miast.
+
+Przykład:
+    python -m benchmarks.heap --nodes 100000 --output heap.json
+"""
+import argparse
+import heapq
+import json
+import random
+import sys
+import time
+import numpy as np
+from app.algorithms.csr_graph import CSRGraph
+from app.algorithms.dijkstra import dijkstra, dijkstra_indexed
+from app.algorithms.heap import IndexedHeap
+from benchmarks.synthetic import generate_network
+
+ARITIES = (2, 4, 8)
+
+
+def heapq_sssp(adjacency, source):
+    """
+    Dijkstra od ``source`` do wszystkich węzłów z kolejką ``heapq``.
+
+    :return: Odległości, największy rozmiar kolejki, liczba dodanych wpisów
+    """
+    distances = {source: 0}
+    queue = [(0, source)]
+    largest = 1
+    entries = 1
+    while queue:
+        largest = max(largest, len(queue))
+        current_distance, current_node = heapq.heappop(queue)
+        if current_distance > distances[current_node]:
+            continue
+        neighbors, weights = adjacency[current_node]
+        for neighbor, weight in zip(neighbors, weights):
+            distance = current_distance + weight
+            if distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance
+                heapq.heappush(queue, (distance, neighbor))
+                entries += 1
+    return distances, largest, entries
+
+
+def indexed_sssp(adjacency, source, arity):
+    """Dijkstra od ``source`` z kolejką ``IndexedHeap`` (wynik jak w ``heapq_sssp``)."""
+    distances = {source: 0}
+    queue = IndexedHeap(len(adjacency), arity)
+    queue.push(source, 0)
+    largest = 1
+    while queue:
+        largest = max(largest, len(queue))
+        current_distance, current_node = queue.pop()
+        neighbors, weights = adjacency[current_node]
+        for neighbor, weight in zip(neighbors, weights):
+            distance = current_distance + weight
+            if distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance
+                queue.push(neighbor, distance)
+    # Każdy osiągnięty węzeł trafia do kolejki dokładnie raz
+    return distances, largest, len(distances)
+
+
+def dense_graph(node_count, degree, seed=0):
+    """Losowy graf o średnim stopniu ``degree`` z wagami niezależnymi od położenia węzłów."""
+    rng = np.random.default_rng(seed)
+    edge_count = node_count * degree // 2
+    edges = np.column_stack([
+        rng.integers(0, node_count, edge_count),
+        rng.integers(0, node_count, edge_count),
+        rng.uniform(1.0, 100.0, edge_count),
+    ])
+    return CSRGraph.from_edges([f"W{node}" for node in range(node_count)], edges)
+
+
+def road_graph(node_count, seed=0):
+    """Syntetyczna sieć drogowa jako CSRGraph (bez zapisu do bazy)."""
+    lon, lat, sources, targets, distances = generate_network(node_count, seed)
+    edges = np.column_stack([sources, targets, distances])
+    return CSRGraph.from_edges([f"Miasto {node + 1}" for node in range(node_count)], edges,
+                               coordinates=np.column_stack([lon, lat]))
+
+
+def compare_queues(graph, sources):
+    """Porównuje kolejki na pełnych przeszukiwaniach od podanych węzłów."""
+    adjacency = graph.adjacency()
+    variants = {"heapq": lambda source: heapq_sssp(adjacency, source)}
+    for arity in ARITIES:
+        variants[f"IndexedHeap(d={arity})"] = lambda source, arity=arity: indexed_sssp(adjacency, source, arity)
+
+    results = {}
+    expected = None
+    for name, function in variants.items():
+        elapsed = 0.0
+        largest = entries = 0
+        for source in sources:
+            started = time.perf_counter()
+            distances, queue_size, queue_entries = function(source)
+            elapsed += time.perf_counter() - started
+            largest = max(largest, queue_size)
+            entries += queue_entries
+        if expected is None:
+            expected = distances
+        elif distances != expected:
+            raise AssertionError(f"{name}: odległości różnią się od heapq")
+        results[name] = {
+            "time_ms": round(elapsed * 1000 / len(sources), 3),
+            "max_queue": largest,
+            "entries": entries // len(sources),
+        }
+    return results
+
+
+def compare_queries(graph, queries, seed=0):
+    """Porównuje czasy zapytań ``dijkstra`` i ``dijkstra_indexed`` dla losowych par węzłów."""
+    rng = random.Random(seed)
+    pairs = [(rng.choice(graph.names), rng.choice(graph.names)) for _ in range(queries)]
+    results = {}
+    for algorithm in (dijkstra, dijkstra_indexed):
+        algorithm(graph, *pairs[0])
+        latencies = []
+        for start, end in pairs:
+            started = time.perf_counter()
+            algorithm(graph, start, end)
+            latencies.append(time.perf_counter() - started)
+        milliseconds = np.asarray(latencies) * 1000
+        results[algorithm.__name__] = {
+            "p50_ms": round(float(np.percentile(milliseconds, 50)), 3),
+            "mean_ms": round(float(milliseconds.mean()), 3),
+        }
+    return results
+
+
+def print_table(title, results):
+    print(title)
+    for name, values in results.items():
+        print(f"  {name:<20} " + "  ".join(f"{key}={value}" for key, value in values.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Porównanie kolejek priorytetowych algorytmu Dijkstry.")
+    parser.add_argument("--nodes", type=int, default=100000, help="Liczba miast sieci drogowej")
+    parser.add_argument("--dense-nodes", type=int, default=5000, help="Liczba węzłów grafu gęstego")
+    parser.add_argument("--dense-degree", type=int, default=60, help="Średni stopień grafu gęstego")
+    parser.add_argument("--sources", type=int, default=3, help="Liczba pełnych przeszukiwań na kolejkę")
+    parser.add_argument("--queries", type=int, default=50, help="Liczba zapytań między parami miast")
+    parser.add_argument("--seed", type=int, default=0, help="Ziarno generatora")
+    parser.add_argument("--output", help="Opcjonalny plik wyniku JSON")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    road = road_graph(args.nodes, args.seed)
+    dense = dense_graph(args.dense_nodes, args.dense_degree, args.seed)
+    results = {
+        "road": compare_queues(road, rng.sample(range(road.node_count), args.sources)),
+        "dense": compare_queues(dense, rng.sample(range(dense.node_count), args.sources)),
+        "queries": compare_queries(road, args.queries, args.seed),
+    }
+    print_table(f"Sieć drogowa ({road.node_count} węzłów, {road.edge_count // 2} krawędzi), pełne przeszukiwanie:",
+                results["road"])
+    print_table(f"Graf gęsty ({dense.node_count} węzłów, {dense.edge_count // 2} krawędzi), pełne przeszukiwanie:",
+                results["dense"])
+    print_table("Zapytania między losowymi parami miast sieci drogowej:", results["queries"])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Pomiar wydajności etapów ładowania danych i zapytań na syntetycznych sieciach drogowych.
+
+Dla każdego rozmiaru sieci (bazy są generowane raz do katalogu danych,
+patrz ``benchmarks.synthetic``) mierzone są:
+
+* ``db_load`` - otwarcie bazy i odczyt wierszy ``cities`` i ``connections``,
+* ``graph_build`` - budowa CSRGraph z wierszy (jak w ``Dataset``),
+* ``adjacency`` - budowa list sąsiedztwa używanych przez pętle przeszukiwania,
+* ``snapshot_save`` i ``snapshot_load`` - zapis i odczyt zrzutu binarnego,
+* ``projection`` - przeliczenie współrzędnych miast do układu mapy,
+* ``ch_preprocessing`` - budowa hierarchii kontrakcji (tylko gdy ten algorytm jest mierzony;
+  dla sieci większych niż ``--ch-max-nodes`` jest pomijany),
+* opóźnienia zapytań (percentyle) każdego algorytmu dla losowych par miast,
+* szczytowa pamięć ładowania grafu (tracemalloc, w osobnym przebiegu) i procesu.
+
+Czasy etapów to minimum z ``--repeat`` powtórzeń. Wynik trafia do pliku JSON
+z identyfikatorem commita i opisem platformy, więc wyniki różnych commitów
+można porównać skryptem ``benchmarks.compare``.
+
+Przykłady:
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 1000 10000 100000 1000000 --algorithms Dijkstra A*
+    python -m benchmarks.compare benchmarks/results/stary.json benchmarks/results/nowy.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from app import profiling
+from app.config import ALGORITHMS
+from app.db_handler import close_connections, get_cities, get_connection, get_connections
+from app.projection import project
+from app.snapshot import read_snapshot, save_snapshot
+from app.algorithms import registry
+from app.algorithms.csr_graph import CSRGraph
+from app.algorithms.contraction import HIERARCHY_KEY, build_hierarchy
+from benchmarks.synthetic import ensure_database
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+RESULTS_DIRECTORY = os.path.join(os.path.dirname(__file__), "results")
+
+# Układ współrzędnych mapy używany w etapie projekcji (układ mapy Polski)
+TARGET_CRS = "EPSG:2180"
+
+PERCENTILES = (50, 90, 99)
+
+# Budowa hierarchii kontrakcji rośnie szybciej niż liniowo (ok. minuty dla 10 000
+# miast), więc dla większych sieci ten algorytm jest domyślnie pomijany
+CH_ALGORITHM = "Hierarchie kontrakcji"
+CH_MAX_NODES = 20000
+
+
+def measure(function, repeat=1):
+    """
+    Mierzy czas wywołania ``function()``.
+
+    :return: Najkrótszy czas z ``repeat`` wywołań (w sekundach), wynik ostatniego wywołania
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def load_rows(database_path):
+    """Otwiera bazę (bez puli połączeń z poprzednich pomiarów) i odczytuje wiersze obu tabel."""
+    close_connections()
+    conn = get_connection(database_path)
+    return get_cities(conn), get_connections(conn)
+
+
+def rebuild_adjacency(graph):
+    """Buduje od nowa listy sąsiedztwa grafu (pomijając zapamiętany widok)."""
+    graph._adjacency = None
+    return graph.adjacency()
+
+
+def latency_summary(latencies, results):
+    """Percentyle czasów zapytań (w milisekundach) i średnie liczniki przeszukiwania."""
+    milliseconds = np.asarray(latencies) * 1000
+    summary = {f"p{percentile}_ms": round(float(np.percentile(milliseconds, percentile)), 3)
+               for percentile in PERCENTILES}
+    summary["max_ms"] = round(float(milliseconds.max()), 3)
+    summary["mean_ms"] = round(float(milliseconds.mean()), 3)
+    summary["mean_settled"] = round(sum(result.settled for result in results) / len(results), 1)
+    summary["mean_relaxed"] = round(sum(result.relaxed for result in results) / len(results), 1)
+    summary["unreachable"] = sum(1 for result in results if not result.path)
+    return summary
+
+
+def peak_memory(database_path):
+    """Szczytowa pamięć (w MB) zaalokowana przy odczycie wierszy i budowie grafu."""
+    close_connections()
+    tracemalloc.start()
+    try:
+        cities, connections = load_rows(database_path)
+        graph = CSRGraph.from_rows(cities, connections)
+        graph.adjacency()
+        return round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def max_rss():
+    """Szczytowy rozmiar pamięci procesu (w MB) lub None, jeśli system go nie udostępnia."""
+    rss = profiling.max_rss()
+    return None if rss is None else round(rss / 2 ** 20, 1)
+
+
+def benchmark_size(node_count, algorithms, queries=100, repeat=3, seed=0, data_directory=DATA_DIRECTORY,
+                   ch_max_nodes=CH_MAX_NODES):
+    """
+    Wykonuje wszystkie pomiary dla sieci o ``node_count`` miastach.
+
+    :return: Słownik z rozmiarem grafu, czasami etapów, opóźnieniami zapytań i pamięcią
+    """
+    database_path = ensure_database(data_directory, node_count, seed)
+    print(f"Sieć {node_count} miast: pomiary etapów")
+
+    stages = {}
+    stages["db_load"], (cities, connections) = measure(lambda: load_rows(database_path), repeat)
+    stages["graph_build"], graph = measure(lambda: CSRGraph.from_rows(cities, connections), repeat)
+    stages["adjacency"], _ = measure(lambda: rebuild_adjacency(graph), repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "graph.bin")
+        stages["snapshot_save"], _ = measure(lambda: save_snapshot(graph, path, ""), repeat)
+        stages["snapshot_load"], _ = measure(lambda: read_snapshot(path), repeat)
+
+    lon, lat = graph.coordinates[:, 0], graph.coordinates[:, 1]
+    project(lon[:1], lat[:1], TARGET_CRS)  # utworzenie transformatora nie wlicza się do pomiaru
+    stages["projection"], _ = measure(lambda: project(lon, lat, TARGET_CRS), repeat)
+
+    if node_count > ch_max_nodes:
+        algorithms = [name for name in algorithms if name != CH_ALGORITHM]
+    if CH_ALGORITHM in algorithms:
+        print(f"Sieć {node_count} miast: budowa hierarchii kontrakcji")
+        stages["ch_preprocessing"], graph.derived[HIERARCHY_KEY] = measure(lambda: build_hierarchy(graph))
+
+    # Te same losowe pary miast dla każdego algorytmu
+    rng = random.Random(seed)
+    pairs = [(rng.choice(graph.names), rng.choice(graph.names)) for _ in range(queries)]
+    latencies = {}
+    for name in algorithms:
+        print(f"Sieć {node_count} miast: {queries} zapytań, {name}")
+        registry.run(name, graph, *pairs[0])  # rozgrzewka (import modułu, dane pochodne)
+        results = [registry.run(name, graph, start, end) for start, end in pairs]
+        latencies[name] = latency_summary([result.wall_time for result in results], results)
+
+    close_connections()
+    return {
+        "nodes": graph.node_count,
+        "edges": graph.edge_count // 2,
+        "stages_s": {stage: round(seconds, 6) for stage, seconds in stages.items()},
+        "queries": latencies,
+        "memory_mb": {"graph_load_peak": peak_memory(database_path), "process_max_rss": max_rss()},
+    }
+
+
+def commit_info():
+    """Identyfikator commita i informacja o niezatwierdzonych zmianach (None poza repozytorium git)."""
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+
+    try:
+        return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def platform_info():
+    """Opis platformy, na której wykonano pomiary."""
+    return {
+        "system": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pomiary wydajności na syntetycznych sieciach drogowych.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Liczby miast")
+    parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=list(ALGORITHMS),
+                        help="Mierzone algorytmy")
+    parser.add_argument("--queries", type=int, default=100, help="Liczba zapytań na algorytm")
+    parser.add_argument("--repeat", type=int, default=3, help="Liczba powtórzeń pomiaru etapu")
+    parser.add_argument("--seed", type=int, default=0, help="Ziarno generatora sieci i zapytań")
+    parser.add_argument("--ch-max-nodes", type=int, default=CH_MAX_NODES,
+                        help="Największa sieć, dla której mierzone są hierarchie kontrakcji")
+    parser.add_argument("--data-dir", default=DATA_DIRECTORY, help="Katalog generowanych baz")
+    parser.add_argument("--output", help="Plik wyniku JSON (domyślnie benchmarks/results/<commit>.json)")
+    args = parser.parse_args(argv)
+
+    commit = commit_info()
+    results = {
+        **commit,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "platform": platform_info(),
+        "settings": {"queries": args.queries, "repeat": args.repeat, "seed": args.seed,
+                     "ch_max_nodes": args.ch_max_nodes},
+        "sizes": [
+            benchmark_size(size, args.algorithms, args.queries, args.repeat, args.seed, args.data_dir,
+                           args.ch_max_nodes)
+            for size in args.sizes
+        ],
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+        output = os.path.join(RESULTS_DIRECTORY, f"{(commit['commit'] or 'wynik')[:10]}.json")
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+    print(f"Zapisano wyniki: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Syntetyczne sieci drogowe zapisywane w schemacie bazy aplikacji.
+
+Miasta leżą na losowo przesuniętej siatce w prostokącie obejmującym Polskę.
+Sąsiednie węzły siatki są połączone drogami (niewielka część dróg jest
+pomijana), a co pewien czas dochodzi droga po przekątnej - graf jest
+planarny lub prawie planarny i ma średni stopień zbliżony do sieci drogowych.
+Długość drogi to odległość po kole wielkim wydłużona o losowy współczynnik
+krętości.
+"""
+import math
+import os
+import sqlite3
+import numpy as np
+from app.db_handler import prepare_database
+
+# Schemat tabel skopiowany z app/data/polska.db
+SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS "connections" (
+	"id"	INTEGER,
+	"city_a"	INTEGER NOT NULL,
+	"city_b"	INTEGER NOT NULL,
+	"distance"	REAL NOT NULL,
+	PRIMARY KEY("id" AUTOINCREMENT),
+	FOREIGN KEY("city_a") REFERENCES "cities"("id"),
+	FOREIGN KEY("city_b") REFERENCES "cities"("id")
+)''',
+    '''CREATE TABLE IF NOT EXISTS "cities" (
+	"id"	INTEGER,
+	"city_name"	TEXT NOT NULL,
+	"longitude"	REAL NOT NULL,
+	"latitude"	REAL NOT NULL,
+	PRIMARY KEY("id" AUTOINCREMENT)
+)''',
+)
+
+# Prostokąt (min_lon, min_lat, max_lon, max_lat), w którym leżą miasta
+BOUNDS = (14.1, 49.0, 24.1, 54.8)
+
+DROP_PROBABILITY = 0.05      # część pominiętych dróg między sąsiadami na siatce
+DIAGONAL_PROBABILITY = 0.15  # szansa na drogę po przekątnej komórki siatki
+JITTER = 0.35                # przesunięcie miasta jako ułamek oczka siatki
+EARTH_RADIUS_KM = 6371.0
+
+
+def generate_network(node_count, seed=0):
+    """
+    Generuje syntetyczną sieć drogową.
+
+    :param node_count: Liczba miast
+    :param seed: Ziarno generatora liczb losowych
+    :return: Tablice długości i szerokości geograficznych miast oraz tablice
+        końców (indeksy miast) i długości dróg
+    """
+    rng = np.random.default_rng(seed)
+    columns = math.ceil(math.sqrt(node_count))
+    rows = math.ceil(node_count / columns)
+    min_lon, min_lat, max_lon, max_lat = BOUNDS
+
+    nodes = np.arange(node_count)
+    row, column = np.divmod(nodes, columns)
+    step_lon = (max_lon - min_lon) / columns
+    step_lat = (max_lat - min_lat) / rows
+    lon = min_lon + (column + 0.5 + rng.uniform(-JITTER, JITTER, node_count)) * step_lon
+    lat = min_lat + (row + 0.5 + rng.uniform(-JITTER, JITTER, node_count)) * step_lat
+
+    # Drogi do sąsiada z prawej, z dołu i (czasem) po jednej z przekątnych komórki
+    right = nodes[(column + 1 < columns) & (nodes + 1 < node_count)]
+    down = nodes[nodes + columns < node_count]
+    cells = nodes[(column + 1 < columns) & (nodes + columns + 1 < node_count)]
+    cells = cells[rng.random(len(cells)) < DIAGONAL_PROBABILITY]
+    falling = rng.random(len(cells)) < 0.5
+    sources = np.concatenate([right, down, cells[falling], cells[~falling] + 1])
+    targets = np.concatenate([right + 1, down + columns, cells[falling] + columns + 1, cells[~falling] + columns])
+
+    kept = rng.random(len(sources)) >= DROP_PROBABILITY
+    sources, targets = sources[kept], targets[kept]
+    distances = _great_circle(lon[sources], lat[sources], lon[targets], lat[targets])
+    distances *= rng.uniform(1.05, 1.4, len(distances))
+    return lon, lat, sources, targets, np.round(distances, 3)
+
+
+def _great_circle(lon_a, lat_a, lon_b, lat_b):
+    """Odległości po kole wielkim (w kilometrach) między parami punktów."""
+    lon_a, lat_a, lon_b, lat_b = map(np.radians, (lon_a, lat_a, lon_b, lat_b))
+    h = np.sin((lat_b - lat_a) / 2) ** 2 + np.cos(lat_a) * np.cos(lat_b) * np.sin((lon_b - lon_a) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(h))
+
+
+def write_database(path, node_count, seed=0):
+    """
+    Zapisuje syntetyczną sieć do nowej bazy SQLite (istniejący plik jest zastępowany).
+
+    Miasta mają identyfikatory 1..n i nazwy "Miasto 1".."Miasto n". Baza jest
+    od razu przygotowana przez ``prepare_database`` (WAL i indeksy), aby
+    pomiary nie obejmowały jednorazowego zakładania indeksów.
+
+    :return: Liczba zapisanych połączeń
+    """
+    lon, lat, sources, targets, distances = generate_network(node_count, seed)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    conn = sqlite3.connect(path)
+    try:
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.executemany(
+            "INSERT INTO cities (id, city_name, longitude, latitude) VALUES (?, ?, ?, ?)",
+            ((node + 1, f"Miasto {node + 1}", x, y) for node, (x, y) in enumerate(zip(lon.tolist(), lat.tolist()))),
+        )
+        conn.executemany(
+            "INSERT INTO connections (city_a, city_b, distance) VALUES (?, ?, ?)",
+            zip((sources + 1).tolist(), (targets + 1).tolist(), distances.tolist()),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    prepare_database(path)
+    return len(sources)
+
+
+def database_path(directory, node_count, seed=0):
+    """Ścieżka bazy o danym rozmiarze w katalogu danych benchmarku."""
+    return os.path.join(directory, f"synthetic_{node_count}_{seed}.db")
+
+
+def ensure_database(directory, node_count, seed=0):
+    """Zwraca ścieżkę bazy o danym rozmiarze, generując ją, jeśli jeszcze nie istnieje."""
+    path = database_path(directory, node_count, seed)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        print(f"Generowanie sieci {node_count} miast: {path}")
+        # Przerwane generowanie nie zostawia niepełnej bazy pod docelową nazwą
+        temporary = path + ".tmp"
+        write_database(temporary, node_count, seed)
+        os.replace(temporary, path)
+    return path
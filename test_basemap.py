@@ -0,0 +1,99 @@
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+from app.basemap import Basemap, _geometry_to_path, load_basemap, cache_path
+
+
+@unittest.skipUnless(importlib.util.find_spec("geopandas"), "wymaga geopandas")
+class TestBasemapCache(unittest.TestCase):
+    def setUp(self):
+        import geopandas as gpd
+        from shapely.geometry import Polygon
+
+        self.directory = tempfile.mkdtemp()
+        self.shp_path = os.path.join(self.directory, "mapa.shp")
+        square = Polygon([(14 + i * 0.01, 49) for i in range(500)] + [(19, 55), (14, 55)],
+                         holes=[[(15, 50), (16, 50), (16, 51)]])
+        gpd.GeoDataFrame({"nazwa": ["a"]}, geometry=[square], crs="EPSG:4326").to_file(self.shp_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_projected_levels_and_cache(self):
+        """Geometria jest rzutowana, upraszczana i zapisywana do pamięci podręcznej."""
+        basemap = load_basemap(self.shp_path, "EPSG:2180")
+        self.assertTrue(os.path.exists(cache_path(self.shp_path, "EPSG:2180")))
+        self.assertEqual(basemap.crs, "EPSG:2180")
+        full, simplified = basemap.levels[0][0], basemap.levels[-1][0]
+        self.assertGreater(full.vertices[:, 0].min(), 100000)  # Współrzędne metryczne
+        self.assertLess(len(simplified.vertices), len(full.vertices))
+        self.assertIs(basemap.paths_for_resolution(0.5), basemap.levels[0])
+        self.assertIs(basemap.paths_for_resolution(10000), basemap.levels[-1])
+
+        cached = load_basemap(self.shp_path, "EPSG:2180")
+        self.assertTrue((cached.levels[0][0].vertices == full.vertices).all())
+        self.assertTrue((cached.levels[0][0].codes == full.codes).all())
+
+    def test_cache_invalidated_by_crs(self):
+        """Inny docelowy CRS korzysta z osobnej pamięci podręcznej."""
+        metric = load_basemap(self.shp_path, "EPSG:2180")
+        geographic = load_basemap(self.shp_path, "EPSG:4326")
+        self.assertLess(geographic.levels[0][0].vertices[:, 0].max(), 20)
+        self.assertGreater(metric.levels[0][0].vertices[:, 0].max(), 20)
+
+    def test_save_and_load_empty_region(self):
+        """Region zredukowany przez uproszczenie do pustej geometrii nie psuje zapisu i odczytu."""
+        from shapely.geometry import LineString, Polygon
+
+        square = _geometry_to_path(Polygon([(0, 0), (1, 0), (1, 1), (0, 1)]))
+        empty = _geometry_to_path(Polygon())
+        collapsed = _geometry_to_path(LineString([(0, 0), (1, 1)]))
+        basemap = Basemap("EPSG:2180", (0, 4000), [[square, empty], [empty, collapsed]])
+        path = os.path.join(self.directory, "puste.npz")
+        basemap.save(path, "klucz")
+
+        loaded, key = Basemap.load(path)
+        self.assertEqual(key, "klucz")
+        self.assertEqual([len(p.vertices) for p in loaded.levels[0]], [len(square.vertices), 0])
+        self.assertEqual([len(p.vertices) for p in loaded.levels[1]], [0, 0])
+        self.assertTrue((loaded.levels[0][0].codes == square.codes).all())
+
+
+@unittest.skipUnless(importlib.util.find_spec("geopandas"), "wymaga geopandas")
+class TestBasemapSharedBorders(unittest.TestCase):
+    def setUp(self):
+        import geopandas as gpd
+        from shapely.geometry import Polygon
+
+        self.directory = tempfile.mkdtemp()
+        self.shp_path = os.path.join(self.directory, "regiony.shp")
+        # Dwa regiony ze wspólną, poszarpaną granicą biegnącą z północy na południe
+        border = [(500000 + (i % 2) * 3000, 300000 + i * 2000) for i in range(101)]
+        west = Polygon([(400000, 300000), *border, (400000, 500000)])
+        east = Polygon([(600000, 300000), (600000, 500000), *reversed(border)])
+        gpd.GeoDataFrame({"nazwa": ["z", "w"]}, geometry=[west, east], crs="EPSG:2180").to_file(self.shp_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_neighbours_stay_adjacent(self):
+        """Uproszczone sąsiednie regiony nie mają między sobą szczelin ani nakładek."""
+        from shapely.geometry import Polygon
+        from shapely.ops import unary_union
+
+        basemap = load_basemap(self.shp_path, "EPSG:2180", tolerances=(0, 4000))
+        full, simplified = basemap.levels
+        self.assertLess(len(simplified[0].vertices), len(full[0].vertices))
+
+        polygons = [Polygon(path.vertices) for path in simplified]
+        union = unary_union(polygons)
+        self.assertEqual(union.geom_type, "Polygon")
+        self.assertEqual(len(union.interiors), 0)
+        self.assertAlmostEqual(sum(p.area for p in polygons), union.area, delta=1)
+        self.assertAlmostEqual(union.area, 200000 * 200000, delta=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+from app.algorithms.csr_graph import CSRGraph
+from app.algorithms.dijkstra import dijkstra
+from app.algorithms.batch import one_to_many, distance_matrix
+from test_search_modes import road_grid
+
+
+class TestBatchQueries(unittest.TestCase):
+    def setUp(self):
+        cities, connections = road_grid(8)
+        # Identyfikatory miast nie muszą odpowiadać identyfikatorom węzłów
+        cities = [(city_id * 10, name, lon, lat) for city_id, name, lon, lat in cities]
+        connections = [(i, a * 10, b * 10, distance) for i, a, b, distance in connections]
+        self.graph = CSRGraph.from_rows(cities, connections)
+
+    def expected(self, source_id, target_id):
+        names = self.graph.names
+        return dijkstra(self.graph, names[self.graph.node_of_city(source_id)],
+                        names[self.graph.node_of_city(target_id)])[1]
+
+    def test_one_to_many(self):
+        """Jedno przeszukiwanie wypełnia odległości do wszystkich celów."""
+        targets = [20, 150, 640, 10]
+        distances = one_to_many(self.graph, 10, targets)
+        for target, distance in zip(targets, distances):
+            self.assertAlmostEqual(distance, self.expected(10, target))
+
+    def test_distance_matrix(self):
+        """Macierz odległości jest indeksowana identyfikatorami miast."""
+        sources = [10, 330, 640]
+        matrix, source_ids, target_ids = distance_matrix(self.graph, sources, processes=1)
+        self.assertEqual(matrix.shape, (3, 64))
+        self.assertEqual(list(source_ids), sources)
+        self.assertEqual(list(target_ids), list(self.graph.city_ids))
+        self.assertAlmostEqual(matrix[1, 5], self.expected(330, target_ids[5]))
+        self.assertTrue(np.allclose(np.diag(matrix[:, [0, 32, 63]]), 0))
+
+    def test_process_pool_matches_serial(self):
+        """Wynik z puli procesów jest taki sam jak obliczony sekwencyjnie."""
+        serial, _, _ = distance_matrix(self.graph, processes=1)
+        parallel, _, _ = distance_matrix(self.graph, processes=2, chunk_size=8)
+        self.assertTrue(np.array_equal(serial, parallel))
+        self.assertTrue(np.allclose(serial, serial.T))
+
+    def test_unreachable(self):
+        """Niedostępne miasta mają odległość nieskończoną."""
+        graph = CSRGraph.from_rows([(1, 'A', 0, 0), (2, 'B', 0, 0), (3, 'C', 0, 0)], [(1, 1, 2, 5)])
+        matrix, _, _ = distance_matrix(graph, processes=1)
+        self.assertEqual(matrix[0, 1], 5)
+        self.assertEqual(matrix[0, 2], float('inf'))
+
+
+if __name__ == '__main__':
+    unittest.main()
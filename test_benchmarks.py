@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+from app.config import ALGORITHMS
+from app.algorithms import registry
+from app.dataset import Dataset
+from app.db_handler import close_connections, get_cities, get_connection, get_connections
+from benchmarks import compare, heap, run
+from benchmarks.synthetic import generate_network, write_database
+
+
+class TestBenchmarks(unittest.TestCase):
+    def tearDown(self):
+        close_connections()
+
+    def test_synthetic_network(self):
+        """Syntetyczna sieć ma żądaną liczbę miast, stopień zbliżony do sieci drogowej i schemat aplikacji."""
+        lon, lat, sources, targets, distances = generate_network(2500, seed=1)
+        self.assertEqual(len(lon), 2500)
+        self.assertTrue(3.0 < 2 * len(sources) / 2500 < 5.0)
+        self.assertTrue((distances > 0).all())
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "siec.db")
+            self.assertEqual(write_database(path, 400, seed=1), len(generate_network(400, seed=1)[2]))
+            conn = get_connection(path)
+            dataset = Dataset.from_rows(get_cities(conn), get_connections(conn))
+            self.assertEqual(dataset.graph.node_count, 400)
+            dijkstra = registry.run("Dijkstra", dataset.graph, "Miasto 1", "Miasto 400")
+            self.assertTrue(dijkstra.path)
+            self.assertAlmostEqual(registry.run("A*", dataset.graph, "Miasto 1", "Miasto 400").cost, dijkstra.cost)
+            close_connections()
+
+    def test_run_and_compare(self):
+        """Wynik pomiarów zapisuje się do JSON, a porównanie wykrywa wzrost czasów."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "wynik.json")
+            argv = ["--sizes", "300", "--queries", "5", "--repeat", "1", "--data-dir", directory, "--output", output]
+            with unittest.mock.patch("sys.stdout", io.StringIO()):
+                self.assertEqual(run.main(argv), 0)
+            with open(output, encoding="utf-8") as file:
+                result = json.load(file)
+        size = result["sizes"][0]
+        self.assertEqual(size["nodes"], 300)
+        self.assertIn("graph_build", size["stages_s"])
+        self.assertEqual(set(size["queries"]), set(ALGORITHMS))
+        self.assertGreater(size["memory_mb"]["graph_load_peak"], 0)
+
+        slower = json.loads(json.dumps(result))
+        slower["sizes"][0]["stages_s"]["db_load"] *= 2
+        regressions = compare.compare(result, slower, output=io.StringIO())
+        self.assertEqual([name for _, name, _ in regressions], ["etap db_load [s]"])
+
+    def test_heap_benchmark(self):
+        """Mikrobenchmark kolejek sprawdza zgodność odległości i raportuje mniejszą kolejkę indeksowaną."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "kopiec.json")
+            argv = ["--nodes", "500", "--dense-nodes", "200", "--dense-degree", "20", "--sources", "1",
+                    "--queries", "3", "--output", output]
+            with unittest.mock.patch("sys.stdout", io.StringIO()):
+                self.assertEqual(heap.main(argv), 0)
+            with open(output, encoding="utf-8") as file:
+                result = json.load(file)
+        dense = result["dense"]
+        self.assertLessEqual(dense["IndexedHeap(d=4)"]["max_queue"], dense["heapq"]["max_queue"])
+        self.assertEqual(set(result["queries"]), {"dijkstra", "dijkstra_indexed"})
+
+
+if __name__ == '__main__':
+    unittest.main()
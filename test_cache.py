@@ -0,0 +1,171 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from app.algorithms.cache import QueryCache
+from app.algorithms.csr_graph import CSRGraph, FINGERPRINT_KEY
+from app.algorithms.dijkstra import dijkstra
+from app.algorithms.dynamic import TREES_KEY, update_edge_weight
+from app.algorithms.progress import SearchCancelled
+from test_search_modes import road_grid
+
+DIJKSTRA = "app.algorithms.dijkstra.dijkstra"
+ASTAR = "app.algorithms.astar.astar"
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        cities, connections = road_grid(12)
+        self.graph = CSRGraph.from_rows(cities, connections)
+        self.graph.derived[FINGERPRINT_KEY] = "odcisk"
+
+    def test_hits_and_tree_reuse(self):
+        """Powtórzone zapytanie trafia do pamięci, a jawnie zbudowane drzewo odpowiada na zapytania z tego samego miasta."""
+        cache = QueryCache()
+        expected = dijkstra(self.graph, 'M1', 'M144')[:2]
+        stats = {}
+        self.assertEqual(cache.search(self.graph, DIJKSTRA, 'M1', 'M144', stats=stats)[1], expected[1])
+        self.assertEqual(cache.counters()["misses"], 1)
+        # Chybienie uruchamia zwykłe przeszukiwanie do celu, a nie budowę pełnego drzewa
+        reference = {}
+        dijkstra(self.graph, 'M1', 'M144', stats=reference)
+        self.assertEqual(stats["settled"], reference["settled"])
+        self.assertLess(stats["settled"], self.graph.node_count)
+        self.assertNotIn(TREES_KEY, self.graph.derived)
+
+        stats = {}
+        path, cost, steps = cache.search(self.graph, DIJKSTRA, 'M1', 'M144', stats=stats, trace="list")
+        self.assertEqual((path, cost), expected)
+        self.assertTrue(stats["cached"])
+        self.assertEqual(steps, dijkstra(self.graph, 'M1', 'M144', trace="list")[2])
+        self.assertEqual(cache.hits, 1)
+        # Kroki wyniku z pamięci w trybie "lazy" są odtwarzane dopiero przy pobraniu
+        path, cost, lazy_steps = cache.search(self.graph, DIJKSTRA, 'M1', 'M144', trace="lazy")
+        self.assertEqual((path, cost), expected)
+        self.assertEqual(list(lazy_steps), steps)
+
+        cache.tree(self.graph, 'M1')
+        for end in ('M12', 'M77', 'M133'):
+            _, cost, _ = cache.search(self.graph, ASTAR, 'M1', end)
+            self.assertAlmostEqual(cost, dijkstra(self.graph, 'M1', end)[1])
+        self.assertEqual(cache.counters(), {"hits": 2, "tree_hits": 3, "misses": 1, "entries": 4})
+
+        # Bez drzewa od miasta początkowego uruchamiany jest algorytm
+        cache.search(self.graph, ASTAR, 'M2', 'M144')
+        self.assertEqual(cache.misses, 2)
+
+    def test_reuse_search_space(self):
+        """Zapytanie z tego samego miasta o cel ustalony wcześniej niż poprzedni cel nie uruchamia algorytmu."""
+        cache = QueryCache()
+        stats = {}
+        cache.search(self.graph, DIJKSTRA, 'M1', 'M144', stats=stats)
+        self.assertNotIn("search_space", stats)
+        for end in ('M2', 'M13', 'M50', 'M1'):
+            path, cost, _ = cache.search(self.graph, ASTAR, 'M1', end)
+            self.assertEqual((path, cost), dijkstra(self.graph, 'M1', end)[:2])
+        self.assertEqual(cache.counters(), {"hits": 0, "tree_hits": 4, "misses": 1, "entries": 5})
+        self.assertNotIn(TREES_KEY, self.graph.derived)
+
+        # Cel dalszy niż poprzedni nie był ustalony - uruchamiany jest algorytm
+        cache.search(self.graph, DIJKSTRA, 'M5', 'M6')
+        cache.search(self.graph, DIJKSTRA, 'M5', 'M144')
+        self.assertEqual(cache.misses, 3)
+        # Po zmianie wagi wcześniejsze przeszukiwanie nie jest używane
+        update_edge_weight(self.graph, 'M1', 'M2', 100)
+        path, cost, _ = cache.search(self.graph, DIJKSTRA, 'M1', 'M2')
+        self.assertEqual(cache.misses, 4)
+        self.assertEqual((path, cost), dijkstra(self.graph, 'M1', 'M2')[:2])
+
+    def test_cancel_on_miss(self):
+        """Chybione zapytanie zgłasza postęp i można je przerwać; przerwane nie trafia do pamięci."""
+        graph = CSRGraph.from_rows(*road_grid(40))
+        cache = QueryCache()
+
+        def cancel(settled):
+            raise SearchCancelled()
+
+        with self.assertRaises(SearchCancelled):
+            cache.search(graph, DIJKSTRA, 'M1', 'M1600', progress=cancel)
+        with self.assertRaises(SearchCancelled):
+            cache.tree(graph, 'M1', progress=cancel)
+        self.assertEqual(len(cache.entries), 0)
+        self.assertEqual(graph.derived.get(TREES_KEY), {})
+
+    def test_lru_eviction(self):
+        cache = QueryCache(max_entries=2)
+        for end in ('M10', 'M20', 'M30'):
+            cache.search(self.graph, ASTAR, 'M5', end)
+        self.assertEqual(len(cache.entries), 2)
+        cache.search(self.graph, ASTAR, 'M5', 'M10')
+        self.assertEqual(cache.hits, 0)
+
+    def test_invalidation_on_edit(self):
+        """Po zmianie wagi wyniki sprzed zmiany nie są zwracane, a drzewa są naprawiane."""
+        cache = QueryCache()
+        cache.tree(self.graph, 'M1')
+        path, cost, _ = cache.search(self.graph, DIJKSTRA, 'M1', 'M144')
+        update_edge_weight(self.graph, path[-2], path[-1], float('inf'))
+        _, new_cost, _ = cache.search(self.graph, DIJKSTRA, 'M1', 'M144')
+        self.assertEqual(new_cost, dijkstra(self.graph, 'M1', 'M144')[1])
+        self.assertGreater(new_cost, cost)
+        # Oba wyniki pochodzą z drzewa - przed zmianą i po jego naprawie
+        self.assertEqual((cache.tree_hits, cache.misses), (2, 0))
+
+    def test_persistence(self):
+        """Wyniki są zapisywane na dysk tylko dla grafów identyfikowanych odciskiem bazy."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "wyniki.json")
+            cache = QueryCache(path=path)
+            cache.search(self.graph, ASTAR, 'M1', 'M144')
+            other = CSRGraph.from_rows(*road_grid(3))
+            cache.search(other, ASTAR, 'M1', 'M9')
+            cache.save()
+
+            loaded = QueryCache(path=path)
+            self.assertEqual(len(loaded.entries), 1)
+            graph = CSRGraph.from_rows(*road_grid(12))
+            graph.derived[FINGERPRINT_KEY] = "odcisk"
+            self.assertEqual(
+                loaded.search(graph, ASTAR, 'M1', 'M144')[:2], cache.search(self.graph, ASTAR, 'M1', 'M144')[:2]
+            )
+            self.assertEqual(loaded.hits, 1)
+
+            graph.derived[FINGERPRINT_KEY] = "inny odcisk"
+            loaded.search(graph, ASTAR, 'M1', 'M144')
+            self.assertEqual(loaded.misses, 1)
+
+    def test_persisted_results_dropped_after_rename(self):
+        """Po zmianie nazwy miasta w bazie zapisane wyniki nie są zwracane (zmienia się odcisk bazy)."""
+        from app.db_handler import close_connections
+        from app.query import load_graph
+
+        with tempfile.TemporaryDirectory() as directory:
+            database_path = os.path.join(directory, "test.db")
+            shutil.copy("app/data/polska.db", database_path)
+            path = os.path.join(directory, "wyniki.json")
+            graph = load_graph(database_path)
+            start = graph.names[graph.node_of_city(1)]
+            cache = QueryCache(path=path)
+            cached_path = cache.search(graph, ASTAR, start, "Kraków")[0]
+            self.assertEqual(cached_path[0], start)
+            cache.save()
+
+            writer = sqlite3.connect(database_path)
+            writer.execute("UPDATE cities SET city_name = 'Nowa Nazwa' WHERE id = 1")
+            writer.commit()
+            writer.close()
+            close_connections()
+
+            renamed = load_graph(database_path)
+            loaded = QueryCache(path=path)
+            path_after, cost, _ = loaded.search(renamed, ASTAR, "Nowa Nazwa", "Kraków")
+            self.assertEqual((loaded.hits, loaded.misses), (0, 1))
+            self.assertEqual(path_after, ["Nowa Nazwa"] + cached_path[1:])
+            with self.assertRaises(KeyError):
+                loaded.search(renamed, ASTAR, start, "Kraków")
+            close_connections()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import networkx as nx
+from app.algorithms.csr_graph import CSRGraph
+from app.algorithms.dijkstra import dijkstra
+from app.algorithms.contraction import ContractionHierarchy, contraction_hierarchy, build_hierarchy, HIERARCHY_KEY
+from app.dataset import Dataset
+from test_search_modes import road_grid
+
+
+class TestContractionHierarchy(unittest.TestCase):
+    def setUp(self):
+        cities, connections = road_grid(12)
+        self.graph = CSRGraph.from_rows(cities, connections)
+
+    def test_same_cost_as_dijkstra(self):
+        """Zapytania do hierarchii zwracają koszty i ścieżki zgodne z Dijkstrą."""
+        rng = random.Random(2)
+        for _ in range(50):
+            start, end = rng.sample(self.graph.names, 2)
+            path, cost, steps = contraction_hierarchy(self.graph, start, end)
+            _, expected_cost, _ = dijkstra(self.graph, start, end)
+            self.assertAlmostEqual(cost, expected_cost)
+            # Ścieżka po rozwinięciu skrótów składa się z krawędzi oryginalnych
+            nodes = [self.graph.node_id(name) for name in path]
+            length = sum(self.graph.edge_weight(u, v) for u, v in zip(nodes, nodes[1:]))
+            self.assertAlmostEqual(length, cost)
+
+    def test_directed_graph(self):
+        """Hierarchia dla grafu skierowanego."""
+        rng = random.Random(5)
+        nx_graph = nx.gnm_random_graph(40, 160, seed=3, directed=True)
+        for u, v in nx_graph.edges:
+            nx_graph[u][v]['weight'] = rng.randint(1, 20)
+        graph = CSRGraph.from_networkx(nx_graph)
+        for start in range(0, 40, 3):
+            for end in range(1, 40, 5):
+                self.assertEqual(contraction_hierarchy(graph, start, end)[1], dijkstra(graph, start, end)[1])
+
+    def test_no_path_and_single_node(self):
+        """Brak ścieżki i ścieżka z węzła do niego samego."""
+        graph = CSRGraph.from_rows([(1, 'A', 20, 50), (2, 'B', 21, 50), (3, 'E', 22, 50)], [(1, 1, 2, 100)])
+        self.assertEqual(contraction_hierarchy(graph, 'A', 'E')[:2], ([], float('inf')))
+        self.assertEqual(contraction_hierarchy(graph, 'A', 'A')[:2], (['A'], 0))
+
+
+class TestHierarchyPersistence(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.database_path = os.path.join(self.directory, "test.db")
+        shutil.copy("app/data/polska.db", self.database_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_sidecar_file_and_invalidation(self):
+        """Hierarchia jest zapisywana obok bazy i przebudowywana po zmianie połączeń."""
+        dataset = Dataset.from_database(self.database_path)
+        path, cost, _ = contraction_hierarchy(dataset.graph, 'Gdańsk', 'Kraków')
+        self.assertAlmostEqual(cost, dijkstra(dataset.graph, 'Gdańsk', 'Kraków')[1])
+        sidecar = self.database_path + ".ch.npz"
+        self.assertTrue(os.path.exists(sidecar))
+        self.assertEqual(ContractionHierarchy.load(sidecar).fingerprint, dataset.fingerprint)
+
+        # Ponowne załadowanie korzysta z zapisanej hierarchii
+        reloaded = Dataset.from_database(self.database_path)
+        contraction_hierarchy(reloaded.graph, 'Gdańsk', 'Kraków')
+        self.assertEqual(reloaded.graph.derived[HIERARCHY_KEY].fingerprint, dataset.fingerprint)
+
+        # Zmiana wiersza w tabeli connections unieważnia hierarchię
+        conn = sqlite3.connect(self.database_path)
+        conn.execute("UPDATE connections SET distance = 1 WHERE id = 1")
+        conn.commit()
+        conn.close()
+        changed = Dataset.from_database(self.database_path)
+        self.assertNotEqual(changed.fingerprint, dataset.fingerprint)
+        _, cost, _ = contraction_hierarchy(changed.graph, 'Gdańsk', 'Kraków')
+        self.assertAlmostEqual(cost, dijkstra(changed.graph, 'Gdańsk', 'Kraków')[1])
+        self.assertEqual(ContractionHierarchy.load(sidecar).fingerprint, changed.fingerprint)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+from app.dataset import Dataset
+from app.db_handler import close_connections, get_cities, get_connection, get_connections
+
+
+class TestDataset(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.database_path = os.path.join(self.directory, "test.db")
+        shutil.copy("app/data/polska.db", self.database_path)
+
+    def tearDown(self):
+        close_connections()
+        shutil.rmtree(self.directory)
+
+    def test_index_and_graph(self):
+        """Miasta i połączenia zbioru danych odpowiadają wierszom tabel bazy."""
+        dataset = Dataset.from_database(self.database_path)
+        conn = get_connection(self.database_path)
+        cities, connections = get_cities(conn), get_connections(conn)
+        graph = dataset.graph
+        self.assertEqual(graph.names[graph.node_of_city(3)], "Gdańsk")
+        self.assertEqual(graph.node_count, len(cities))
+        self.assertEqual(dataset.city_points()["Gdańsk"][0], 3)
+        self.assertEqual(
+            sorted(tuple(sorted(pair)) for pair in dataset.edge_nodes.tolist()),
+            sorted(tuple(sorted((graph.node_of_city(a), graph.node_of_city(b)))) for _, a, b, _ in connections),
+        )
+
+    def test_snapshot_load_skips_database(self):
+        """Przy aktualnym zrzucie grafu baza danych nie jest otwierana."""
+        Dataset.from_database(self.database_path)
+        close_connections()
+        with unittest.mock.patch("app.db_handler.get_connection") as get_connection_mock:
+            dataset = Dataset.from_database(self.database_path)
+        get_connection_mock.assert_not_called()
+        self.assertEqual(dataset.graph.names[dataset.graph.node_of_city(3)], "Gdańsk")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import importlib.util
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import unittest.mock
+from app.db_handler import close_connections
+from app.dataset import Dataset
+from app.dataset_manager import DatasetManager
+from benchmarks.synthetic import write_database
+
+
+@unittest.skipUnless(importlib.util.find_spec("geopandas"), "wymaga geopandas")
+class TestDatasetManager(unittest.TestCase):
+    def setUp(self):
+        import geopandas as gpd
+        from shapely.geometry import box
+
+        self.directory = tempfile.mkdtemp()
+        self.shp_path = os.path.join(self.directory, "mapa.shp")
+        gpd.GeoDataFrame({"nazwa": ["a"]}, geometry=[box(14, 49, 24, 55)], crs="EPSG:4326").to_file(self.shp_path)
+        self.countries = []
+        for index, node_count in enumerate((500, 400, 300)):
+            database_path = os.path.join(self.directory, f"kraj{index}.db")
+            write_database(database_path, node_count, seed=index)
+            self.countries.append((self.shp_path, database_path, "EPSG:2180"))
+
+    def tearDown(self):
+        close_connections()
+        shutil.rmtree(self.directory)
+
+    def test_cached_and_projected(self):
+        """Kraj jest wczytywany raz, z miastami rzutowanymi do CRS mapy; zmiana bazy wymusza ponowne wczytanie."""
+        manager = DatasetManager(2 ** 30)
+        self.assertIsNone(manager.cached(*self.countries[0]))
+        loaded = manager.get(*self.countries[0])
+        self.assertEqual(loaded.dataset.graph.node_count, 500)
+        self.assertIn("EPSG:2180", loaded.dataset.projected)
+        self.assertIs(manager.get(*self.countries[0]), loaded)
+        self.assertIs(manager.cached(*self.countries[0]), loaded)
+        self.assertEqual(manager.counters()["hits"], 1)
+
+        database_path = self.countries[0][1]
+        os.utime(database_path, (0, os.path.getmtime(database_path) + 10))
+        self.assertIsNone(manager.cached(*self.countries[0]))
+        self.assertIsNot(manager.get(*self.countries[0]), loaded)
+
+    def test_memory_budget_evicts_least_recently_used(self):
+        """Po przekroczeniu budżetu usuwany jest najdawniej używany kraj, ale nigdy ostatnio pobrany."""
+        manager = DatasetManager(2 ** 30)
+        sizes = [manager.get(*country).estimated_size() for country in self.countries[:2]]
+        manager.get(*self.countries[0])
+        manager.memory_budget = sum(sizes) + 1
+        manager.get(*self.countries[2])
+        self.assertEqual(list(manager.entries), [self.countries[0], self.countries[2]])
+        self.assertLessEqual(manager.memory_usage(), manager.memory_budget)
+
+        manager.memory_budget = 1
+        manager.get(*self.countries[1])
+        self.assertEqual(list(manager.entries), [self.countries[1]])
+
+    def test_preload_loads_each_country_once(self):
+        """Wstępne ładowanie w tle i równoczesne ``get`` tego samego kraju wczytują go tylko raz."""
+        manager = DatasetManager(2 ** 30)
+        loaded = []
+        with unittest.mock.patch.object(Dataset, "from_database", wraps=Dataset.from_database) as from_database:
+            threads = manager.preload(self.countries + self.countries[:1],
+                                      lambda map_path, entry: loaded.append(entry))
+            getter = threading.Thread(target=manager.get, args=self.countries[0])
+            getter.start()
+            for thread in threads + [getter]:
+                thread.join()
+        self.assertEqual(from_database.call_count, 3)
+        self.assertEqual(len(loaded), 4)
+        first = [entry for entry in loaded if entry.dataset.graph.node_count == 500]
+        self.assertEqual(len(first), 2)
+        self.assertTrue(all(entry is manager.cached(*self.countries[0]) for entry in first))
+        self.assertEqual(manager.counters()["entries"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
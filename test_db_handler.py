@@ -0,0 +1,112 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import unittest.mock
+from app.algorithms.csr_graph import CSRGraph
+from app.db_handler import (
+    close_connections, get_cities, get_connection, get_connections, get_neighbors, iter_cities, iter_connections,
+    prepare_database,
+)
+
+
+class TestDbHandler(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.database_path = os.path.join(self.directory, "test.db")
+        shutil.copy("app/data/polska.db", self.database_path)
+
+    def tearDown(self):
+        close_connections()
+        shutil.rmtree(self.directory)
+
+    def test_pooled_read_only_connection(self):
+        """Połączenie jest współdzielone, tylko do odczytu i nie zmienia pliku bazy."""
+        with open(self.database_path, "rb") as file:
+            original = file.read()
+        conn = get_connection(self.database_path)
+        self.assertIs(get_connection(self.database_path), conn)
+        with self.assertRaises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM connections")
+        self.assertEqual(len(get_cities(conn)), conn.execute("SELECT COUNT(*) FROM cities").fetchone()[0])
+        close_connections()
+        with open(self.database_path, "rb") as file:
+            self.assertEqual(file.read(), original)
+        self.assertFalse(os.path.exists(self.database_path + "-wal"))
+
+    def test_prepare_database(self):
+        """Jawna migracja zakłada indeksy i włącza dziennik WAL."""
+        self.assertTrue(prepare_database(self.database_path))
+        conn = get_connection(self.database_path)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({"idx_connections_city_a", "idx_connections_city_b", "idx_cities_position"} <= indexes)
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT city_a, distance FROM connections WHERE city_b = 1"
+        ))
+        self.assertIn("COVERING INDEX idx_connections_city_b", plan)
+
+    def test_wal_database_in_read_only_directory(self):
+        """Baza WAL w katalogu bez prawa zapisu jest otwierana jako niezmienna."""
+        self.assertTrue(prepare_database(self.database_path))
+        connect = sqlite3.connect
+        uris = []
+
+        def read_only_directory(database, *args, **kwargs):
+            # Tak zachowuje się SQLite, gdy nie może utworzyć pliku -shm obok bazy WAL
+            uris.append(database)
+            if "immutable=1" not in database:
+                raise sqlite3.OperationalError("attempt to write a readonly database")
+            return connect(database, *args, **kwargs)
+
+        with unittest.mock.patch("app.db_handler.sqlite3.connect", side_effect=read_only_directory), \
+                unittest.mock.patch("app.db_handler.os.access", return_value=False):
+            conn = get_connection(self.database_path)
+        self.assertEqual(len(uris), 2)
+        self.assertEqual(len(get_cities(conn)), conn.execute("SELECT COUNT(*) FROM cities").fetchone()[0])
+
+        # W katalogu z prawem zapisu błąd nie jest ukrywany
+        close_connections()
+        with unittest.mock.patch("app.db_handler.sqlite3.connect", side_effect=read_only_directory):
+            self.assertIsNone(get_connection(self.database_path))
+
+    def test_missing_database(self):
+        self.assertIsNone(get_connection(os.path.join(self.directory, "brak.db")))
+
+    def test_streaming_matches_full_read(self):
+        """Strumieniowe czytanie zwraca te same wiersze co pełne zapytanie."""
+        conn = get_connection(self.database_path)
+        raw = sqlite3.connect(self.database_path)
+        self.assertEqual(list(iter_cities(conn)), raw.execute("SELECT * FROM cities ORDER BY id").fetchall())
+        self.assertEqual(
+            list(iter_connections(conn)), raw.execute("SELECT * FROM connections ORDER BY id").fetchall()
+        )
+        raw.close()
+
+    def test_bbox_and_neighbors(self):
+        """Zapytania o prostokąt i o sąsiadów zgadzają się z filtrowaniem pełnych danych."""
+        conn = get_connection(self.database_path)
+        cities = get_cities(conn)
+        connections = get_connections(conn)
+        bbox = (17.0, 52.0, 22.0, 55.0)
+        inside = {c[0] for c in cities if bbox[0] <= c[2] <= bbox[2] and bbox[1] <= c[3] <= bbox[3]}
+        self.assertTrue(0 < len(inside) < len(cities))
+        self.assertEqual({c[0] for c in get_cities(conn, bbox)}, inside)
+        self.assertEqual(
+            get_connections(conn, bbox), [c for c in connections if c[1] in inside and c[2] in inside]
+        )
+
+        graph = CSRGraph.from_database(conn, bbox=bbox)
+        self.assertEqual(graph.node_count, len(inside))
+
+        city_id = cities[0][0]
+        expected = sorted(
+            [(b, d) for _, a, b, d in connections if a == city_id]
+            + [(a, d) for _, a, b, d in connections if b == city_id]
+        )
+        self.assertEqual(sorted(get_neighbors(conn, city_id)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 import networkx as nx
 from app.algorithms.dijkstra import dijkstra
+from app.algorithms.csr_graph import ADJACENCY_BYTES_PER_EDGE, CSRGraph
 
 class TestDijkstraAlgorithm(unittest.TestCase):
     def setUp(self):
@@ -76,5 +77,107 @@ class TestDijkstraAlgorithm(unittest.TestCase):
         self.assertEqual(path, ['A'])
         self.assertEqual(cost, 0)
 
+class TestDijkstraCSRGraph(unittest.TestCase):
+    def setUp(self):
+        # Ten sam przykładowy graf co wyżej, zbudowany z wierszy tabel bazy danych
+        cities = [(1, 'A', 20.0, 50.0), (2, 'B', 21.0, 50.0), (3, 'C', 22.0, 50.0), (4, 'D', 23.0, 50.0)]
+        connections = [(1, 1, 2, 1), (2, 2, 3, 2), (3, 1, 3, 4), (4, 3, 4, 1)]
+        self.graph = CSRGraph.from_rows(cities, connections)
+
+    def test_build_from_rows(self):
+        """Test budowy grafu CSR z tabel cities/connections."""
+        self.assertEqual(self.graph.node_count, 4)
+        self.assertEqual(self.graph.edge_count, 8)  # Krawędzie nieskierowane w obu kierunkach
+        self.assertEqual(list(self.graph.offsets), [0, 2, 4, 7, 8])
+        self.assertEqual(self.graph.node_id('C'), 2)
+        self.assertEqual(list(self.graph.city_ids), [1, 2, 3, 4])
+        self.assertEqual(self.graph.edge_weight(2, 3), 1)
+
+    def test_nbytes_counts_caches(self):
+        """Rozmiar grafu obejmuje zbudowane listy sąsiedztwa i graf odwrotny."""
+        graph = CSRGraph.from_edges(['A', 'B', 'C'], [(0, 1, 1), (1, 2, 2)], directed=True)
+        arrays = graph.nbytes
+        graph.adjacency()
+        with_adjacency = graph.nbytes
+        self.assertEqual(with_adjacency, arrays + graph.edge_count * ADJACENCY_BYTES_PER_EDGE)
+        graph.reverse().adjacency()
+        reverse = graph.reverse()
+        self.assertEqual(graph.nbytes, with_adjacency + reverse.offsets.nbytes + reverse.targets.nbytes
+                         + reverse.weights.nbytes + reverse.edge_count * ADJACENCY_BYTES_PER_EDGE)
+
+    def test_simple_graph(self):
+        """Test najkrótszej ścieżki w grafie CSR."""
+        path, cost, steps = dijkstra(self.graph, 'A', 'D', trace="list")
+        self.assertEqual(path, ['A', 'B', 'C', 'D'])
+        self.assertEqual(cost, 4)
+        self.assertIn(('A', 'B', 1.0), steps)
+
+    def test_no_path(self):
+        """Test dla węzłów bez ścieżki w grafie CSR."""
+        graph = CSRGraph.from_rows([(1, 'A', 0, 0), (2, 'B', 0, 0), (3, 'E', 0, 0)], [(1, 1, 2, 1)])
+        path, cost, steps = dijkstra(graph, 'A', 'E')
+        self.assertEqual(path, [])
+        self.assertEqual(cost, float('inf'))
+
+    def test_directed_graph(self):
+        """Test dla skierowanego grafu CSR."""
+        directed_graph = nx.DiGraph()
+        directed_graph.add_edge('A', 'B', weight=1)
+        directed_graph.add_edge('B', 'C', weight=2)
+        directed_graph.add_edge('C', 'A', weight=3)
+        graph = CSRGraph.from_networkx(directed_graph)
+        path, cost, steps = dijkstra(graph, 'C', 'B')
+        self.assertEqual(path, ['C', 'A', 'B'])
+        self.assertEqual(cost, 4)
+
+    def test_single_node(self):
+        """Test dla grafu CSR z jednym węzłem."""
+        graph = CSRGraph.from_edges(['A'], [])
+        path, cost, steps = dijkstra(graph, 'A', 'A')
+        self.assertEqual(path, ['A'])
+        self.assertEqual(cost, 0)
+
+    def test_matches_networkx(self):
+        """Wyniki dla grafu CSR są zgodne z wynikami dla grafu NetworkX."""
+        nx_graph = nx.gnm_random_graph(60, 200, seed=7)
+        for u, v in nx_graph.edges:
+            nx_graph[u][v]['weight'] = (u * 7 + v * 13) % 17 + 1
+        graph = CSRGraph.from_networkx(nx_graph)
+        for end in range(0, 60, 7):
+            _, expected_cost, _ = dijkstra(nx_graph, 0, end)
+            _, cost, _ = dijkstra(graph, 0, end)
+            self.assertEqual(cost, expected_cost)
+
+class TestDijkstraTraceModes(unittest.TestCase):
+    def setUp(self):
+        self.graph = nx.Graph()
+        self.graph.add_edge('A', 'B', weight=1)
+        self.graph.add_edge('B', 'C', weight=2)
+        self.graph.add_edge('A', 'C', weight=4)
+        self.graph.add_edge('C', 'D', weight=1)
+
+    def test_default_has_no_trace(self):
+        """Domyślnie kroki nie są zapisywane."""
+        for graph in (self.graph, CSRGraph.from_networkx(self.graph)):
+            path, cost, steps = dijkstra(graph, 'A', 'D')
+            self.assertEqual(path, ['A', 'B', 'C', 'D'])
+            self.assertEqual(list(steps), [])
+
+    def test_lazy_trace_matches_list(self):
+        """Iterator kroków zwraca te same kroki co pełna lista."""
+        for graph in (self.graph, CSRGraph.from_networkx(self.graph)):
+            _, _, steps = dijkstra(graph, 'A', 'D', trace="list")
+            path, cost, lazy_steps = dijkstra(graph, 'A', 'D', trace="lazy")
+            self.assertEqual(path, ['A', 'B', 'C', 'D'])
+            self.assertEqual(cost, 4)
+            self.assertNotIsInstance(lazy_steps, list)
+            self.assertEqual(next(lazy_steps), steps[0])
+            self.assertEqual([steps[0]] + list(lazy_steps), steps)
+
+    def test_unknown_trace_mode(self):
+        """Nieznany tryb zapisu kroków zgłasza błąd."""
+        with self.assertRaises(ValueError):
+            dijkstra(self.graph, 'A', 'D', trace="all")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,116 @@
+import os
+import random
+import tempfile
+import unittest
+from app.algorithms.csr_graph import CSRGraph
+from app.algorithms.dijkstra import dijkstra
+from app.algorithms.astar import astar
+from app.algorithms.contraction import contraction_hierarchy
+from app.algorithms.dynamic import ShortestPathTree, remove_edge, shortest_path_tree, update_edge_weight
+from app.snapshot import read_snapshot, save_snapshot
+from test_search_modes import road_grid
+
+
+class TestDynamicUpdates(unittest.TestCase):
+    def setUp(self):
+        cities, connections = road_grid(15)
+        self.graph = CSRGraph.from_rows(cities, connections)
+
+    def assertTreeCorrect(self, tree):
+        expected = ShortestPathTree(self.graph, tree.source)
+        for node in range(self.graph.node_count):
+            self.assertAlmostEqual(tree.distances[node], expected.distances[node])
+            if tree.parents[node] != -1:
+                parent = tree.parents[node]
+                self.assertAlmostEqual(
+                    tree.distances[parent] + self.graph.edge_weight(parent, node), tree.distances[node]
+                )
+
+    def test_random_updates_match_recomputation(self):
+        """Po każdej zmianie wagi naprawione drzewa są takie same jak policzone od nowa."""
+        rng = random.Random(3)
+        trees = [shortest_path_tree(self.graph, name) for name in ('M1', 'M113', 'M225')]
+        sources = self.graph.edge_sources().tolist()
+        targets = self.graph.targets.tolist()
+        for _ in range(60):
+            edge = rng.randrange(self.graph.edge_count)
+            u, v = sources[edge], targets[edge]
+            weight = rng.choice([float('inf'), self.graph.edge_weight(u, v) * rng.uniform(0.3, 3.0),
+                                 rng.uniform(1, 40)])
+            stats = {}
+            touched = update_edge_weight(self.graph, self.graph.names[u], self.graph.names[v], weight, stats)
+            self.assertEqual(touched, sum(stats["touched"].values()))
+            for tree in trees:
+                self.assertTreeCorrect(tree)
+                self.assertIs(shortest_path_tree(self.graph, self.graph.names[tree.source]), tree)
+
+    def test_directed_repair_uses_updated_reverse(self):
+        """W grafie skierowanym naprawa korzysta z aktualnych wag krawędzi wchodzących (graf odwrotny)."""
+        rng = random.Random(5)
+        names = [f"N{node}" for node in range(150)]
+        edges = [(rng.randrange(150), rng.randrange(150), rng.uniform(1, 10)) for _ in range(900)]
+        graph = CSRGraph.from_edges(names, [edge for edge in edges if edge[0] != edge[1]], directed=True)
+        trees = [shortest_path_tree(graph, name) for name in ('N0', 'N7')]
+        reverse = graph.reverse()
+        reverse.adjacency()
+        sources = graph.edge_sources().tolist()
+        targets = graph.targets.tolist()
+        for _ in range(100):
+            edge = rng.randrange(graph.edge_count)
+            u, v = sources[edge], targets[edge]
+            update_edge_weight(graph, names[u], names[v], rng.choice([float('inf'), rng.uniform(1, 40)]))
+            self.assertIs(graph.reverse(), reverse)
+            self.assertEqual(reverse.version, graph.version)
+            self.assertEqual(reverse.edge_weight(v, u), graph.edge_weight(u, v))
+            for tree in trees:
+                expected = ShortestPathTree(graph, tree.source)
+                for node in range(graph.node_count):
+                    self.assertAlmostEqual(tree.distances[node], expected.distances[node])
+
+    def test_touched_counts(self):
+        """Zmiana krawędzi spoza drzewa nie dotyka żadnego węzła, a usunięcie krawędzi drzewa - tylko poddrzewa."""
+        tree = shortest_path_tree(self.graph, 'M1')
+        path, _ = tree.path_to(self.graph.node_id('M225'))
+        on_path = set(zip(path, path[1:]))
+        u, v = next(
+            (a, b) for a, b in zip(self.graph.edge_sources().tolist(), self.graph.targets.tolist())
+            if (a, b) not in on_path and (b, a) not in on_path and tree.parents[b] != a and tree.parents[a] != b
+        )
+        self.assertEqual(update_edge_weight(self.graph, self.graph.names[u], self.graph.names[v], 1000.0), 0)
+
+        touched = remove_edge(self.graph, self.graph.names[path[-2]], self.graph.names[path[-1]])
+        self.assertGreaterEqual(touched, 1)
+        self.assertLess(touched, self.graph.node_count)
+        self.assertTreeCorrect(tree)
+
+    def test_algorithms_see_updates(self):
+        """Algorytmy (w tym A* i hierarchie kontrakcji) korzystają z nowych wag."""
+        contraction_hierarchy(self.graph, 'M1', 'M225')
+        path, cost, _ = dijkstra(self.graph, 'M1', 'M225')
+        version = self.graph.version
+        remove_edge(self.graph, path[1], path[2])
+        update_edge_weight(self.graph, 'M100', 'M101', 0.5)
+        self.assertEqual(self.graph.version, version + 2)
+
+        _, expected_cost, _ = dijkstra(self.graph, 'M1', 'M225')
+        self.assertNotEqual(dijkstra(self.graph, 'M1', 'M225')[0], path)
+        self.assertAlmostEqual(astar(self.graph, 'M1', 'M225')[1], expected_cost)
+        self.assertAlmostEqual(contraction_hierarchy(self.graph, 'M1', 'M225')[1], expected_cost)
+
+    def test_missing_edge_and_read_only_graph(self):
+        """Nieistniejące połączenie zgłasza KeyError, a graf ze zrzutu jest kopiowany przy zmianie."""
+        with self.assertRaises(KeyError):
+            update_edge_weight(self.graph, 'M1', 'M225', 1.0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "grid.graph.bin")
+            save_snapshot(self.graph, path, "")
+            graph, _ = read_snapshot(path)
+            update_edge_weight(graph, 'M1', 'M2', 0.5)
+            self.assertEqual(graph.edge_weight(0, 1), 0.5)
+            self.assertEqual(read_snapshot(path)[0].edge_weight(0, 1), self.graph.edge_weight(0, 1))
+            self.assertNotIn("snapshot_path", graph.derived)
+
+
+if __name__ == '__main__':
+    unittest.main()
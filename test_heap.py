@@ -0,0 +1,54 @@
+import random
+import unittest
+from app.algorithms.csr_graph import CSRGraph
+from app.algorithms.dijkstra import dijkstra, dijkstra_indexed
+from app.algorithms.heap import IndexedHeap
+from test_search_modes import road_grid
+
+
+class TestIndexedHeap(unittest.TestCase):
+    def test_random_operations(self):
+        """Kopiec zwraca węzły w kolejności kluczy przy losowych dodaniach i zmniejszeniach kluczy."""
+        rng = random.Random(7)
+        for arity in (2, 3, 4, 8):
+            heap = IndexedHeap(200, arity)
+            expected = {}
+            for _ in range(2000):
+                if expected and rng.random() < 0.3:
+                    key, node = heap.pop()
+                    self.assertEqual(key, min(expected.values()))
+                    self.assertEqual(expected.pop(node), key)
+                    self.assertNotIn(node, heap)
+                else:
+                    node = rng.randrange(200)
+                    key = rng.uniform(0, 100)
+                    improved = node not in expected or key < expected[node]
+                    self.assertEqual(heap.push(node, key), improved)
+                    if improved:
+                        expected[node] = key
+                self.assertEqual(len(heap), len(expected))
+            heap.clear()
+            self.assertFalse(heap)
+            self.assertNotIn(0, heap)
+
+    def test_invalid_arity(self):
+        with self.assertRaises(ValueError):
+            IndexedHeap(10, 1)
+
+    def test_dijkstra_indexed(self):
+        """Dijkstra z kopcem indeksowanym daje te same wyniki i kroki co wersja z heapq."""
+        cities, connections = road_grid(15)
+        graph = CSRGraph.from_rows(cities, connections)
+        rng = random.Random(2)
+        for _ in range(10):
+            start, end = rng.sample(graph.names, 2)
+            expected_stats, stats = {}, {}
+            path, cost, _ = dijkstra(graph, start, end, stats=expected_stats)
+            self.assertEqual(dijkstra_indexed(graph, start, end, stats=stats)[:2], (path, cost))
+            self.assertEqual(stats, expected_stats)
+        self.assertEqual(dijkstra_indexed(graph, 'M1', 'M200', trace="list")[2],
+                         dijkstra(graph, 'M1', 'M200', trace="list")[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
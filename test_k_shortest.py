@@ -0,0 +1,75 @@
+import itertools
+import random
+import unittest
+import networkx as nx
+from app.algorithms.cache import QueryCache
+from app.algorithms.csr_graph import CSRGraph
+from app.algorithms.dynamic import TREES_KEY
+from app.algorithms.k_shortest import k_shortest_paths
+from test_search_modes import road_grid
+
+
+class TestKShortestPaths(unittest.TestCase):
+    def setUp(self):
+        cities, connections = road_grid(12)
+        self.graph = CSRGraph.from_rows(cities, connections)
+        self.reference = nx.Graph()
+        names = {city[0]: city[1] for city in cities}
+        for _, city_a, city_b, distance in connections:
+            self.reference.add_edge(names[city_a], names[city_b], weight=distance)
+
+    def test_same_costs_as_networkx(self):
+        """Bez limitu nakładania trasy to k najkrótszych ścieżek prostych."""
+        rng = random.Random(1)
+        for _ in range(10):
+            start, end = rng.sample(self.graph.names, 2)
+            routes = k_shortest_paths(self.graph, start, end, k=6)
+            expected = list(itertools.islice(nx.shortest_simple_paths(self.reference, start, end, "weight"), 6))
+            self.assertEqual(len(routes), 6)
+            for (path, cost), expected_path in zip(routes, expected):
+                self.assertAlmostEqual(cost, nx.path_weight(self.reference, expected_path, "weight"), places=6)
+                self.assertAlmostEqual(cost, nx.path_weight(self.reference, path, "weight"), places=6)
+                self.assertEqual(len(set(path)), len(path))
+
+    def test_overlap_limit(self):
+        """Każda trasa dzieli z wcześniejszymi najwyżej ``max_overlap`` swojej długości, pierwsza jest najkrótsza."""
+        start, end = "M1", "M144"
+        stats = {}
+        routes = k_shortest_paths(self.graph, start, end, k=3, max_overlap=0.5, stats=stats)
+        self.assertEqual(len(routes), 3)
+        self.assertAlmostEqual(routes[0][1], nx.shortest_path_length(self.reference, start, end, "weight"))
+        self.assertGreaterEqual(stats["candidates"], 3)
+        edge_sets = [{frozenset(edge) for edge in zip(path, path[1:])} for path, _ in routes]
+        for index, (path, cost) in enumerate(routes):
+            self.assertEqual((path[0], path[-1]), (start, end))
+            self.assertEqual(len(set(path)), len(path))
+            for earlier in edge_sets[:index]:
+                shared = sum(self.reference[a][b]["weight"] for a, b in zip(path, path[1:])
+                             if frozenset((a, b)) in earlier)
+                self.assertLessEqual(shared, 0.5 * cost + 1e-9)
+
+    def test_directed_and_unreachable(self):
+        graph = CSRGraph.from_edges(["A", "B", "C", "D", "E"], [(0, 1, 1), (1, 3, 1), (0, 2, 2), (2, 3, 1), (3, 0, 1)],
+                                    directed=True)
+        routes = k_shortest_paths(graph, "A", "D", k=3)
+        self.assertEqual(routes, [(["A", "B", "D"], 2.0), (["A", "C", "D"], 3.0)])
+        self.assertEqual(k_shortest_paths(graph, "D", "B", k=2), [(["D", "A", "B"], 2.0)])
+        self.assertEqual(k_shortest_paths(graph, "A", "E", k=2), [])
+
+    def test_trees_reused_through_cache(self):
+        """Drzewa do celu i od źródła trafiają do pamięci podręcznej i są używane w kolejnych zapytaniach."""
+        cache = QueryCache(max_trees=4)
+        first = k_shortest_paths(self.graph, "M1", "M144", k=3, max_overlap=0.5, cache=cache)
+        trees = self.graph.derived[TREES_KEY]
+        self.assertEqual(set(trees), {self.graph.node_id("M1"), self.graph.node_id("M144")})
+        tree = trees[self.graph.node_id("M144")]
+        self.assertEqual(k_shortest_paths(self.graph, "M1", "M144", k=3, max_overlap=0.5, cache=cache), first)
+        self.assertIs(self.graph.derived[TREES_KEY][self.graph.node_id("M144")], tree)
+        # Zapytanie z miasta docelowego jest teraz odczytywane z drzewa
+        path, _, _ = cache.search(self.graph, "app.algorithms.dijkstra.dijkstra", "M144", "M1")
+        self.assertEqual(cache.counters()["tree_hits"], 1)
+        self.assertEqual(path[::-1], first[0][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import numpy as np
+from app.level_of_detail import TiledNetwork, node_importance
+from benchmarks.heap import road_graph
+
+
+class TestLevelOfDetail(unittest.TestCase):
+    def setUp(self):
+        self.graph = road_graph(5000, seed=2)
+        # Współrzędne geograficzne przeskalowane do metrów (wystarczające do podziału na kafle)
+        self.xy = self.graph.coordinates * 100000
+        sources = np.repeat(np.arange(self.graph.node_count), np.diff(self.graph.offsets))
+        directed = np.column_stack([sources, self.graph.targets])
+        self.edge_nodes = directed[directed[:, 0] < directed[:, 1]]
+        self.importance = node_importance(self.graph)
+
+    def test_importance_follows_degree(self):
+        """Ważność to permutacja węzłów zgodna ze stopniem."""
+        self.assertEqual(sorted(self.importance.tolist()), list(range(self.graph.node_count)))
+        degree = np.diff(self.graph.offsets)
+        self.assertEqual(degree[np.argmax(self.importance)], degree.max())
+        self.assertEqual(degree[np.argmin(self.importance)], degree.min())
+
+    def test_whole_network_is_thinned_to_limits(self):
+        """Cały kraj w widoku jest rysowany na rzadszym poziomie z najważniejszymi elementami."""
+        network = TiledNetwork(self.xy, self.edge_nodes, self.importance, 2000, 1000)
+        (x_min, y_min), (x_max, y_max) = self.xy.min(axis=0), self.xy.max(axis=0)
+        view = network.view((x_min, x_max), (y_min, y_max))
+        self.assertGreater(view.connection_level, 0)
+        self.assertLessEqual(len(view.connections), 2000)
+        self.assertLessEqual(len(view.cities), 1000)
+        self.assertGreater(len(view.cities), 1000 // 4)
+        # Narysowane miasta są ważniejsze od pominiętych
+        drawn = network.cities.order[view.cities]
+        skipped = np.setdiff1d(np.arange(self.graph.node_count), drawn)
+        self.assertGreater(self.importance[drawn].min(), self.importance[skipped].max())
+
+    def test_zoomed_view_draws_every_visible_element(self):
+        """Po przybliżeniu rysowane są wszystkie połączenia przecinające widok, ale nie cała sieć."""
+        network = TiledNetwork(self.xy, self.edge_nodes, self.importance, 2000, 1000)
+        (x_min, y_min), (x_max, y_max) = self.xy.min(axis=0), self.xy.max(axis=0)
+        xlim = (x_min + (x_max - x_min) * 0.4, x_min + (x_max - x_min) * 0.5)
+        ylim = (y_min + (y_max - y_min) * 0.4, y_min + (y_max - y_min) * 0.5)
+        view = network.view(xlim, ylim)
+        self.assertEqual((view.city_level, view.connection_level), (0, 0))
+        self.assertLess(len(view.connections), len(self.edge_nodes))
+
+        segments = self.xy[self.edge_nodes]
+        inside = ((segments[:, :, 0] >= xlim[0]) & (segments[:, :, 0] <= xlim[1])
+                  & (segments[:, :, 1] >= ylim[0]) & (segments[:, :, 1] <= ylim[1])).any(axis=1)
+        drawn = set(network.connections.order[view.connections].tolist())
+        self.assertTrue(set(np.nonzero(inside)[0].tolist()) <= drawn)
+        cities_inside = ((self.xy[:, 0] >= xlim[0]) & (self.xy[:, 0] <= xlim[1])
+                         & (self.xy[:, 1] >= ylim[0]) & (self.xy[:, 1] <= ylim[1]))
+        self.assertTrue(set(np.nonzero(cities_inside)[0].tolist())
+                        <= set(network.cities.order[view.cities].tolist()))
+
+        # Przesunięcie w obrębie tych samych kafli daje ten sam klucz widoku
+        tile_size = network.grid[2]
+        shifted = network.view((xlim[0] + tile_size / 100, xlim[1] + tile_size / 100), ylim)
+        self.assertEqual(shifted.key, view.key)
+
+    def test_long_connection_does_not_widen_other_views(self):
+        """Długie połączenie jest rysowane w widokach, które przecina, i nie zwiększa innych widoków."""
+        west, east = int(np.argmin(self.xy[:, 0])), int(np.argmax(self.xy[:, 0]))
+        with_long = np.vstack([self.edge_nodes, [[west, east]]])
+        (x_min, y_min), (x_max, y_max) = self.xy.min(axis=0), self.xy.max(axis=0)
+        xlim = (x_min + (x_max - x_min) * 0.05, x_min + (x_max - x_min) * 0.15)
+        ylim = (y_min + (y_max - y_min) * 0.05, y_min + (y_max - y_min) * 0.15)
+        plain = TiledNetwork(self.xy, self.edge_nodes, self.importance, 2000, 1000).view(xlim, ylim)
+        network = TiledNetwork(self.xy, with_long, self.importance, 2000, 1000)
+        view = network.view(xlim, ylim)
+        self.assertEqual((view.connection_level, len(view.connections)), (0, len(plain.connections)))
+
+        # Widok wokół zachodniego końca, daleko od kafla środka połączenia
+        x, y = self.xy[west]
+        near_west = network.view((x - 1000, x + 1000), (y - 1000, y + 1000))
+        self.assertIn(len(self.edge_nodes), network.connections.order[near_west.connections].tolist())
+
+    def test_view_outside_network(self):
+        network = TiledNetwork(self.xy, self.edge_nodes, self.importance, 2000, 1000)
+        view = network.view((-10.0, -5.0), (-10.0, -5.0))
+        self.assertEqual((len(view.cities), len(view.connections)), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
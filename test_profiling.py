@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from app import profiling
+from app.algorithms import registry
+from app.algorithms.csr_graph import CSRGraph
+from test_search_modes import road_grid
+
+
+def background_stage():
+    with profiling.span("w tle"):
+        pass
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        profiling.reset()
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def test_disabled_records_nothing(self):
+        """Wyłączony pomiar zwraca wspólny pusty kontekst i nic nie zapisuje."""
+        self.assertIs(profiling.span("etap"), profiling.span("inny"))
+        with profiling.span("etap"):
+            profiling.count("settled", 5)
+            profiling.memory_snapshot("migawka")
+        self.assertEqual(profiling.summary(), {"spans": {}, "counters": {}, "memory": []})
+        self.assertIn("brak pomiarów", profiling.report())
+
+    def test_counter_events_are_bounded(self):
+        """Przebieg liczników w śladzie ma ograniczoną długość, a sumy pozostają dokładne."""
+        profiling.enable()
+        for _ in range(profiling.MAX_COUNTER_EVENTS + 50):
+            profiling.count("settled", 2)
+        self.assertEqual(profiling.summary()["counters"], {"settled": 2 * (profiling.MAX_COUNTER_EVENTS + 50)})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "slad.json")
+            profiling.export_chrome_trace(path)
+            with open(path, encoding="utf-8") as file:
+                events = [event for event in json.load(file)["traceEvents"] if event["ph"] == "C"]
+        self.assertEqual(len(events), profiling.MAX_COUNTER_EVENTS)
+        self.assertEqual(events[-1]["args"]["settled"], 2 * (profiling.MAX_COUNTER_EVENTS + 50))
+
+    def test_disable_keeps_foreign_tracemalloc(self):
+        """Śledzenie pamięci włączone poza modułem nie jest zatrzymywane przez ``disable``."""
+        tracemalloc.start()
+        try:
+            profiling.enable(memory=True)
+            profiling.disable()
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+        profiling.enable(memory=True)
+        profiling.disable()
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_spans_counters_and_memory(self):
+        """Odcinki z wielu wątków, liczniki i migawki pamięci trafiają do raportu i śladu Chrome."""
+        profiling.enable(memory=True)
+        with profiling.span("ładowanie", path="baza.db"):
+            data = [0] * 100000
+        thread = threading.Thread(target=background_stage)
+        thread.start()
+        thread.join()
+        profiling.count("artists", 2)
+        profiling.count("artists", 3)
+        profiling.memory_snapshot("po ładowaniu")
+        del data
+
+        summary = profiling.summary()
+        self.assertEqual(summary["spans"]["ładowanie"]["count"], 1)
+        self.assertIn("w tle", summary["spans"])
+        self.assertEqual(summary["counters"], {"artists": 5})
+        self.assertGreater(summary["memory"][0]["traced_peak"], 100000 * 8)
+        self.assertIn("ładowanie: 1 x", profiling.report())
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "slad.json")
+            profiling.export_chrome_trace(path)
+            with open(path, encoding="utf-8") as file:
+                events = json.load(file)["traceEvents"]
+        spans = [event for event in events if event["ph"] == "X"]
+        self.assertEqual({event["name"] for event in spans}, {"ładowanie", "w tle"})
+        self.assertEqual(len({event["tid"] for event in spans}), 2)
+        self.assertEqual(spans[0]["args"], {"path": "baza.db"})
+        self.assertEqual([event["args"]["artists"] for event in events if event["name"] == "artists"], [2, 5])
+
+    def test_search_counters(self):
+        """Wyszukiwanie przez rejestr algorytmów dodaje odcinek i liczniki przeszukiwania."""
+        cities, connections = road_grid(8)
+        graph = CSRGraph.from_rows(cities, connections)
+        profiling.enable()
+        result = registry.run("Dijkstra", graph, 'M1', 'M64')
+        summary = profiling.summary()
+        self.assertIn("wyszukiwanie: Dijkstra", summary["spans"])
+        self.assertEqual(summary["counters"], {"settled": result.settled, "relaxed": result.relaxed})
+
+
+if __name__ == '__main__':
+    unittest.main()
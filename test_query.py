@@ -0,0 +1,69 @@
+import io
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from app.query import load_graph, main, run_query, run_batch
+
+
+class TestHeadlessQuery(unittest.TestCase):
+    def setUp(self):
+        # Kopia bazy - zrzut grafu i hierarchia są zapisywane obok niej, a nie w app/data
+        self.directory = tempfile.TemporaryDirectory()
+        database_path = os.path.join(self.directory.name, "polska.db")
+        shutil.copy("app/data/polska.db", database_path)
+        self.graph = load_graph(database_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_single_query(self):
+        """Zapytanie po nazwach i identyfikatorach miast."""
+        result = run_query(self.graph, "Gdańsk", "Kraków")
+        self.assertEqual(result["path"][0], "Gdańsk")
+        self.assertEqual(result["path"][-1], "Kraków")
+        self.assertEqual(run_query(self.graph, "3", "Kraków", "A*")["from"], "Gdańsk")
+        self.assertAlmostEqual(run_query(self.graph, "3", "Kraków", "A*")["cost"], result["cost"])
+
+    def test_batch(self):
+        """Tryb wsadowy zwraca jeden wiersz JSON na zapytanie, również dla błędnych zapytań."""
+        lines = [
+            json.dumps({"from": "Gdańsk", "to": "Kraków"}),
+            "",
+            json.dumps({"from": "Atlantyda", "to": "Kraków"}),
+            "to nie jest JSON",
+        ]
+        output = io.StringIO()
+        self.assertEqual(run_batch(self.graph, lines, output), 3)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(results[0]["to"], "Kraków")
+        self.assertEqual(results[1]["error"], "Nieznane miasto: Atlantyda")
+        self.assertIn("error", results[2])
+
+    def test_prepare_database(self):
+        """Opcja --prepare-db zakłada indeksy w bazie (odczyt ich nie zakłada)."""
+        with tempfile.TemporaryDirectory() as directory:
+            database_path = os.path.join(directory, "test.db")
+            shutil.copy("app/data/polska.db", database_path)
+            self.assertEqual(main(["--db", database_path, "--prepare-db"]), 0)
+            conn = sqlite3.connect(database_path)
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            conn.close()
+            self.assertIn("idx_connections_city_a", indexes)
+
+    def test_no_gui_imports(self):
+        """Moduł zapytań nie importuje bibliotek interfejsu graficznego."""
+        code = (
+            "import sys, app.query; "
+            "print(any(m.split('.')[0] in ('PyQt5', 'matplotlib', 'geopandas', 'networkx') for m in sys.modules))"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "False")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+import unittest
+from app.config import ALGORITHMS
+from app.algorithms import registry
+from app.algorithms.cache import QueryCache
+from app.algorithms.csr_graph import CSRGraph, FINGERPRINT_KEY
+from test_search_modes import road_grid
+
+
+class TestAlgorithmRegistry(unittest.TestCase):
+    def setUp(self):
+        cities, connections = road_grid(12)
+        self.graph = CSRGraph.from_rows(cities, connections)
+
+    def test_uniform_results(self):
+        """Każdy zarejestrowany algorytm zwraca ten sam koszt i wypełnia liczniki wyniku."""
+        expected = registry.run("Dijkstra", self.graph, 'M1', 'M144')
+        for name in ALGORITHMS:
+            result = registry.run(name, self.graph, 'M1', 'M144', trace="list")
+            self.assertEqual(result.algorithm, name)
+            self.assertAlmostEqual(result.cost, expected.cost)
+            self.assertGreater(result.settled, 0)
+            self.assertGreaterEqual(result.relaxed, result.settled - 1)
+            self.assertEqual(len(result.steps), result.relaxed)
+            self.assertFalse(result.cached)
+            self.assertEqual(result.as_dict()["path"], result.path)
+
+    def test_lazy_import_and_unknown_name(self):
+        """Funkcja algorytmu jest importowana raz, a nieznana nazwa zgłasza ValueError."""
+        self.assertIs(registry.get_algorithm("A*"), registry.get_algorithm("A*"))
+        with self.assertRaises(ValueError):
+            registry.run("Algorytm", self.graph, 'M1', 'M144')
+
+    def test_modules_do_not_import_contraction(self):
+        """Moduły ładowania danych i rysowania nie importują hierarchii kontrakcji przed wyborem algorytmu CH."""
+        code = (
+            "import sys, app.query, app.dataset_manager, app.level_of_detail; "
+            "print('app.algorithms.contraction' in sys.modules)"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "False")
+
+    def test_cached_result(self):
+        """Wynik z pamięci podręcznej jest oznaczony i nie ma liczników przeszukiwania."""
+        self.graph.derived[FINGERPRINT_KEY] = "odcisk"
+        cache = QueryCache()
+        first = registry.run("A*", self.graph, 'M1', 'M144', cache=cache)
+        second = registry.run("A*", self.graph, 'M1', 'M144', cache=cache)
+        self.assertTrue(second.cached)
+        self.assertEqual((second.settled, second.relaxed), (0, 0))
+        self.assertEqual((second.path, second.cost), (first.path, first.cost))
+
+
+if __name__ == '__main__':
+    unittest.main()
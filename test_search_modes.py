@@ -0,0 +1,133 @@
+import random
+import unittest
+import networkx as nx
+import numpy as np
+from app.algorithms.csr_graph import CSRGraph
+from app.algorithms.dijkstra import dijkstra
+from app.algorithms.astar import astar
+from app.algorithms.bidirectional import bidirectional_dijkstra
+from app.algorithms.heuristics import great_circle, heuristic_scale
+from app.algorithms.progress import PROGRESS_INTERVAL, SearchCancelled
+
+
+def road_grid(size, seed=0):
+    """Tworzy siatkę miast w okolicach Polski z wagami nie mniejszymi niż odległość po ortodromie."""
+    rng = random.Random(seed)
+    cities = []
+    for row in range(size):
+        for col in range(size):
+            city_id = row * size + col + 1
+            cities.append((city_id, f"M{city_id}", 15.0 + col * 0.1 + rng.uniform(-0.02, 0.02),
+                           49.5 + row * 0.1 + rng.uniform(-0.02, 0.02)))
+    graph = CSRGraph.from_rows(cities, [])
+    connections = []
+    for row in range(size):
+        for col in range(size):
+            u = row * size + col
+            for v in (u + 1 if col + 1 < size else None, u + size if row + 1 < size else None):
+                if v is not None:
+                    distance = great_circle(graph.coordinates[[u, v]], 1)[0] * rng.uniform(1.0, 1.6)
+                    connections.append((len(connections) + 1, u + 1, v + 1, distance))
+    return cities, connections
+
+
+class TestSearchModes(unittest.TestCase):
+    def setUp(self):
+        cities, connections = road_grid(20)
+        self.graph = CSRGraph.from_rows(cities, connections)
+
+    def test_same_cost_as_dijkstra(self):
+        """A* i Dijkstra dwukierunkowy zwracają koszt równy kosztowi Dijkstry."""
+        rng = random.Random(1)
+        for _ in range(20):
+            start, end = rng.sample(self.graph.names, 2)
+            _, expected_cost, _ = dijkstra(self.graph, start, end)
+            for algorithm in (astar, bidirectional_dijkstra):
+                path, cost, steps = algorithm(self.graph, start, end)
+                self.assertAlmostEqual(cost, expected_cost)
+                self.assertEqual(path[0], start)
+                self.assertEqual(path[-1], end)
+
+    def test_settled_count(self):
+        """A* ustala mniej węzłów niż Dijkstra na siatce drogowej."""
+        dijkstra_stats, astar_stats, bidirectional_stats = {}, {}, {}
+        dijkstra(self.graph, 'M1', 'M400', stats=dijkstra_stats)
+        astar(self.graph, 'M1', 'M400', stats=astar_stats)
+        bidirectional_dijkstra(self.graph, 'M1', 'M400', stats=bidirectional_stats)
+        self.assertLess(astar_stats["settled"], dijkstra_stats["settled"])
+        self.assertLessEqual(bidirectional_stats["settled"], dijkstra_stats["settled"] + 1)
+
+    def test_euclidean_heuristic(self):
+        """Heurystyka euklidesowa na współrzędnych rzutowanych daje poprawny wynik."""
+        lon, lat = self.graph.coordinates[:, 0], self.graph.coordinates[:, 1]
+        self.graph.projected = np.column_stack([lon * 71500.0, lat * 111000.0])
+        _, expected_cost, _ = dijkstra(self.graph, 'M5', 'M317')
+        _, cost, _ = astar(self.graph, 'M5', 'M317', heuristic="euclidean")
+        self.assertAlmostEqual(cost, expected_cost)
+
+        # Nowe współrzędne rzutowane (np. inny CRS mapy) unieważniają zapamiętaną skalę
+        scale = heuristic_scale(self.graph, "euclidean")
+        self.graph.projected = self.graph.projected * 10
+        self.assertAlmostEqual(heuristic_scale(self.graph, "euclidean"), scale / 10)
+        _, cost, _ = astar(self.graph, 'M5', 'M317', heuristic="euclidean")
+        self.assertAlmostEqual(cost, expected_cost)
+
+    def test_trace_modes(self):
+        """Tryby zapisu kroków dają te same kroki dla A* i Dijkstry dwukierunkowej."""
+        for algorithm in (astar, bidirectional_dijkstra):
+            _, _, steps = algorithm(self.graph, 'M3', 'M250', trace="list")
+            _, _, lazy_steps = algorithm(self.graph, 'M3', 'M250', trace="lazy")
+            self.assertTrue(steps)
+            self.assertEqual(list(lazy_steps), steps)
+            self.assertEqual(algorithm(self.graph, 'M3', 'M250')[2], ())
+
+    def test_lazy_replay_keeps_stats(self):
+        """Pobranie kroków w trybie "lazy" nie nadpisuje liczników ani nie zgłasza postępu."""
+        graph = CSRGraph.from_rows(*road_grid(40))
+        for algorithm in (dijkstra, astar, bidirectional_dijkstra):
+            stats = {}
+            calls = []
+            _, _, lazy_steps = algorithm(graph, 'M1', 'M1600', stats=stats, trace="lazy", progress=calls.append)
+            self.assertTrue(calls)
+            expected_stats, expected_calls = dict(stats), list(calls)
+            self.assertTrue(list(lazy_steps))
+            self.assertEqual((stats, calls), (expected_stats, expected_calls))
+
+    def test_networkx_graph(self):
+        """Oba algorytmy przyjmują również graf NetworkX."""
+        graph = nx.DiGraph()
+        graph.add_edge('A', 'B', weight=1)
+        graph.add_edge('B', 'C', weight=2)
+        graph.add_edge('C', 'A', weight=3)
+        for algorithm in (astar, bidirectional_dijkstra):
+            path, cost, steps = algorithm(graph, 'C', 'B')
+            self.assertEqual(path, ['C', 'A', 'B'])
+            self.assertEqual(cost, 4)
+
+    def test_no_path_and_single_node(self):
+        """Brak ścieżki i ścieżka z węzła do niego samego."""
+        graph = CSRGraph.from_rows([(1, 'A', 20, 50), (2, 'B', 21, 50), (3, 'E', 22, 50)], [(1, 1, 2, 100)])
+        for algorithm in (astar, bidirectional_dijkstra):
+            self.assertEqual(algorithm(graph, 'A', 'E')[:2], ([], float('inf')))
+            self.assertEqual(algorithm(graph, 'A', 'A')[:2], (['A'], 0))
+
+    def test_progress_and_cancel(self):
+        """Funkcja progress jest wywoływana w trakcie przeszukiwania i może je przerwać."""
+        cities, connections = road_grid(40)
+        graph = CSRGraph.from_rows(cities, connections)
+        for algorithm in (dijkstra, bidirectional_dijkstra):
+            reported = []
+            expected = algorithm(graph, 'M1', 'M1600')[:2]
+            self.assertEqual(algorithm(graph, 'M1', 'M1600', progress=reported.append)[:2], expected)
+            self.assertTrue(reported)
+            self.assertEqual(reported[0], PROGRESS_INTERVAL)
+
+            def cancel(settled):
+                raise SearchCancelled()
+
+            with self.assertRaises(SearchCancelled):
+                algorithm(graph, 'M1', 'M1600', progress=cancel)
+
+
+if __name__ == '__main__':
+    unittest.main()
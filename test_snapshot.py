@@ -0,0 +1,84 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import numpy as np
+from app.algorithms.csr_graph import CSRGraph
+from app.algorithms.dijkstra import dijkstra
+from app.dataset import Dataset
+from app.db_handler import close_connections, get_cities, get_connection, get_connections
+from app.snapshot import load_snapshot, read_snapshot, save_snapshot, snapshot_path
+from test_search_modes import road_grid
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.database_path = os.path.join(self.directory, "test.db")
+        shutil.copy("app/data/polska.db", self.database_path)
+
+    def tearDown(self):
+        close_connections()
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        """Graf wczytany ze zrzutu ma te same tablice i daje te same wyniki."""
+        cities, connections = road_grid(10)
+        cities[0] = (cities[0][0], "Łódź", cities[0][2], cities[0][3])
+        graph = CSRGraph.from_rows(cities, connections)
+        path = os.path.join(self.directory, "grid.graph.bin")
+        save_snapshot(graph, path, "odcisk")
+
+        loaded, header = read_snapshot(path)
+        self.assertEqual(header["fingerprint"], "odcisk")
+        self.assertEqual(loaded.names, graph.names)
+        for name in ("offsets", "targets", "weights", "city_ids", "coordinates"):
+            self.assertTrue(np.array_equal(getattr(loaded, name), getattr(graph, name)))
+        self.assertIsInstance(loaded.weights.base, np.memmap)
+        self.assertEqual(dijkstra(loaded, "Łódź", "M100")[:2], dijkstra(graph, "Łódź", "M100")[:2])
+
+    def test_regenerated_when_database_changes(self):
+        """Zrzut jest tworzony przy pierwszym użyciu i odświeżany po zmianie bazy."""
+        graph, fingerprint = load_snapshot(self.database_path)
+        self.assertTrue(os.path.exists(snapshot_path(self.database_path)))
+        conn = get_connection(self.database_path)
+        self.assertEqual(graph.node_count, len(get_cities(conn)))
+
+        cached, cached_fingerprint = load_snapshot(self.database_path)
+        self.assertEqual(cached_fingerprint, fingerprint)
+        self.assertIsInstance(cached.weights.base, np.memmap)
+
+        writer = sqlite3.connect(self.database_path)
+        writer.execute("UPDATE connections SET distance = distance + 100 WHERE id = 1")
+        writer.commit()
+        writer.close()
+
+        updated, updated_fingerprint = load_snapshot(self.database_path)
+        self.assertNotEqual(updated_fingerprint, fingerprint)
+        expected = CSRGraph.from_rows(get_cities(conn), get_connections(conn))
+        self.assertTrue(np.array_equal(updated.weights, expected.weights))
+        self.assertFalse(np.array_equal(updated.weights, graph.weights))
+
+    def test_regenerated_when_city_renamed(self):
+        """Zmiana samej nazwy miasta zmienia odcisk i nazwy w zrzucie."""
+        graph, fingerprint = load_snapshot(self.database_path)
+        old_name = graph.names[graph.node_of_city(1)]
+
+        writer = sqlite3.connect(self.database_path)
+        writer.execute("UPDATE cities SET city_name = 'Nowa Nazwa' WHERE id = 1")
+        writer.commit()
+        writer.close()
+
+        close_connections()
+        dataset = Dataset.from_database(self.database_path)
+        self.assertNotEqual(dataset.fingerprint, fingerprint)
+        self.assertEqual(dataset.graph.names[dataset.graph.node_of_city(1)], "Nowa Nazwa")
+        self.assertNotIn(old_name, dataset.graph)
+        self.assertEqual(dijkstra(dataset.graph, "Nowa Nazwa", graph.names[-1])[1],
+                         dijkstra(graph, old_name, graph.names[-1])[1])
+        self.assertEqual(read_snapshot(snapshot_path(self.database_path))[0].names, dataset.graph.names)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import random
+import unittest
+import numpy as np
+from app.spatial import GridIndex
+
+
+class TestGridIndex(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(4)
+        self.x = np.array([rng.uniform(170000, 860000) for _ in range(500)])
+        self.y = np.array([rng.uniform(130000, 780000) for _ in range(500)])
+        self.index = GridIndex(self.x, self.y)
+
+    def test_nearest_matches_linear_scan(self):
+        """Najbliższy punkt jest taki sam jak przy przeszukiwaniu liniowym."""
+        rng = random.Random(5)
+        for _ in range(200):
+            x, y = rng.uniform(0, 1000000), rng.uniform(0, 1000000)
+            distances = np.hypot(self.x - x, self.y - y)
+            point, distance = self.index.nearest(x, y)
+            self.assertEqual(point, int(np.argmin(distances)))
+            self.assertAlmostEqual(distance, distances.min())
+
+    def test_tolerance(self):
+        """Punkty dalsze niż tolerancja nie są zwracane."""
+        point, _ = self.index.nearest(self.x[7] + 100, self.y[7], max_distance=500)
+        self.assertEqual(point, 7)
+        self.assertEqual(self.index.nearest(-500000, -500000, max_distance=1000), (None, float('inf')))
+
+    def test_empty_index(self):
+        """Pusty indeks nie zwraca żadnego punktu."""
+        self.assertEqual(GridIndex([], []).nearest(0, 0), (None, float('inf')))
+
+
+if __name__ == '__main__':
+    unittest.main()